@@ -5,6 +5,7 @@ from unittest import mock
 
 from pytest import fixture
 from cumulusci.core.github import get_github_api
+from cumulusci.salesforce_api.describe_cache import DescribeCache
 from cumulusci.tests.pytest_plugins.pytest_sf_vcr import vcr_config, salesforce_vcr
 from cumulusci.tests.util import DummyOrgConfig
 from cumulusci.tasks.salesforce.tests.util import create_task_fixture
@@ -17,6 +18,13 @@ def mock_sleep():
         yield
 
 
+@fixture(scope="session", autouse=True)
+def no_persisted_describes():
+    """Keep unit tests from sharing sObject describes through the orginfo cache"""
+    with mock.patch.object(DescribeCache, "persist", False):
+        yield
+
+
 class MockHttpResponse(mock.Mock):
     def __init__(self, status):
         super(MockHttpResponse, self).__init__()
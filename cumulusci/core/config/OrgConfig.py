@@ -13,6 +13,7 @@ from cumulusci.core.config import BaseConfig
 from cumulusci.core.exceptions import SalesforceCredentialsException, CumulusCIException
 from cumulusci.oauth.salesforce import SalesforceOAuth2
 from cumulusci.oauth.salesforce import jwt_session
+from cumulusci.salesforce_api.describe_cache import DescribeCache
 
 
 SKIP_REFRESH = os.environ.get("CUMULUSCI_DISABLE_REFRESH")
@@ -36,6 +37,7 @@ class OrgConfig(BaseConfig):
         self._latest_api_version = None
         self._installed_packages = None
         self._is_person_accounts_enabled = None
+        self._describe_caches = {}
         super(OrgConfig, self).__init__(config)
 
     def refresh_oauth_token(self, keychain, connected_app=None):
@@ -278,6 +280,26 @@ class OrgConfig(BaseConfig):
     def reset_installed_packages(self):
         self._installed_packages = None
 
+    def get_describe_cache(self, api_version):
+        """Return the cache of sObject describes for this org at the given API version.
+
+        The cache is shared by all tasks that use this OrgConfig, and is keyed
+        by the org's id, so that a recreated org doesn't share the describes
+        of the org it replaced. Use
+        `cumulusci.salesforce_api.describe_cache.get_describe()` to read from it."""
+        org_id = self.org_id if self.id else None
+        key = (org_id, str(api_version))
+        if key not in self._describe_caches:
+            self._describe_caches[key] = DescribeCache(self, org_id, api_version)
+        return self._describe_caches[key]
+
+    def reset_describe_cache(self):
+        """Discard cached sObject describes, in memory and on disk,
+        after a change to the org's schema."""
+        for cache in self._describe_caches.values():
+            cache.clear()
+        DescribeCache.remove_persisted(self)
+
     def save(self):
         assert self.keychain, "Keychain was not set on OrgConfig"
         self.keychain.set_org(self, self.global_org)
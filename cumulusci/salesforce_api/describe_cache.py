@@ -0,0 +1,113 @@
+"""A shared cache of sObject describes.
+
+Describes are held in memory on the OrgConfig, so that every task run against
+the org in a flow shares them, keyed by the org's id. If the
+CUMULUSCI_PERSIST_DESCRIBES environment variable is set, they are also
+persisted in the org's orginfo cache directory, so that separate runs of
+CumulusCI share them too. Entries expire after a TTL, and the whole cache is
+reset after tasks that change the org's schema."""
+
+import json
+import os
+import threading
+import time
+
+DESCRIBE_CACHE_TTL = 60 * 60  # seconds
+CACHE_NAME = "describe"
+GLOBAL_DESCRIBE = "__global__"
+
+
+def get_describe(org_config, sf, sobject=None):
+    """Return the describe of sobject, or the global describe if sobject is None,
+    using the org's shared describe cache.
+
+    `sf` is the simple_salesforce client to describe with; its API version
+    selects the cache."""
+    if getattr(type(org_config), "get_describe_cache", None) is None:
+        # Org configs that don't provide a cache are described directly.
+        return _fetch(sf, sobject)
+
+    return org_config.get_describe_cache(sf.sf_version).get(sf, sobject)
+
+
+def _fetch(sf, sobject):
+    if sobject:
+        return getattr(sf, sobject).describe()
+    return sf.describe()
+
+
+class DescribeCache:
+    """Cache of the describes for one org at one API version."""
+
+    # Whether entries are persisted in the orginfo cache directory. Schema
+    # changes made outside of CumulusCI would go unnoticed until the entries
+    # expire, so this must be enabled explicitly.
+    persist = bool(os.environ.get("CUMULUSCI_PERSIST_DESCRIBES"))
+
+    def __init__(self, org_config, org_id, api_version, ttl=DESCRIBE_CACHE_TTL):
+        self.org_config = org_config
+        self.org_id = org_id
+        self.api_version = str(api_version)
+        self.ttl = ttl
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, sf, sobject=None):
+        """Return a cached describe, fetching it with sf if it is missing or expired."""
+        name = sobject or GLOBAL_DESCRIBE
+        with self.lock:
+            entry = self.entries.get(name) or self._load(name)
+            if entry is None or time.time() - entry[0] > self.ttl:
+                entry = (time.time(), _fetch(sf, sobject))
+                self._save(name, entry)
+            self.entries[name] = entry
+
+        return entry[1]
+
+    def clear(self):
+        """Discard the entries held in memory."""
+        with self.lock:
+            self.entries.clear()
+
+    def _can_persist(self):
+        return (
+            self.persist
+            and self.org_id is not None
+            and self.org_config.keychain is not None
+        )
+
+    def _load(self, name):
+        if not self._can_persist():
+            return None
+
+        with self.org_config.get_orginfo_cache_dir(CACHE_NAME) as cache_dir:
+            version_dir = cache_dir.getsyspath() / self.org_id / self.api_version
+            path = version_dir / f"{name}.json"
+            if not path.exists():
+                return None
+            try:
+                with path.open("r") as f:
+                    data = json.load(f)
+                return data["fetched_at"], data["describe"]
+            except (ValueError, KeyError):
+                return None
+
+    def _save(self, name, entry):
+        if not self._can_persist():
+            return
+
+        with self.org_config.get_orginfo_cache_dir(CACHE_NAME) as cache_dir:
+            version_dir = cache_dir.getsyspath() / self.org_id / self.api_version
+            version_dir.mkdir(parents=True, exist_ok=True)
+            with (version_dir / f"{name}.json").open("w") as f:
+                json.dump({"fetched_at": entry[0], "describe": entry[1]}, f)
+
+    @classmethod
+    def remove_persisted(cls, org_config):
+        """Remove the describes persisted for org_config's user at all API versions,
+        including those of orgs that the user's credentials previously belonged to."""
+        if not cls.persist or org_config.keychain is None:
+            return
+
+        with org_config.get_orginfo_cache_dir(CACHE_NAME) as cache_dir:
+            cache_dir.removetree()
@@ -0,0 +1,143 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+import pytest
+
+from cumulusci.core.config import OrgConfig
+from cumulusci.salesforce_api.describe_cache import DescribeCache, get_describe
+from cumulusci.tests.util import DummyKeychain
+
+
+@pytest.fixture
+def org_config():
+    return OrgConfig(
+        {
+            "instance_url": "https://zombo.my.salesforce.com",
+            "username": "test-example@example.com",
+            "id": "https://login.salesforce.com/id/00D000000000001AAA/005000000000001AAA",
+        },
+        "test",
+        keychain=DummyKeychain(),
+    )
+
+
+@pytest.fixture
+def sf():
+    sf = mock.Mock()
+    sf.sf_version = "50.0"
+    sf.describe.return_value = {"sobjects": [{"name": "Account"}]}
+    sf.Account.describe.return_value = {"fields": [{"name": "Name"}]}
+    return sf
+
+
+@pytest.fixture
+def persisted():
+    with TemporaryDirectory() as t:
+        with mock.patch(
+            "cumulusci.tests.util.DummyKeychain.cache_dir", Path(t)
+        ), mock.patch.object(DescribeCache, "persist", True):
+            yield Path(t)
+
+
+class TestDescribeCache:
+    def test_get_describe__cached(self, org_config, sf):
+        assert get_describe(org_config, sf, "Account") == {"fields": [{"name": "Name"}]}
+        assert get_describe(org_config, sf, "Account") == {"fields": [{"name": "Name"}]}
+        assert get_describe(org_config, sf) == {"sobjects": [{"name": "Account"}]}
+        assert get_describe(org_config, sf) == {"sobjects": [{"name": "Account"}]}
+
+        sf.Account.describe.assert_called_once_with()
+        sf.describe.assert_called_once_with()
+
+    def test_get_describe__keyed_by_api_version(self, org_config, sf):
+        get_describe(org_config, sf, "Account")
+        sf.sf_version = "49.0"
+        get_describe(org_config, sf, "Account")
+
+        assert sf.Account.describe.call_count == 2
+        assert org_config.get_describe_cache(
+            "49.0"
+        ) is not org_config.get_describe_cache("50.0")
+
+    def test_get_describe__ttl(self, org_config, sf):
+        with mock.patch("time.time", return_value=1000):
+            get_describe(org_config, sf, "Account")
+        with mock.patch("time.time", return_value=1000 + 60):
+            get_describe(org_config, sf, "Account")
+        assert sf.Account.describe.call_count == 1
+
+        with mock.patch("time.time", return_value=1000 + 2 * 60 * 60):
+            get_describe(org_config, sf, "Account")
+        assert sf.Account.describe.call_count == 2
+
+    def test_get_describe__no_cache(self, sf):
+        org_config = mock.Mock()
+
+        get_describe(org_config, sf, "Account")
+        get_describe(org_config, sf, "Account")
+
+        assert sf.Account.describe.call_count == 2
+
+    def test_get_describe__persisted(self, org_config, sf, persisted):
+        get_describe(org_config, sf, "Account")
+        assert list(
+            persisted.glob("orginfo/*/describe/00D000000000001AAA/50.0/Account.json")
+        )
+
+        # A new OrgConfig for the same org reads the describe from disk.
+        other_org_config = OrgConfig(
+            dict(org_config.config), "test", keychain=DummyKeychain()
+        )
+        assert get_describe(other_org_config, sf, "Account") == {
+            "fields": [{"name": "Name"}]
+        }
+        sf.Account.describe.assert_called_once_with()
+
+    def test_get_describe__keyed_by_org_id(self, org_config, sf, persisted):
+        get_describe(org_config, sf, "Account")
+
+        # A recreated org with the same username doesn't reuse the describes.
+        config = dict(org_config.config)
+        config[
+            "id"
+        ] = "https://login.salesforce.com/id/00D000000000002AAA/005000000000001AAA"
+        other_org_config = OrgConfig(config, "test", keychain=DummyKeychain())
+        get_describe(other_org_config, sf, "Account")
+        assert sf.Account.describe.call_count == 2
+
+        # Nor does the same OrgConfig once it refers to the new org.
+        org_config.config["id"] = config["id"]
+        get_describe(org_config, sf, "Account")
+        assert sf.Account.describe.call_count == 2
+
+    def test_get_describe__not_persisted(self, org_config, sf):
+        with TemporaryDirectory() as t:
+            with mock.patch("cumulusci.tests.util.DummyKeychain.cache_dir", Path(t)):
+                get_describe(org_config, sf, "Account")
+
+            assert not list(Path(t).glob("orginfo/*/describe/**/*.json"))
+
+    def test_get_describe__corrupt_file(self, org_config, sf, persisted):
+        get_describe(org_config, sf, "Account")
+        (path,) = persisted.glob(
+            "orginfo/*/describe/00D000000000001AAA/50.0/Account.json"
+        )
+        path.write_text("{")
+
+        other_org_config = OrgConfig(
+            dict(org_config.config), "test", keychain=DummyKeychain()
+        )
+        get_describe(other_org_config, sf, "Account")
+        assert sf.Account.describe.call_count == 2
+
+    def test_reset_describe_cache(self, org_config, sf, persisted):
+        get_describe(org_config, sf, "Account")
+
+        org_config.reset_describe_cache()
+
+        assert not list(
+            persisted.glob("orginfo/*/describe/00D000000000001AAA/50.0/Account.json")
+        )
+        get_describe(org_config, sf, "Account")
+        assert sf.Account.describe.call_count == 2
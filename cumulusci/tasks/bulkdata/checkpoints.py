@@ -0,0 +1,155 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, Table, Text, Unicode, select
+
+CHECKPOINT_TABLE = "cumulusci_load_checkpoints"
+
+STEP_STARTED = "started"
+BATCH_UPLOADED = "uploaded"
+STEP_COMPLETED = "completed"
+LOAD_STARTED = "load started"
+
+
+class LoadCheckpoints:
+    """Record the progress of a load in a table in its own database, so that
+    an interrupted load can be resumed.
+
+    Each row records, for a mapping step, one of:
+
+    * that the step started a job (status "started"), with the job's id.
+    * a Bulk API batch that was uploaded but whose results were not yet
+      stored in the step's Id table (status "uploaded"), with the local ids
+      of the batch's records in upload order.
+    * that the step completed (status "completed").
+
+    One more row, with no step, records when the load started
+    (status "load started"), as an ISO 8601 timestamp in local_ids.
+
+    Changes are made in the given session; the caller commits them, so that
+    a batch's checkpoint can be removed in the same transaction that stores
+    its results."""
+
+    def __init__(self, session, metadata):
+        self.session = session
+        if CHECKPOINT_TABLE in metadata.tables:
+            self.table = metadata.tables[CHECKPOINT_TABLE]
+        else:
+            self.table = Table(
+                CHECKPOINT_TABLE,
+                metadata,
+                Column("id", Integer, primary_key=True),
+                Column("step", Unicode(255), nullable=False),
+                Column("status", Unicode(32), nullable=False),
+                Column("job_id", Unicode(18)),
+                Column("batch_id", Unicode(18)),
+                Column("local_ids", Text),
+            )
+            self.table.create()
+
+    def clear(self):
+        """Forget all progress, as at the start of a new load."""
+        self.session.execute(self.table.delete())
+
+    def _rows(self, step, status):
+        return self.session.execute(
+            self.table.select().where(
+                (self.table.c.step == step) & (self.table.c.status == status)
+            )
+        ).fetchall()
+
+    def start_load(self, started: datetime):
+        """Record when the load started. Any earlier progress must already
+        have been cleared."""
+        self.session.execute(
+            self.table.insert().values(
+                step="", status=LOAD_STARTED, local_ids=started.isoformat()
+            )
+        )
+
+    def load_started(self):
+        """Return when the load started, or None if it wasn't recorded."""
+        rows = self._rows("", LOAD_STARTED)
+        return datetime.fromisoformat(rows[0].local_ids) if rows else None
+
+    def is_completed(self, step):
+        return bool(self._rows(step, STEP_COMPLETED))
+
+    def was_started(self, step):
+        """Return whether the step started a job that did not complete."""
+        return bool(self._rows(step, STEP_STARTED)) and not self.is_completed(step)
+
+    def start(self, step, job_id):
+        """Record that the step started a job. Any uploaded batches recorded
+        for the step must already have been resolved."""
+        self.session.execute(self.table.delete().where(self.table.c.step == step))
+        self.session.execute(
+            self.table.insert().values(step=step, status=STEP_STARTED, job_id=job_id)
+        )
+
+    def batch_uploaded(self, step, job_id, batch_id, local_ids):
+        self.session.execute(
+            self.table.insert().values(
+                step=step,
+                status=BATCH_UPLOADED,
+                job_id=job_id,
+                batch_id=batch_id,
+                local_ids="\n".join(str(local_id) for local_id in local_ids),
+            )
+        )
+
+    def batch_persisted(self, step, batch_id):
+        """Record that the batch's results were stored."""
+        self.session.execute(
+            self.table.delete().where(
+                (self.table.c.step == step) & (self.table.c.batch_id == batch_id)
+            )
+        )
+
+    def uploaded_batches(self, step):
+        """Return (job_id, batch_id, local_ids) for each of the step's batches
+        whose results were not stored."""
+        return [
+            (row.job_id, row.batch_id, row.local_ids.split("\n"))
+            for row in self._rows(step, BATCH_UPLOADED)
+        ]
+
+    def complete(self, step):
+        self.session.execute(self.table.delete().where(self.table.c.step == step))
+        self.session.execute(
+            self.table.insert().values(step=step, status=STEP_COMPLETED)
+        )
+
+
+WATERMARK_TABLE = "cumulusci_extract_watermarks"
+
+
+class ExtractWatermarks:
+    """Record, in a table in the output database of an incremental extract,
+    the latest SystemModstamp of the records extracted by each mapping step,
+    so that the next extract only queries records modified since then.
+
+    Changes are made in the given session; the caller commits them along
+    with the records they describe."""
+
+    def __init__(self, session, metadata):
+        self.session = session
+        if WATERMARK_TABLE in metadata.tables:
+            self.table = metadata.tables[WATERMARK_TABLE]
+        else:
+            self.table = Table(
+                WATERMARK_TABLE,
+                metadata,
+                Column("step", Unicode(255), primary_key=True),
+                Column("watermark", Unicode(32), nullable=False),
+            )
+            self.table.create()
+
+    def get(self, step):
+        """Return the step's watermark, or None if it was never extracted."""
+        return self.session.execute(
+            select([self.table.c.watermark]).where(self.table.c.step == step)
+        ).scalar()
+
+    def set(self, step, watermark):
+        self.session.execute(self.table.delete().where(self.table.c.step == step))
+        self.session.execute(self.table.insert().values(step=step, watermark=watermark))
@@ -0,0 +1,114 @@
+import gzip
+import hashlib
+import json
+import os
+
+from sqlalchemy import Column, Integer, MetaData, Table, Unicode
+
+from cumulusci.core.exceptions import BulkDataException
+
+MANIFEST_FILE = "manifest.json"
+DATASET_VERSION = 1
+# Number of rows read from the database at a time while writing a dataset
+WRITE_CHUNK_SIZE = 10000
+
+
+def hash_mapping(mapping_path):
+    """Return the SHA-256 hash of a mapping file, to record in a manifest."""
+    with open(mapping_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def write_dataset(connection, path, mapping_hash):
+    """Write each table of the database to a directory as a compressed dataset.
+
+    Each table's rows are written, a chunk at a time, to a gzip-compressed
+    file with one JSON array per line, so that NULLs and empty strings stay
+    distinct. manifest.json records the columns and file of each table and
+    the hash of the mapping that the data was extracted with."""
+    os.makedirs(path, exist_ok=True)
+    metadata = MetaData()
+    metadata.reflect(bind=connection)
+
+    tables = []
+    for table in metadata.sorted_tables:
+        if table.name.startswith("sqlite_"):
+            # SQLite's internal tables are recreated by SQLite as needed.
+            continue
+        file_name = f"{table.name}.ndjson.gz"
+        rows = 0
+        result = connection.execute(table.select().order_by(*table.primary_key.columns))
+        with gzip.open(os.path.join(path, file_name), "wt", encoding="utf-8") as f:
+            while True:
+                chunk = result.fetchmany(WRITE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.writelines(json.dumps(list(row), default=str) + "\n" for row in chunk)
+                rows += len(chunk)
+        tables.append(
+            {
+                "name": table.name,
+                "file": file_name,
+                "rows": rows,
+                "columns": [_describe_column(column) for column in table.columns],
+            }
+        )
+
+    manifest = {
+        "version": DATASET_VERSION,
+        "mapping_hash": mapping_hash,
+        "tables": tables,
+    }
+    with open(os.path.join(path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def _describe_column(column):
+    if isinstance(column.type, Integer):
+        description = {"name": column.name, "type": "integer"}
+    else:
+        description = {
+            "name": column.name,
+            "type": "string",
+            "length": getattr(column.type, "length", None),
+        }
+    if column.primary_key:
+        description["primary_key"] = True
+    return description
+
+
+def read_manifest(path):
+    """Return the manifest of a dataset directory."""
+    try:
+        with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        raise BulkDataException(f"{path} is not a dataset: {MANIFEST_FILE} not found")
+    if manifest.get("version") != DATASET_VERSION:
+        raise BulkDataException(
+            f"Unsupported dataset version {manifest.get('version')} in {path}"
+        )
+    return manifest
+
+
+def define_table(table_manifest, metadata):
+    """Define a table described by a manifest in metadata."""
+    columns = [
+        Column(
+            column["name"],
+            Integer() if column["type"] == "integer" else Unicode(column.get("length")),
+            primary_key=column.get("primary_key", False),
+        )
+        for column in table_manifest["columns"]
+    ]
+    return Table(table_manifest["name"], metadata, *columns)
+
+
+def iter_rows(path, table_manifest):
+    """Yield the rows of a table in a dataset directory, as lists of values
+    in the order of the table's columns."""
+    with gzip.open(
+        os.path.join(path, table_manifest["file"]), "rt", encoding="utf-8"
+    ) as f:
+        for line in f:
+            yield json.loads(line)
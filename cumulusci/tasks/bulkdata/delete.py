@@ -3,11 +3,15 @@ from cumulusci.tasks.bulkdata.step import (
     DataOperationType,
     DataOperationStatus,
     DataApi,
+    POLL_TASK_OPTIONS,
     get_query_operation,
     get_dml_operation,
+    get_poll_options,
+    get_record_counts,
 )
 from cumulusci.tasks.salesforce import BaseSalesforceApiTask
 from cumulusci.core.exceptions import TaskOptionsError, BulkDataException
+from cumulusci.salesforce_api.describe_cache import get_describe
 from cumulusci.tasks.bulkdata.utils import RowErrorChecker
 
 
@@ -34,9 +38,10 @@ class DeleteData(BaseSalesforceApiTask):
             "and fields for which it is present in the org. Defaults to True."
         },
         "api": {
-            "description": "The desired Salesforce API to use, which may be 'rest', 'bulk', or "
+            "description": "The desired Salesforce API to use, which may be 'rest', 'bulk', 'bulk2', or "
             "'smart' to auto-select based on record volume. The default is 'smart'."
         },
+        **POLL_TASK_OPTIONS,
     }
     row_warning_limit = 10
 
@@ -63,16 +68,18 @@ class DeleteData(BaseSalesforceApiTask):
         try:
             self.options["api"] = {
                 "bulk": DataApi.BULK,
+                "bulk2": DataApi.BULK2,
                 "rest": DataApi.REST,
                 "smart": DataApi.SMART,
             }[self.options.get("api", "smart").lower()]
         except KeyError:
             raise TaskOptionsError(
-                f"{self.options['api']} is not a valid value for API (valid: bulk, rest, smart)"
+                f"{self.options['api']} is not a valid value for API (valid: bulk, bulk2, rest, smart)"
             )
 
         if self.options["hardDelete"] and self.options["api"] is DataApi.REST:
             raise TaskOptionsError("The hardDelete option requires Bulk API.")
+        self.poll_options = get_poll_options(self.options)
 
     @staticmethod
     def _is_injectable(element: str) -> bool:
@@ -83,7 +90,9 @@ class DeleteData(BaseSalesforceApiTask):
 
         global_describe = {
             entry["name"]: entry
-            for entry in self.org_config.salesforce_client.describe()["sobjects"]
+            for entry in get_describe(
+                self.org_config, self.org_config.salesforce_client
+            )["sobjects"]
         }
 
         # Namespace injection
@@ -127,6 +136,12 @@ class DeleteData(BaseSalesforceApiTask):
     def _run_task(self):
         self._validate_and_inject_namespace()
 
+        # Look up all of the record counts in one request.
+        # The Record Count endpoint requires API 40.0.
+        record_counts = {}
+        if float(self.sf.sf_version) >= 40.0:
+            record_counts = get_record_counts(self.sf, self.sobjects)
+
         for obj in self.sobjects:
             query = f"SELECT Id FROM {obj}"
             if self.options["where"]:
@@ -135,13 +150,18 @@ class DeleteData(BaseSalesforceApiTask):
             qs = get_query_operation(
                 sobject=obj,
                 fields=["Id"],
-                api_options={},
+                api_options=self.poll_options,
                 context=self,
                 query=query,
                 api=self.options["api"],
+                volume=record_counts.get(obj),
             )
 
-            self.logger.info(f"Querying for {obj} objects")
+            volume = record_counts.get(obj)
+            self.logger.info(
+                f"Querying for {obj} objects using the {qs.api.value} API"
+                + (f" (about {volume} records)" if volume is not None else "")
+            )
             qs.query()
             if qs.job_result.status is not DataOperationStatus.SUCCESS:
                 raise BulkDataException(
@@ -162,7 +182,7 @@ class DeleteData(BaseSalesforceApiTask):
                     else DataOperationType.DELETE
                 ),
                 fields=["Id"],
-                api_options={},
+                api_options=self.poll_options,
                 context=self,
                 api=self.options["api"],
                 volume=qs.job_result.records_processed,
@@ -1,15 +1,24 @@
-import csv
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import itertools
+import os
+import tempfile
+from sqlalchemy import bindparam
 from sqlalchemy import create_engine
 from sqlalchemy import Column
+from sqlalchemy import exists
+from sqlalchemy import func
+from sqlalchemy import Index
 from sqlalchemy import Integer
 from sqlalchemy import MetaData
 from sqlalchemy import Table
 from sqlalchemy import Unicode
+from sqlalchemy import select
 from sqlalchemy.orm import create_session, mapper
 from sqlalchemy.ext.automap import automap_base
-import tempfile
 
 from cumulusci.core.exceptions import TaskOptionsError, BulkDataException
+from cumulusci.tasks.bulkdata.checkpoints import ExtractWatermarks
+from cumulusci.tasks.bulkdata.dataset_files import hash_mapping, write_dataset
 from cumulusci.tasks.bulkdata.utils import (
     SqlAlchemyMixin,
     create_table,
@@ -20,7 +29,10 @@ from cumulusci.tasks.salesforce import BaseSalesforceApiTask
 from cumulusci.tasks.bulkdata.step import (
     DataOperationStatus,
     DataOperationType,
+    POLL_TASK_OPTIONS,
+    get_poll_options,
     get_query_operation,
+    get_record_counts,
 )
 from cumulusci.tasks.bulkdata.dates import (
     adjust_relative_dates,
@@ -47,6 +59,11 @@ class ExtractData(SqlAlchemyMixin, BaseSalesforceApiTask):
             "description": "If set, an SQL script will be generated at the path provided "
             + "This is useful for keeping data in the repository and allowing diffs."
         },
+        "dataset_path": {
+            "description": "If set, the data is written to a directory at the path provided as a "
+            "compressed dataset, with a file for each table, which load_dataset can read with its "
+            "dataset_path option. This is much smaller than an SQL script."
+        },
         "inject_namespaces": {
             "description": "If True, the package namespace prefix will be automatically added to objects "
             "and fields for which it is present in the org. Defaults to True."
@@ -54,20 +71,39 @@ class ExtractData(SqlAlchemyMixin, BaseSalesforceApiTask):
         "drop_missing_schema": {
             "description": "Set to True to skip any missing objects or fields instead of stopping with an error."
         },
+        "max_parallel_queries": {
+            "description": "The maximum number of query jobs to run at the same time. "
+            "The records of each query are stored as soon as it completes. "
+            "Defaults to 1, which extracts one mapping step at a time in mapping order."
+        },
+        "incremental": {
+            "description": "If True, extract only the records modified since the previous incremental "
+            "extract into the same database_url, updating the records that were extracted before "
+            "and adding new ones. Requires database_url. Defaults to False."
+        },
+        **POLL_TASK_OPTIONS,
     }
+    # Number of records upserted at a time by an incremental extract
+    incremental_chunk_size = 500
 
     def _init_options(self, kwargs):
         super(ExtractData, self)._init_options(kwargs)
         if self.options.get("database_url"):
             # prefer database_url if it's set
             self.options["sql_path"] = None
+            self.options["dataset_path"] = None
+        elif self.options.get("dataset_path"):
+            self.options["dataset_path"] = os_friendly_path(
+                self.options["dataset_path"]
+            )
+            self.options["sql_path"] = None
         elif self.options.get("sql_path"):
             self.logger.info("Using in-memory sqlite database")
             self.options["database_url"] = "sqlite://"
             self.options["sql_path"] = os_friendly_path(self.options["sql_path"])
         else:
             raise TaskOptionsError(
-                "You must set either the database_url or sql_path option."
+                "You must set either the database_url, dataset_path or sql_path option."
             )
 
         self.options["inject_namespaces"] = process_bool_arg(
@@ -76,26 +112,60 @@ class ExtractData(SqlAlchemyMixin, BaseSalesforceApiTask):
         self.options["drop_missing_schema"] = process_bool_arg(
             self.options.get("drop_missing_schema", False)
         )
+        self.options["max_parallel_queries"] = int(
+            self.options.get("max_parallel_queries", 1)
+        )
+        self.poll_options = get_poll_options(self.options)
+        if self.options["max_parallel_queries"] < 1:
+            raise TaskOptionsError("max_parallel_queries must be at least 1")
+        self.options["incremental"] = process_bool_arg(
+            self.options.get("incremental", False)
+        )
+        if self.options["incremental"] and (
+            self.options["sql_path"] or self.options.get("dataset_path")
+        ):
+            raise TaskOptionsError(
+                "An incremental extract must be stored in a database_url."
+            )
+        self.record_counts = {}
+        self.watermarks = None
+        # The local ids of the rows each incremental extract stored in each
+        # table, or None for a table whose records were all extracted.
+        self.changed_row_ids = {}
 
     def _run_task(self):
         self._init_mapping()
         self._init_db()
+        self._init_record_counts()
 
-        for mapping in self.mapping.values():
-            soql = self._soql_for_mapping(mapping)
-            self._run_query(soql, mapping)
+        if self.options["max_parallel_queries"] > 1:
+            self._run_queries_in_parallel()
+        else:
+            for mapping in self.mapping.values():
+                soql = self._soql_for_mapping(mapping)
+                self._run_query(soql, mapping)
 
         self._map_autopks()
 
         if self.options.get("sql_path"):
             self._sqlite_dump()
+        elif self.options.get("dataset_path"):
+            self._write_dataset()
 
     def _init_db(self):
         """Initialize the database and automapper."""
         self.models = {}
 
         # initialize the DB engine
-        self.engine = create_engine(self.options["database_url"])
+        database_url = self.options.get("database_url")
+        if self.options.get("dataset_path"):
+            # Extract into a temporary database on disk, from which the
+            # dataset is written one table at a time.
+            self._temp_dir = tempfile.TemporaryDirectory()
+            database_url = (
+                f"sqlite:///{os.path.join(self._temp_dir.name, 'extract.db')}"
+            )
+        self.engine = create_engine(database_url)
 
         # initialize DB metadata
         self.metadata = MetaData()
@@ -111,6 +181,9 @@ class ExtractData(SqlAlchemyMixin, BaseSalesforceApiTask):
         # initialize session
         self.session = create_session(bind=self.engine, autocommit=False)
 
+        if self.options["incremental"]:
+            self.watermarks = ExtractWatermarks(self.session, self.metadata)
+
     def _init_mapping(self):
         """Load a YAML mapping file."""
         mapping_file_path = self.options["mapping"]
@@ -129,32 +202,118 @@ class ExtractData(SqlAlchemyMixin, BaseSalesforceApiTask):
             org_has_person_accounts_enabled=self.org_config.is_person_accounts_enabled,
         )
 
+    def _init_record_counts(self):
+        """Look up the record counts of all of the mapped sObjects in one request,
+        for API selection and progress reporting."""
+        # The Record Count endpoint requires API 40.0.
+        if float(self.sf.sf_version) >= 40.0:
+            sobjects = list(dict.fromkeys(m.sf_object for m in self.mapping.values()))
+            self.record_counts = get_record_counts(self.sf, sobjects)
+
     def _soql_for_mapping(self, mapping):
         """Return a SOQL query suitable for extracting data for this mapping."""
         sf_object = mapping.sf_object
-        fields = mapping.get_complete_field_map(include_id=True).keys()
+        fields = self._get_query_fields(mapping)
         soql = f"SELECT {', '.join(fields)} FROM {sf_object}"
 
+        filters = []
         if mapping.record_type:
-            soql += f" WHERE RecordType.DeveloperName = '{mapping.record_type}'"
+            filters.append(f"RecordType.DeveloperName = '{mapping.record_type}'")
+        watermark = self._get_watermark(mapping)
+        if watermark:
+            # The watermark is truncated to the second, so records modified
+            # within that second are extracted again, and updated in place.
+            filters.append(f"SystemModstamp >= {watermark}")
+        if filters:
+            soql += " WHERE " + " AND ".join(filters)
 
         return soql
 
+    def _get_query_fields(self, mapping):
+        """Return the fields to query for this mapping. An incremental extract
+        also queries SystemModstamp, as the last field, to set its watermark."""
+        fields = list(mapping.get_complete_field_map(include_id=True).keys())
+        if self.options["incremental"] and "SystemModstamp" not in fields:
+            fields.append("SystemModstamp")
+        return fields
+
+    def _get_step_name(self, mapping):
+        return next(name for name, step in self.mapping.items() if step is mapping)
+
+    def _get_watermark(self, mapping):
+        """Return the watermark of the previous incremental extract of this
+        mapping, or None if all of its records are to be extracted."""
+        if not self.options["incremental"]:
+            return None
+        return self.watermarks.get(self._get_step_name(mapping))
+
     def _run_query(self, soql, mapping):
         """Execute a Bulk or REST API query job and store the results."""
+        step = self._start_query(soql, mapping)
+        self._store_query_results(mapping, step)
+
+    def _run_queries_in_parallel(self):
+        """Run the query jobs of all mapping steps on a pool of worker threads,
+        storing the results of each query as soon as it completes.
+
+        Queries can run in any order, because lookups are only converted to
+        local keys once all records are stored. Only this thread writes to the
+        database. Once a query fails, no more queries are started; the queries
+        already running are allowed to finish before the first failure is raised."""
+        failure = None
+        with ThreadPoolExecutor(
+            max_workers=self.options["max_parallel_queries"]
+        ) as executor:
+            futures = {
+                executor.submit(
+                    self._start_query, self._soql_for_mapping(mapping), mapping
+                ): mapping
+                for mapping in self.mapping.values()
+            }
+            for future in as_completed(futures):
+                if failure:
+                    continue
+                try:
+                    self._store_query_results(futures[future], future.result())
+                except Exception as e:
+                    failure = e
+                    for pending in futures:
+                        pending.cancel()
+
+        if failure:
+            raise failure
+
+    def _start_query(self, soql, mapping):
+        """Execute a Bulk or REST API query job, returning its operation
+        once the job completes or, for PK-chunked queries, starts returning
+        results."""
         step = get_query_operation(
             sobject=mapping.sf_object,
             api=mapping.api,
-            fields=list(mapping.get_complete_field_map(include_id=True).keys()),
-            api_options={},
+            fields=self._get_query_fields(mapping),
+            api_options={
+                "pk_chunk_size": mapping.pk_chunk_size,
+                "concurrency": mapping.concurrency,
+                **self.poll_options,
+            },
             context=self,
             query=soql,
+            volume=self.record_counts.get(mapping.sf_object),
         )
 
-        self.logger.info(f"Extracting data for sObject {mapping['sf_object']}")
+        self.logger.info(
+            f"Extracting data for sObject {mapping['sf_object']} using the {step.api.value} API"
+            + self._describe_volume(mapping.sf_object)
+        )
         step.query()
-
-        if step.job_result.status is DataOperationStatus.SUCCESS:
+        return step
+
+    def _store_query_results(self, mapping, step):
+        """Store the results of a query job, raising BulkDataException if it failed."""
+        if step.job_result.status is DataOperationStatus.IN_PROGRESS:
+            # PK-chunked queries stream results as their chunks complete.
+            self._import_results(mapping, step)
+        elif step.job_result.status is DataOperationStatus.SUCCESS:
             if step.job_result.records_processed:
                 self._import_results(mapping, step)
             else:
@@ -164,6 +323,10 @@ class ExtractData(SqlAlchemyMixin, BaseSalesforceApiTask):
                 f"Unable to execute query: {','.join(step.job_result.job_errors)}"
             )
 
+    def _describe_volume(self, sobject):
+        volume = self.record_counts.get(sobject)
+        return f" (about {volume} records)" if volume is not None else ""
+
     def _import_results(self, mapping, step):
         """Ingest results from the Bulk API query."""
         conn = self.session.connection()
@@ -177,7 +340,28 @@ class ExtractData(SqlAlchemyMixin, BaseSalesforceApiTask):
             columns.append("record_type")
 
         # TODO: log_progress needs to know our batch size, when made configurable.
-        record_iterator = log_progress(step.get_results(), self.logger)
+        record_iterator = log_progress(
+            step.get_results(),
+            self.logger,
+            total=self.record_counts.get(mapping.sf_object),
+        )
+
+        # Note the latest SystemModstamp for an incremental extract's watermark,
+        # dropping the field if it was only queried for that.
+        previous_watermark = self._get_watermark(mapping)
+        latest_modstamp = ""
+        if self.options["incremental"]:
+            modstamp_index = self._get_query_fields(mapping).index("SystemModstamp")
+            queried_only = "SystemModstamp" not in field_map
+
+            def track_modstamp(record):
+                nonlocal latest_modstamp
+                # Bulk and REST results format the same UTC time differently.
+                latest_modstamp = max(latest_modstamp, record[modstamp_index][:19])
+                return record[:modstamp_index] if queried_only else record
+
+            record_iterator = (track_modstamp(record) for record in record_iterator)
+
         if record_type:
             record_iterator = (record + [record_type] for record in record_iterator)
 
@@ -210,7 +394,10 @@ class ExtractData(SqlAlchemyMixin, BaseSalesforceApiTask):
 
             record_iterator = (strip_name_field(record) for record in record_iterator)
 
-        if mapping.get_oid_as_pk():
+        if previous_watermark:
+            self._upsert_records(conn, mapping, columns, record_iterator)
+        elif mapping.get_oid_as_pk():
+            self.changed_row_ids[mapping.table] = None
             self._sql_bulk_insert_from_records(
                 connection=conn,
                 table=mapping.table,
@@ -218,36 +405,136 @@ class ExtractData(SqlAlchemyMixin, BaseSalesforceApiTask):
                 record_iterable=record_iterator,
             )
         else:
-            # If using the autogenerated id field, split out the returned records
-            # into two separate files and load into the main table and the sf_id_table
-
-            with tempfile.TemporaryFile("w+", newline="", encoding="utf-8") as f_values:
-                with tempfile.TemporaryFile(
-                    "w+", newline="", encoding="utf-8"
-                ) as f_ids:
-                    data_file_values, data_file_ids = self._split_batch_csv(
-                        record_iterator, f_values, f_ids
-                    )
-                    self._sql_bulk_insert_from_records(
-                        connection=conn,
-                        table=mapping.table,
-                        columns=columns[1:],  # Strip off the Id column
-                        record_iterable=csv.reader(data_file_values),
-                    )
-                    self._sql_bulk_insert_from_records(
-                        connection=conn,
-                        table=mapping.get_sf_id_table(),
-                        columns=["sf_id"],
-                        record_iterable=csv.reader(data_file_ids),
-                    )
+            self.changed_row_ids[mapping.table] = None
+            # If using the autogenerated id field, split each returned record
+            # between the main table and the sf_id_table as it is inserted.
+            self._sql_bulk_insert_split_records(
+                connection=conn,
+                tables=[
+                    # Strip off the Id column
+                    (mapping.table, columns[1:], slice(1, None)),
+                    (self._get_sf_id_table(mapping), ["sf_id"], slice(1)),
+                ],
+                record_iterable=record_iterator,
+            )
 
         if "RecordTypeId" in mapping.fields:
+            if previous_watermark:
+                # Record Types are extracted again in full.
+                conn.execute(
+                    self.metadata.tables[
+                        mapping.get_source_record_type_table()
+                    ].delete()
+                )
             self._extract_record_types(
                 mapping.sf_object, mapping.get_source_record_type_table(), conn
             )
 
+        if latest_modstamp:
+            self.watermarks.set(self._get_step_name(mapping), latest_modstamp + "Z")
+
         self.session.commit()
 
+    def _upsert_records(self, connection, mapping, columns, record_iterable):
+        """Store the records of an incremental extract, updating the rows of
+        records that were extracted before and inserting the others.
+
+        The first column of each record is its Salesforce Id. The local ids
+        of the stored rows are noted, so that only their lookups are converted."""
+        table = self.metadata.tables[mapping.table]
+        changed_row_ids = self.changed_row_ids.setdefault(mapping.table, set())
+        if mapping.get_oid_as_pk():
+            id_column = table.columns[columns[0]]
+        else:
+            id_column = table.columns.id
+            sf_id_table = self.metadata.tables[self._get_sf_id_table(mapping)]
+            next_id = (
+                connection.execute(select([func.max(sf_id_table.columns.id)])).scalar()
+                or 0
+            )
+        value_columns = columns[1:]
+        update = (
+            table.update()
+            .where(id_column == bindparam("_id"))
+            .values(
+                {
+                    table.columns[column]: bindparam(f"_{index}")
+                    for index, column in enumerate(value_columns)
+                }
+            )
+        )
+
+        records = iter(record_iterable)
+        while True:
+            chunk = list(itertools.islice(records, self.incremental_chunk_size))
+            if not chunk:
+                break
+
+            sf_ids = [record[0] for record in chunk]
+            if mapping.get_oid_as_pk():
+                existing = {
+                    sf_id: sf_id
+                    for sf_id, in connection.execute(
+                        select([id_column]).where(id_column.in_(sf_ids))
+                    )
+                }
+            else:
+                existing = dict(
+                    connection.execute(
+                        select(
+                            [sf_id_table.columns.sf_id, sf_id_table.columns.id]
+                        ).where(sf_id_table.columns.sf_id.in_(sf_ids))
+                    ).fetchall()
+                )
+
+            updates = [
+                {
+                    "_id": existing[record[0]],
+                    **{f"_{index}": value for index, value in enumerate(record[1:])},
+                }
+                for record in chunk
+                if record[0] in existing
+            ]
+            if updates:
+                connection.execute(update, updates)
+                if changed_row_ids is not None:
+                    changed_row_ids.update(row["_id"] for row in updates)
+
+            new_records = [record for record in chunk if record[0] not in existing]
+            if not new_records:
+                continue
+            if mapping.get_oid_as_pk():
+                self._sql_bulk_insert_from_records(
+                    connection=connection,
+                    table=mapping.table,
+                    columns=columns,
+                    record_iterable=new_records,
+                )
+            else:
+                # Number the new records after those already extracted.
+                new_ids = range(next_id + 1, next_id + 1 + len(new_records))
+                next_id += len(new_records)
+                if changed_row_ids is not None:
+                    changed_row_ids.update(new_ids)
+                self._sql_bulk_insert_from_records(
+                    connection=connection,
+                    table=mapping.table,
+                    columns=["id"] + value_columns,
+                    record_iterable=(
+                        [new_id] + record[1:]
+                        for new_id, record in zip(new_ids, new_records)
+                    ),
+                )
+                self._sql_bulk_insert_from_records(
+                    connection=connection,
+                    table=sf_id_table.name,
+                    columns=["id", "sf_id"],
+                    record_iterable=(
+                        [new_id, record[0]]
+                        for new_id, record in zip(new_ids, new_records)
+                    ),
+                )
+
     def _map_autopks(self):
         # Convert Salesforce Ids to autopks
         for m in self.mapping.values():
@@ -256,52 +543,103 @@ class ExtractData(SqlAlchemyMixin, BaseSalesforceApiTask):
                 if lookup_keys:
                     self._convert_lookups_to_id(m, lookup_keys)
 
-        # Drop sf_id tables
+        # Drop sf_id tables. An incremental extract keeps them, to match the
+        # records it extracts next time to those it already stored.
+        if self.options["incremental"]:
+            return
         for m in self.mapping.values():
             if not m.get_oid_as_pk():
                 self.metadata.tables[m.get_sf_id_table()].drop()
 
+    def _get_sf_id_table(self, mapping):
+        """Return the name of the table that stores the Salesforce Ids of the
+        mapping's records. An incremental extract keeps these tables, so they
+        are named apart from the Id tables that load_dataset creates."""
+        if self.options["incremental"]:
+            return f"{mapping.table}_extract_sf_ids"
+        return mapping.get_sf_id_table()
+
     def _get_mapping_for_table(self, table):
         """Return the first mapping for a table name """
         for mapping in self.mapping.values():
             if mapping["table"] == table:
                 return mapping
 
-    def _split_batch_csv(self, records, f_values, f_ids):
-        """Split the record generator and return two files,
-        one containing Ids only and the other record data."""
-        writer_values = csv.writer(f_values)
-        writer_ids = csv.writer(f_ids)
-        for row in records:
-            writer_values.writerow(row[1:])
-            writer_ids.writerow(row[:1])
-        f_values.seek(0)
-        f_ids.seek(0)
-        return f_values, f_ids
-
     def _convert_lookups_to_id(self, mapping, lookup_keys):
         """Rewrite persisted Salesforce Ids to refer to auto-PKs."""
-        for lookup_key in lookup_keys:
-            lookup_info = mapping.lookups[lookup_key]
-            model = self.models[mapping.table]
-            lookup_mapping = self._get_mapping_for_table(lookup_info.table)
-            lookup_model = self.models[lookup_mapping.get_sf_id_table()]
-            key_field = lookup_info.get_lookup_key_field()
-            key_attr = getattr(model, key_field)
-            try:
-                self.session.query(model).filter(
-                    key_attr.isnot(None), key_attr == lookup_model.sf_id
-                ).update({key_attr: lookup_model.id}, synchronize_session=False)
-            except NotImplementedError:
-                # Some databases such as sqlite don't support multitable update
-                mappings = []
-                for row, lookup_id in self.session.query(model, lookup_model.id).join(
-                    lookup_model, key_attr == lookup_model.sf_id
-                ):
-                    mappings.append({"id": row.id, key_field: lookup_id})
-                self.session.bulk_update_mappings(model, mappings)
+        model = self.models[mapping.table]
+        for row_ids in self._iter_changed_row_ids(mapping):
+            for lookup_key in lookup_keys:
+                lookup_info = mapping.lookups[lookup_key]
+                lookup_mapping = self._get_mapping_for_table(lookup_info.table)
+                lookup_model = self.models[self._get_sf_id_table(lookup_mapping)]
+                key_field = lookup_info.get_lookup_key_field()
+                key_attr = getattr(model, key_field)
+                filters = [key_attr.isnot(None), key_attr == lookup_model.sf_id]
+                if row_ids is not None:
+                    filters.append(model.id.in_(row_ids))
+                try:
+                    self.session.query(model).filter(*filters).update(
+                        {key_attr: lookup_model.id}, synchronize_session=False
+                    )
+                except NotImplementedError:
+                    # Some databases such as sqlite don't support multitable update
+                    self._convert_lookup_with_subquery(
+                        self.metadata.tables[mapping.table],
+                        key_field,
+                        self.metadata.tables[self._get_sf_id_table(lookup_mapping)],
+                        row_ids,
+                    )
         self.session.commit()
 
+    def _iter_changed_row_ids(self, mapping):
+        """Yield the local ids of the rows of the mapping's table whose lookups
+        are to be converted, in chunks, or yield None once to convert all rows.
+
+        An incremental extract only converts the lookups of the rows it stored,
+        since the lookups of the other rows were converted before."""
+        if not self.options["incremental"]:
+            yield None
+            return
+        if mapping.table not in self.changed_row_ids:
+            return
+
+        row_ids = self.changed_row_ids[mapping.table]
+        if row_ids is None:
+            yield None
+            return
+        row_ids = sorted(row_ids)
+        for start in range(0, len(row_ids), self.incremental_chunk_size):
+            yield row_ids[start : start + self.incremental_chunk_size]
+
+    def _convert_lookup_with_subquery(
+        self, table, key_field, sf_id_table, row_ids=None
+    ):
+        """Rewrite the Salesforce Ids in a lookup column to auto-PKs with a
+        correlated subquery, without loading any rows.
+
+        Only the rows with the given local ids are rewritten, if any are given.
+        Keys that don't match a record in the sf_id table are left as they are."""
+        self._index_sf_id_table(sf_id_table)
+        key_column = table.columns[key_field]
+        matches = sf_id_table.columns.sf_id == key_column
+        update = table.update().where(key_column.isnot(None))
+        if row_ids is not None:
+            update = update.where(table.columns.id.in_(row_ids))
+        self.session.execute(
+            update.where(exists().where(matches)).values(
+                {key_column: select([sf_id_table.columns.id]).where(matches)}
+            )
+        )
+
+    def _index_sf_id_table(self, sf_id_table):
+        """Index the sf_id column, so that each lookup is matched without
+        scanning the table. The index is dropped along with the table."""
+        if not sf_id_table.indexes:
+            Index(f"ix_{sf_id_table.name}_sf_id", sf_id_table.columns.sf_id).create(
+                self.session.connection()
+            )
+
     def _create_tables(self):
         """Create a table for each mapping step."""
         for mapping in self.mapping.values():
@@ -314,7 +652,8 @@ class ExtractData(SqlAlchemyMixin, BaseSalesforceApiTask):
         mapper_kwargs = {}
         self.models[mapping.table] = type(model_name, (object,), {})
 
-        t = create_table(mapping, self.metadata)
+        # An incremental extract adds to the tables of its previous runs.
+        t = create_table(mapping, self.metadata, exists_ok=self.options["incremental"])
 
         if "RecordTypeId" in mapping.fields:
             # We're using Record Type Mapping support.
@@ -323,21 +662,30 @@ class ExtractData(SqlAlchemyMixin, BaseSalesforceApiTask):
                 self._create_record_type_table(mapping.get_source_record_type_table())
 
         if not mapping.get_oid_as_pk():
+            sf_id_table = self._get_sf_id_table(mapping)
             # If multiple mappings point to the same table, don't recreate the table
-            if mapping.get_sf_id_table() not in self.models:
-                sf_id_model_name = f"{mapping.get_sf_id_table()}Model"
-                self.models[mapping.get_sf_id_table()] = type(
-                    sf_id_model_name, (object,), {}
-                )
+            if sf_id_table not in self.models:
+                sf_id_model_name = f"{sf_id_table}Model"
+                self.models[sf_id_table] = type(sf_id_model_name, (object,), {})
                 sf_id_fields = [
                     Column("id", Integer(), primary_key=True, autoincrement=True),
-                    Column("sf_id", Unicode(24)),
+                    # An incremental extract matches the records of each run
+                    # to those it stored before by their Salesforce Ids.
+                    Column("sf_id", Unicode(24), index=self.options["incremental"]),
                 ]
-                id_t = Table(mapping.get_sf_id_table(), self.metadata, *sf_id_fields)
-                mapper(self.models[mapping.get_sf_id_table()], id_t)
+                id_t = Table(sf_id_table, self.metadata, *sf_id_fields)
+                mapper(self.models[sf_id_table], id_t)
 
         mapper(self.models[mapping.table], t, **mapper_kwargs)
 
+    def _write_dataset(self):
+        """Write the extracted tables as a compressed dataset."""
+        path = self.options["dataset_path"]
+        self.logger.info(f"Writing dataset to {path}")
+        write_dataset(
+            self.session.connection(), path, hash_mapping(self.options["mapping"])
+        )
+
     def _sqlite_dump(self):
         """Write a SQLite script output file."""
         path = self.options["sql_path"]
@@ -7,6 +7,7 @@ import yaml
 from cumulusci.core.utils import process_list_arg, process_bool_arg
 from cumulusci.tasks.salesforce import BaseSalesforceApiTask
 from cumulusci.core.exceptions import TaskOptionsError
+from cumulusci.salesforce_api.describe_cache import get_describe
 
 
 class GenerateMapping(BaseSalesforceApiTask):
@@ -89,7 +90,7 @@ class GenerateMapping(BaseSalesforceApiTask):
         self.mapping_objects = self.options["include"]
 
         # Cache the global describe, which we'll walk.
-        self.global_describe = self.sf.describe()
+        self.global_describe = get_describe(self.org_config, self.sf)
 
         sobject_names = set(obj["name"] for obj in self.global_describe["sobjects"])
 
@@ -104,7 +105,9 @@ class GenerateMapping(BaseSalesforceApiTask):
         # (c) not ours (standard or other package), but have fields with our namespace or no namespace
         self.describes = {}  # Cache per-object describes for efficiency
         for obj in self.global_describe["sobjects"]:
-            self.describes[obj["name"]] = getattr(self.sf, obj["name"]).describe()
+            self.describes[obj["name"]] = get_describe(
+                self.org_config, self.sf, obj["name"]
+            )
             if self._is_our_custom_api_name(obj["name"]) or self._has_our_custom_fields(
                 self.describes[obj["name"]]
             ):
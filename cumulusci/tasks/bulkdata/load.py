@@ -1,25 +1,64 @@
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+import os
+from pathlib import Path
+import re
+import sqlite3
+import tempfile
+import threading
 from unittest.mock import MagicMock
 from typing import Union
 
-from sqlalchemy import Column, MetaData, Table, Unicode, create_engine, text, func
-from sqlalchemy.orm import aliased, Session
+from salesforce_bulk import BulkApiError
+from sqlalchemy import (
+    Column,
+    Index,
+    MetaData,
+    String,
+    Table,
+    Unicode,
+    cast,
+    create_engine,
+    event,
+    exists,
+    text,
+    func,
+)
+from sqlalchemy.orm import aliased, scoped_session, sessionmaker, Session
 from sqlalchemy.ext.automap import automap_base
 
 from cumulusci.core.exceptions import BulkDataException, TaskOptionsError
 from cumulusci.core.utils import process_bool_arg
+from cumulusci.tasks.bulkdata.checkpoints import LoadCheckpoints
+from cumulusci.tasks.bulkdata.dataset_files import (
+    define_table,
+    hash_mapping,
+    iter_rows,
+    read_manifest,
+)
 from cumulusci.tasks.bulkdata.utils import (
+    LocalIdStore,
     SqlAlchemyMixin,
     RowErrorChecker,
+    spool_records,
 )
 from cumulusci.tasks.bulkdata.dates import (
     adjust_relative_dates,
 )
 from cumulusci.tasks.bulkdata.step import (
+    DEFAULT_CONCURRENCY,
+    SMART_BULK_THRESHOLD,
+    DataApi,
     DataOperationStatus,
     DataOperationType,
     DataOperationJobResult,
+    BulkApiDmlOperation,
+    POLL_TASK_OPTIONS,
     get_dml_operation,
+    get_poll_options,
+    get_query_operation,
+    org_request_slots,
 )
 from cumulusci.tasks.salesforce import BaseSalesforceApiTask
 from cumulusci.utils import os_friendly_path
@@ -31,6 +70,43 @@ from cumulusci.tasks.bulkdata.mapping_parser import (
     MappingLookup,
 )
 
+# Actions that can create records, whose new Ids are stored.
+CREATE_ACTIONS = (DataOperationType.INSERT, DataOperationType.UPSERT)
+# The schema name under which a SQLite dataset passed as sql_path is attached.
+DATASET_SCHEMA = "dataset"
+# The amount of SQL text to import between commits, which bounds the size
+# of the write-ahead log.
+SQL_IMPORT_COMMIT_SIZE = 64 * 1024 * 1024
+# Allowance for the difference between our clock and Salesforce's when
+# querying records created since the load started.
+CREATED_DATE_MARGIN = timedelta(minutes=15)
+_TRANSACTION_STATEMENT = re.compile(r"\s*(BEGIN|COMMIT|END)\b[^;]*;\s*$", re.IGNORECASE)
+
+
+def _is_sqlite_database(path):
+    """Return whether the file is a SQLite database, rather than a script."""
+    with open(path, "rb") as f:
+        return f.read(16) == b"SQLite format 3\x00"
+
+
+def _iter_sql_statements(f):
+    """Yield the statements of a SQL script read from a text file, one at a
+    time, without reading the whole script into memory."""
+    statement = ""
+    for line in f:
+        parts = line.split(";")
+        for i, part in enumerate(parts):
+            if i < len(parts) - 1:
+                statement += part + ";"
+                # Semicolons may also appear in strings and trigger bodies.
+                if sqlite3.complete_statement(statement):
+                    yield statement
+                    statement = ""
+            else:
+                statement += part
+    if statement.strip():
+        yield statement
+
 
 class LoadData(SqlAlchemyMixin, BaseSalesforceApiTask):
     """Perform Bulk API operations to load data defined by a mapping from a local store into an org."""
@@ -48,7 +124,12 @@ class LoadData(SqlAlchemyMixin, BaseSalesforceApiTask):
             "required": False,
         },
         "sql_path": {
-            "description": "If specified, a database will be created from an SQL script at the provided path"
+            "description": "If specified, a database will be created from an SQL script at the provided path. "
+            "The path may also be a SQLite database file, which is read without being modified."
+        },
+        "dataset_path": {
+            "description": "If specified, a database will be created from the compressed dataset "
+            "written by extract_dataset's dataset_path option to the directory at the provided path."
         },
         "ignore_row_errors": {
             "description": "If True, allow the load to continue even if individual rows fail to load."
@@ -67,6 +148,27 @@ class LoadData(SqlAlchemyMixin, BaseSalesforceApiTask):
         "drop_missing_schema": {
             "description": "Set to True to skip any missing objects or fields instead of stopping with an error."
         },
+        "max_parallel_steps": {
+            "description": "The maximum number of mapping steps to load at the same time. "
+            "A step starts once the steps it depends on have completed. "
+            "Requires a database_url for a database server, such as PostgreSQL. "
+            "Defaults to 1, which loads steps one at a time in mapping order."
+        },
+        "explain": {
+            "description": "If True, log the database's query plan for each step, "
+            "to help diagnose slow queries against large datasets. Defaults to False."
+        },
+        "checkpoint": {
+            "description": "If True, record the load's progress in a cumulusci_load_checkpoints table "
+            "in the database, so that the load can be resumed if it is interrupted. "
+            "Requires a database_url. Defaults to False."
+        },
+        "resume": {
+            "description": "If True, resume a load that was interrupted, using the progress it recorded "
+            "in the database: completed steps are skipped, and records whose Salesforce Ids were "
+            "stored are not loaded again. Implies checkpoint. Requires a database_url. Defaults to False."
+        },
+        **POLL_TASK_OPTIONS,
     }
     row_warning_limit = 10
 
@@ -79,12 +181,19 @@ class LoadData(SqlAlchemyMixin, BaseSalesforceApiTask):
         if self.options.get("database_url"):
             # prefer database_url if it's set
             self.options["sql_path"] = None
+            self.options["dataset_path"] = None
+        elif self.options.get("dataset_path"):
+            self.options["dataset_path"] = os_friendly_path(
+                self.options["dataset_path"]
+            )
+            self.options["sql_path"] = None
+            self.options["database_url"] = None
         elif self.options.get("sql_path"):
             self.options["sql_path"] = os_friendly_path(self.options["sql_path"])
             self.options["database_url"] = None
         else:
             raise TaskOptionsError(
-                "You must set either the database_url or sql_path option."
+                "You must set either the database_url, dataset_path or sql_path option."
             )
         self.reset_oids = self.options.get("reset_oids", True)
         self.bulk_mode = (
@@ -99,12 +208,43 @@ class LoadData(SqlAlchemyMixin, BaseSalesforceApiTask):
         self.options["drop_missing_schema"] = process_bool_arg(
             self.options.get("drop_missing_schema", False)
         )
+        self.options["max_parallel_steps"] = int(
+            self.options.get("max_parallel_steps", 1)
+        )
+        if self.options["max_parallel_steps"] < 1:
+            raise TaskOptionsError("max_parallel_steps must be at least 1")
+        self.options["explain"] = process_bool_arg(self.options.get("explain", False))
+        self.poll_options = get_poll_options(self.options)
+        self.options["resume"] = process_bool_arg(self.options.get("resume", False))
+        if self.options["resume"]:
+            # The Id tables hold the progress we're resuming from.
+            self.reset_oids = False
+        self.options["checkpoint"] = (
+            process_bool_arg(self.options.get("checkpoint", False))
+            or self.options["resume"]
+        )
+        self._metadata_lock = threading.Lock()
+        self._table_row_counts = {}
+        self.checkpoints = None
+        self.load_started = None
 
     def _run_task(self):
         self._init_mapping()
         self._init_db()
         self._expand_mapping()
 
+        steps = self._get_steps_to_run()
+        if self.options["max_parallel_steps"] > 1:
+            self._run_steps_in_parallel(steps)
+        else:
+            for step in steps:
+                self._run_step(*step)
+
+    def _get_steps_to_run(self):
+        """Return (name, mapping, is_after_step) for each step to run, in the
+        order they would run one at a time: mapping order, with each step's
+        post-load steps right after it, skipping steps before start_step."""
+        steps = []
         start_step = self.options.get("start_step")
         started = False
         for name, mapping in self.mapping.items():
@@ -114,57 +254,380 @@ class LoadData(SqlAlchemyMixin, BaseSalesforceApiTask):
                 continue
 
             started = True
-
-            self.logger.info(f"Running step: {name}")
-            result = self._execute_step(mapping)
-            if result.status is DataOperationStatus.JOB_FAILURE:
-                raise BulkDataException(
-                    f"Step {name} did not complete successfully: {','.join(result.job_errors)}"
-                )
+            steps.append((name, mapping, False))
 
             if name in self.after_steps:
                 for after_name, after_step in self.after_steps[name].items():
-                    self.logger.info(f"Running post-load step: {after_name}")
-                    result = self._execute_step(after_step)
-                    if result.status is DataOperationStatus.JOB_FAILURE:
-                        raise BulkDataException(
-                            f"Step {after_name} did not complete successfully: {','.join(result.job_errors)}"
+                    steps.append((after_name, after_step, True))
+
+        return steps
+
+    def _run_step(self, name, mapping, is_after_step):
+        """Execute a single step, raising BulkDataException if its job fails."""
+        if (
+            self.checkpoints
+            and self.options["resume"]
+            and self.checkpoints.is_completed(name)
+        ):
+            self.logger.info(f"Skipping completed step: {name}")
+            return
+
+        if is_after_step:
+            self.logger.info(f"Running post-load step: {name}")
+        else:
+            self.logger.info(f"Running step: {name}")
+        result = self._execute_step(mapping, step_name=name)
+        if result.status is DataOperationStatus.JOB_FAILURE:
+            raise BulkDataException(
+                f"Step {name} did not complete successfully: {','.join(result.job_errors)}"
+            )
+        if self.checkpoints:
+            self.checkpoints.complete(name)
+            self.session.commit()
+
+    def _run_steps_in_parallel(self, steps):
+        """Run steps on a pool of worker threads, starting each step as soon as
+        the steps it depends on have completed.
+
+        Once a step fails, no more steps are started; the steps already running
+        are allowed to finish before the first failure is raised."""
+        max_workers = self.options["max_parallel_steps"]
+        dependencies = self._get_step_dependencies([mapping for _, mapping, _ in steps])
+        pending = list(range(len(steps)))
+        completed = set()
+        running = {}
+        failure = None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending or running:
+                # Start ready steps, earliest in the mapping first.
+                for index in list(pending):
+                    if len(running) >= max_workers:
+                        break
+                    if dependencies[index] <= completed:
+                        pending.remove(index)
+                        future = executor.submit(
+                            self._run_step_in_worker, *steps[index]
                         )
+                        running[future] = index
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    try:
+                        future.result()
+                    except Exception as e:
+                        failure = failure or e
+                    else:
+                        completed.add(index)
+
+                if failure:
+                    pending = []
+
+        if failure:
+            raise failure
+
+    def _run_step_in_worker(self, name, mapping, is_after_step):
+        try:
+            self._run_step(name, mapping, is_after_step)
+        finally:
+            # Release this thread's database session.
+            self.session.remove()
+
+    @staticmethod
+    def _get_step_dependencies(mappings):
+        """Return, for each mapping step, the set of indexes of the earlier steps
+        that must complete before it can run.
+
+        A step depends on each earlier step that loads the same sObject or table,
+        that loads a table the step looks up to, or that looks up to the table
+        the step loads."""
+
+        def lookup_tables(mapping):
+            return {
+                lookup.table for lookup in mapping.lookups.values() if not lookup.after
+            }
+
+        tables = [lookup_tables(mapping) for mapping in mappings]
+
+        def conflict(i, j):
+            return (
+                mappings[i].sf_object == mappings[j].sf_object
+                or mappings[i].table == mappings[j].table
+                or mappings[i].table in tables[j]
+                or mappings[j].table in tables[i]
+            )
+
+        return [{j for j in range(i) if conflict(i, j)} for i in range(len(mappings))]
 
     def _execute_step(
-        self, mapping: MappingStep
+        self, mapping: MappingStep, step_name: str = None
     ) -> Union[DataOperationJobResult, MagicMock]:
-        """Load data for a single step."""
+        """Load data for a single step.
+
+        If step_name is given, the progress of an insert is checkpointed
+        under that name, and restored from if we're resuming."""
+        checkpoints = (
+            self.checkpoints if step_name and mapping.action in CREATE_ACTIONS else None
+        )
+        if checkpoints and self.options["resume"]:
+            self._recover_uploaded_batches(mapping, step_name)
 
         if "RecordTypeId" in mapping.fields:
             conn = self.session.connection()
             self._load_record_types([mapping.sf_object], conn)
             self.session.commit()
 
-        local_ids = []
+        self._create_step_indexes(mapping)
         query = self._query_db(mapping)
+        if self.options["explain"]:
+            self._explain_query(mapping, query)
+        volume = self._estimate_volume(mapping, query)
         bulk_mode = mapping.bulk_mode or self.bulk_mode or "Parallel"
         step = get_dml_operation(
             sobject=mapping.sf_object,
             operation=mapping.action,
-            api_options={"batch_size": mapping.batch_size, "bulk_mode": bulk_mode},
+            api_options={
+                "batch_size": mapping.batch_size,
+                "bulk_mode": bulk_mode,
+                "concurrency": mapping.concurrency,
+                "update_key": mapping.update_key,
+                **self.poll_options,
+            },
             context=self,
             fields=mapping.get_field_list(),
             api=mapping.api,
-            volume=query.count(),
+            volume=volume,
         )
 
-        step.start()
-        step.load_records(self._stream_queried_data(mapping, local_ids, query))
-        step.end()
+        # The local ids of the uploaded records, to be paired with the results.
+        local_ids = LocalIdStore()
+        try:
+            step.start()
+            if checkpoints:
+                checkpoints.start(step_name, getattr(step, "job_id", None))
+                self.session.commit()
+            records = self._stream_queried_data(mapping, local_ids, query, volume)
+
+            on_batch_persisted = None
+            if checkpoints and isinstance(step, BulkApiDmlOperation):
+                # Record each Bulk API batch as soon as it is uploaded, so that
+                # its results can be stored on resume if we're interrupted.
+                # Committing would end the query, so its rows are read first.
+                batch_ids = {}
+
+                def batch_uploaded(batch_id, offset, size):
+                    checkpoints.batch_uploaded(
+                        step_name,
+                        step.job_id,
+                        batch_id,
+                        local_ids[offset : offset + size],
+                    )
+                    self.session.commit()
+                    batch_ids[offset] = batch_id
+
+                def batch_persisted(offset):
+                    checkpoints.batch_persisted(step_name, batch_ids[offset])
 
-        if step.job_result.status is not DataOperationStatus.JOB_FAILURE:
-            self._process_job_results(mapping, step, local_ids)
+                step.load_records(
+                    spool_records(records), on_batch_uploaded=batch_uploaded
+                )
+                on_batch_persisted = batch_persisted
+            else:
+                step.load_records(records)
+
+            self._process_job_results(mapping, step, local_ids, on_batch_persisted)
+        finally:
+            local_ids.close()
 
         return step.job_result
 
-    def _stream_queried_data(self, mapping, local_ids, query):
-        """Get data from the local db"""
+    def _create_step_indexes(self, mapping):
+        """Index the columns that the step's query joins and sorts on, so that
+        lookups against large tables don't degrade to repeated table scans."""
+        model = self.models[mapping.table]
+        columns = []
+        for lookup in mapping.lookups.values():
+            if not lookup.after:
+                columns.append(
+                    model.__table__.columns[lookup.get_lookup_key_field(model)]
+                )
+                id_table = self.metadata.tables.get(f"{lookup.table}_sf_ids")
+                if id_table is not None:
+                    columns.append(id_table.columns.id)
+
+        if "RecordTypeId" in mapping.fields:
+            for table_name in (
+                mapping.get_source_record_type_table(),
+                mapping.get_destination_record_type_table(),
+            ):
+                rt_table = self.metadata.tables.get(table_name)
+                if rt_table is not None:
+                    columns.append(rt_table.columns.record_type_id)
+                    columns.append(rt_table.columns.developer_name)
+
+        with self._metadata_lock:
+            for column in columns:
+                self._ensure_index(column)
+        self.session.commit()
+
+    def _ensure_index(self, column):
+        """Create an index on the column unless one already leads with it,
+        or its table is read-only."""
+        table = column.table
+        if table.name in self._read_only_tables:
+            return
+        leading_columns = [list(index.columns)[:1] for index in table.indexes]
+        leading_columns.append(list(table.primary_key.columns)[:1])
+        if any(
+            leading and leading[0].name == column.name for leading in leading_columns
+        ):
+            return
+
+        index = Index(f"ix_{table.name}_{column.name}", column)
+        self.logger.info(f"Creating index {index.name}")
+        index.create(bind=self.session.connection())
+
+    def _explain_query(self, mapping, query):
+        """Log the database's plan for a step's query."""
+        compiled = query.statement.compile(dialect=self.engine.dialect)
+        if compiled.positional:
+            params = [[compiled.params[name] for name in compiled.positiontup]]
+        else:
+            params = [compiled.params]
+        prefix = (
+            "EXPLAIN QUERY PLAN" if self.engine.dialect.name == "sqlite" else "EXPLAIN"
+        )
+        plan = self.session.connection().execute(f"{prefix} {compiled}", *params)
+        self.logger.info(f"Query plan for {mapping.sf_object} from {mapping.table}:")
+        for row in plan:
+            self.logger.info(f"  {row[-1]}")
+
+    def _recover_uploaded_batches(self, mapping, step_name):
+        """Store the results of Bulk API batches that an interrupted load
+        uploaded for this step, so that their records aren't loaded again."""
+        uploaded = self.checkpoints.uploaded_batches(step_name)
+        if not uploaded:
+            if self.checkpoints.was_started(step_name):
+                self.logger.warning(
+                    f"Step {step_name} was interrupted before any of its batches were recorded "
+                    "as uploaded. Records it loaded whose Ids were not stored will be loaded again."
+                )
+            return
+
+        self.logger.info(
+            f"Recovering results of {len(uploaded)} batches uploaded by step {step_name}"
+        )
+        id_table_name = self._initialize_id_table(mapping, self.reset_oids)
+        error_checker = RowErrorChecker(
+            self.logger, self.options["ignore_row_errors"], self.row_warning_limit
+        )
+        step = BulkApiDmlOperation(
+            sobject=mapping.sf_object,
+            operation=mapping.action,
+            api_options=self.poll_options,
+            context=self,
+            fields=[],
+        )
+        for job_id in {job_id for job_id, _, _ in uploaded}:
+            local_ids = {
+                batch_id: ids
+                for batch_job_id, batch_id, ids in uploaded
+                if batch_job_id == job_id
+            }
+            try:
+                for batch_id, results in step.resume_batch_results(
+                    job_id, list(local_ids)
+                ):
+                    rows = list(
+                        self._generate_results_id_map(
+                            results, local_ids[batch_id], error_checker
+                        )
+                    )
+                    if rows:
+                        self._sql_bulk_insert_from_records(
+                            connection=self.session.connection(),
+                            table=id_table_name,
+                            columns=("id", "sf_id"),
+                            record_iterable=rows,
+                        )
+                    self.checkpoints.batch_persisted(step_name, batch_id)
+                    self.session.commit()
+            except BulkApiError as e:
+                # The job may have been deleted since the load was interrupted.
+                self.logger.warning(
+                    f"Could not recover the results of job {job_id}: {e}. "
+                    "Records it loaded whose Ids were not stored will be loaded again."
+                )
+
+        # The remaining batches failed, weren't processed or can't be
+        # recovered, so their records are queried again.
+        for _, batch_id, _ in uploaded:
+            self.checkpoints.batch_persisted(step_name, batch_id)
+        self.session.commit()
+
+    def _estimate_volume(self, mapping, query):
+        """Estimate the number of records a step will load, cheaply enough
+        to select an API without running the step's query twice.
+
+        The step's table row count is an upper bound. An exact count, without
+        the query's joins, is needed only if SMART API selection could go
+        either way: the step filters its table's rows, or the table's count
+        is a planner estimate close to the threshold."""
+        count, exact = self._count_table_rows(mapping.table)
+        if mapping.api is not DataApi.SMART:
+            return count
+
+        if query.whereclause is not None:
+            if count < SMART_BULK_THRESHOLD:
+                return count
+            return (
+                self.session.query(func.count())
+                .select_from(self.models[mapping.table].__table__)
+                .filter(query.whereclause)
+                .scalar()
+            )
+
+        if not exact and SMART_BULK_THRESHOLD / 2 <= count < SMART_BULK_THRESHOLD * 2:
+            return self._count_table_rows(mapping.table, exact=True)[0]
+
+        return count
+
+    def _count_table_rows(self, table_name, exact=False):
+        """Return (count, is_exact) for the rows of a table, cached for the run.
+
+        On PostgreSQL, the planner's row estimate is used unless `exact` is
+        set or the table has never been analyzed. Elsewhere, the rows of the
+        table are counted."""
+        cached = self._table_row_counts.get(table_name)
+        if cached and (cached[1] or not exact):
+            return cached
+
+        table = self.models[table_name].__table__
+        count = None
+        if not exact and self.engine.dialect.name == "postgresql":
+            estimate = self.session.execute(
+                text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)"),
+                {"name": self.engine.dialect.identifier_preparer.format_table(table)},
+            ).scalar()
+            # reltuples is negative or zero for tables that were never analyzed.
+            if estimate and estimate > 0:
+                count = (int(estimate), False)
+        if count is None:
+            count = (
+                self.session.query(func.count()).select_from(table).scalar(),
+                True,
+            )
+
+        self._table_row_counts[table_name] = count
+        return count
+
+    def _stream_queried_data(self, mapping, local_ids, query, volume=None):
+        """Get data from the local db, logging progress against the
+        estimated volume of the step."""
 
         statics = self._get_statics(mapping)
         total_rows = 0
@@ -190,8 +653,15 @@ class LoadData(SqlAlchemyMixin, BaseSalesforceApiTask):
             local_ids.append(pkey)
             yield row
 
+            if not total_rows % 10000:
+                self.logger.info(
+                    f"Prepared {total_rows}"
+                    + (f" of ~{volume}" if volume else "")
+                    + f" rows for {mapping.action.value} to {mapping.sf_object}"
+                )
+
         self.logger.info(
-            f"Prepared {total_rows} rows for {mapping['action']} to {mapping['sf_object']}"
+            f"Prepared {total_rows} rows for {mapping.action.value} to {mapping.sf_object}"
         )
 
     def _load_record_types(self, sobjects, conn):
@@ -241,10 +711,17 @@ class LoadData(SqlAlchemyMixin, BaseSalesforceApiTask):
         }
 
         for lookup in lookups.values():
-            lookup.aliased_table = aliased(
-                self.metadata.tables[f"{lookup.table}_sf_ids"]
-            )
-            columns.append(lookup.aliased_table.columns.sf_id)
+            if lookup.external_id_field:
+                # Send the external id of the related record itself.
+                lookup.aliased_table = aliased(self.metadata.tables[lookup.table])
+                columns.append(
+                    lookup.aliased_table.columns[self._get_external_id_column(lookup)]
+                )
+            else:
+                lookup.aliased_table = aliased(
+                    self.metadata.tables[f"{lookup.table}_sf_ids"]
+                )
+                columns.append(lookup.aliased_table.columns.sf_id)
 
         if "RecordTypeId" in mapping.fields:
             rt_dest_table = self.metadata.tables[
@@ -284,6 +761,20 @@ class LoadData(SqlAlchemyMixin, BaseSalesforceApiTask):
             # returns main obj even if lookup is null
             key_field = lookup.get_lookup_key_field(model)
             value_column = getattr(model, key_field)
+            key_column = model.__table__.columns.get(key_field)
+            if lookup.external_id_field:
+                target_table = self.metadata.tables[lookup.table]
+                target_id = target_table.primary_key.columns.keys()[0]
+                query = query.outerjoin(
+                    lookup.aliased_table,
+                    lookup.aliased_table.columns[target_id] == value_column,
+                )
+                query = query.order_by(value_column)
+                continue
+            if key_column is not None and not isinstance(key_column.type, String):
+                # Compare as strings, as the ids are stored, so that the
+                # join can use the id table's index.
+                value_column = cast(value_column, lookup.aliased_table.columns.id.type)
             query = query.outerjoin(
                 lookup.aliased_table,
                 lookup.aliased_table.columns.id == value_column,
@@ -293,6 +784,19 @@ class LoadData(SqlAlchemyMixin, BaseSalesforceApiTask):
             lookup_column = getattr(model, key_field)
             query = query.order_by(lookup_column)
 
+        # Skip records that an interrupted load already inserted.
+        if (
+            self.options["resume"]
+            and mapping.action in CREATE_ACTIONS
+            and f"{mapping.table}_sf_ids" in self.metadata.tables
+        ):
+            id_table = self.metadata.tables[f"{mapping.table}_sf_ids"]
+            local_id = getattr(model, id_column)
+            if not isinstance(model.__table__.columns[id_column].type, String):
+                # Compare as strings, as the ids are stored.
+                local_id = cast(local_id, id_table.columns.id.type)
+            query = query.filter(~exists().where(id_table.columns.id == local_id))
+
         # Filter out non-person account Contact records.
         # Contact records for person accounts were already created by the system.
         if mapping.sf_object == "Contact" and self._can_load_person_accounts(mapping):
@@ -300,29 +804,48 @@ class LoadData(SqlAlchemyMixin, BaseSalesforceApiTask):
 
         return query
 
-    def _process_job_results(self, mapping, step, local_ids):
-        """Get the job results and process the results. If we're raising for
-        row-level errors, do so; if we're inserting, store the new Ids."""
-        if mapping.action is DataOperationType.INSERT:
+    def _get_external_id_column(self, lookup):
+        """Return the column of the lookup's table that holds the external
+        id field, as mapped by a step that loads that table."""
+        for step in self.mapping.values():
+            if step.table == lookup.table and lookup.external_id_field in step.fields:
+                return step.fields[lookup.external_id_field]
+        return lookup.external_id_field
+
+    def _process_job_results(self, mapping, step, local_ids, on_batch_persisted=None):
+        """Finish the step's job and process the results of each batch as soon
+        as it completes. If we're raising for row-level errors, do so; if we're
+        inserting or upserting, store the new Ids of each batch, so that they
+        aren't lost if the load is interrupted before the job finishes.
+
+        on_batch_persisted, if given, is called with each batch's offset
+        before the transaction storing its Ids is committed."""
+        stores_ids = mapping.action in CREATE_ACTIONS
+        if stores_ids:
             id_table_name = self._initialize_id_table(mapping, self.reset_oids)
-            conn = self.session.connection()
 
-        results_generator = self._generate_results_id_map(step, local_ids)
-
-        # If we know we have no successful inserts, don't attempt to persist Ids.
-        # Do, however, drain the generator to get error-checking behavior.
-        if mapping.action is DataOperationType.INSERT and (
-            step.job_result.records_processed - step.job_result.total_row_errors
-        ):
-            self._sql_bulk_insert_from_records(
-                connection=conn,
-                table=id_table_name,
-                columns=("id", "sf_id"),
-                record_iterable=results_generator,
+        error_checker = RowErrorChecker(
+            self.logger, self.options["ignore_row_errors"], self.row_warning_limit
+        )
+        for offset, results in step.iter_batch_results():
+            id_map = self._generate_results_id_map(
+                results, local_ids[offset : offset + len(results)], error_checker
             )
-        else:
-            for r in results_generator:
-                pass  # Drain generator to validate results
+
+            # If we know we have no successful inserts, don't attempt to persist Ids.
+            # Do, however, drain the generator to get error-checking behavior.
+            rows = list(id_map)
+            if stores_ids and (rows or on_batch_persisted):
+                if rows:
+                    self._sql_bulk_insert_from_records(
+                        connection=self.session.connection(),
+                        table=id_table_name,
+                        columns=("id", "sf_id"),
+                        record_iterable=rows,
+                    )
+                if on_batch_persisted:
+                    on_batch_persisted(offset)
+                self.session.commit()
 
         # Contact records for Person Accounts are inserted during an Account
         # sf_object step.  Insert records into the Contact ID table for
@@ -330,30 +853,33 @@ class LoadData(SqlAlchemyMixin, BaseSalesforceApiTask):
         # person account Contact records get populated downstream as expected.
         if (
             mapping.action is DataOperationType.INSERT
+            and step.job_result.status is not DataOperationStatus.JOB_FAILURE
             and mapping.sf_object == "Contact"
             and self._can_load_person_accounts(mapping)
         ):
             account_id_lookup = mapping.lookups.get("AccountId")
             if account_id_lookup:
+                # The step loaded the table's other Contacts.
+                volume = max(
+                    self._count_table_rows(mapping.table)[0]
+                    - step.job_result.records_processed,
+                    0,
+                )
+                conn = self.session.connection()
                 self._sql_bulk_insert_from_records(
                     connection=conn,
                     table=id_table_name,
                     columns=("id", "sf_id"),
                     record_iterable=self._generate_contact_id_map_for_person_accounts(
-                        mapping, account_id_lookup, conn
+                        mapping, account_id_lookup, conn, volume
                     ),
                 )
+                self.session.commit()
 
-        if mapping.action is DataOperationType.INSERT:
-            self.session.commit()
-
-    def _generate_results_id_map(self, step, local_ids):
+    def _generate_results_id_map(self, results, local_ids, error_checker):
         """Consume results from load and prepare rows for id table.
         Raise BulkDataException on row errors if configured to do so."""
-        error_checker = RowErrorChecker(
-            self.logger, self.options["ignore_row_errors"], self.row_warning_limit
-        )
-        for result, local_id in zip(step.get_results(), local_ids):
+        for result, local_id in zip(results, local_ids):
             if result.success:
                 yield (local_id, result.id)
             else:
@@ -374,51 +900,156 @@ class LoadData(SqlAlchemyMixin, BaseSalesforceApiTask):
         if already_exists and not should_reset_table:
             return id_table_name
 
-        if not hasattr(self, "_initialized_id_tables"):
-            self._initialized_id_tables = set()
-        if id_table_name not in self._initialized_id_tables:
-            if already_exists:
-                self.metadata.remove(self.metadata.tables[id_table_name])
-            id_table = Table(
-                id_table_name,
-                self.metadata,
-                Column("id", Unicode(255), primary_key=True),
-                Column("sf_id", Unicode(18)),
-            )
-            if id_table.exists():
-                id_table.drop()
-            id_table.create()
-            self._initialized_id_tables.add(id_table_name)
+        with self._metadata_lock:
+            if not hasattr(self, "_initialized_id_tables"):
+                self._initialized_id_tables = set()
+            if id_table_name not in self._initialized_id_tables:
+                if already_exists:
+                    self.metadata.remove(self.metadata.tables[id_table_name])
+                id_table = Table(
+                    id_table_name,
+                    self.metadata,
+                    Column("id", Unicode(255), primary_key=True),
+                    Column("sf_id", Unicode(18)),
+                )
+                if id_table.exists():
+                    id_table.drop()
+                id_table.create()
+                self._initialized_id_tables.add(id_table_name)
         return id_table_name
 
     def _sqlite_load(self):
-        """Read a SQLite script and initialize the in-memory database."""
-        conn = self.session.connection()
-        cursor = conn.connection.cursor()
-        with open(self.options["sql_path"], "r", encoding="utf-8") as f:
-            try:
-                cursor.executescript(f.read())
-            finally:
-                cursor.close()
-        # self.session.flush()
+        """Stream a SQLite script into the temporary database, one statement
+        at a time, so that neither the script nor the dataset is held in memory."""
+        self.logger.info(f"Importing {self.options['sql_path']}")
+        connection = self.engine.raw_connection()
+        dbapi_connection = connection.connection
+        isolation_level = dbapi_connection.isolation_level
+        # Manage transactions ourselves; the database is discarded if the
+        # import fails, so it doesn't need to survive a crash.
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=OFF")
+            cursor.execute("BEGIN")
+            uncommitted = 0
+            with open(self.options["sql_path"], "r", encoding="utf-8") as f:
+                for statement in _iter_sql_statements(f):
+                    # The script's own transaction would end ours early.
+                    if _TRANSACTION_STATEMENT.match(statement):
+                        continue
+                    cursor.execute(statement)
+                    uncommitted += len(statement)
+                    if uncommitted >= SQL_IMPORT_COMMIT_SIZE:
+                        cursor.execute("COMMIT")
+                        cursor.execute("BEGIN")
+                        uncommitted = 0
+            cursor.execute("COMMIT")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        finally:
+            cursor.close()
+            dbapi_connection.isolation_level = isolation_level
+            connection.close()
+
+    def _dataset_load(self):
+        """Import a compressed dataset into the temporary database, inserting
+        each table's rows a chunk at a time as they are decompressed."""
+        dataset_path = self.options["dataset_path"]
+        self.logger.info(f"Importing dataset {dataset_path}")
+        manifest = read_manifest(dataset_path)
+        if manifest.get("mapping_hash") != hash_mapping(self.options["mapping"]):
+            self.logger.warning(
+                "The dataset was extracted with a different mapping file."
+            )
+
+        connection = self.session.connection()
+        for table_manifest in manifest["tables"]:
+            define_table(table_manifest, self.metadata).create(bind=connection)
+            self._sql_bulk_insert_from_records(
+                connection=connection,
+                table=table_manifest["name"],
+                columns=[column["name"] for column in table_manifest["columns"]],
+                record_iterable=iter_rows(dataset_path, table_manifest),
+            )
+        self.session.commit()
+
+    def _attach_sqlite_dataset(self):
+        """Reflect the tables of the read-only SQLite dataset attached to each
+        connection, without a schema, so that queries name them unqualified
+        and SQLite finds them in the attached database."""
+        dataset_metadata = MetaData()
+        dataset_metadata.reflect(bind=self.engine, schema=DATASET_SCHEMA)
+        for table in dataset_metadata.tables.values():
+            table.tometadata(self.metadata, schema=None)
+            self._read_only_tables.add(table.name)
 
     def _init_db(self):
         """Initialize the database and automapper."""
         # initialize the DB engine
-        database_url = self.options["database_url"] or "sqlite://"
+        sql_path = self.options.get("sql_path")
+        dataset_path = self.options.get("dataset_path")
+        dataset_uri = None
+        if sql_path or dataset_path:
+            # The dataset is imported into (or, if it's already a SQLite
+            # database, attached read-only to) a temporary database on disk,
+            # which also holds the tables the load writes.
+            self._temp_dir = tempfile.TemporaryDirectory()
+            database_url = f"sqlite:///{os.path.join(self._temp_dir.name, 'load.db')}"
+            if sql_path and _is_sqlite_database(sql_path):
+                self.logger.info(f"Reading SQLite database {sql_path}")
+                dataset_uri = Path(sql_path).resolve().as_uri() + "?mode=ro"
+        else:
+            database_url = self.options["database_url"] or "sqlite://"
         if database_url == "sqlite://":
             self.logger.info("Using in-memory SQLite database")
-        self.engine = create_engine(database_url)
 
-        # initialize the DB session
-        self.session = Session(self.engine)
+        connect_args = {}
+        if dataset_uri:
+            connect_args["uri"] = True
+        if self.options["max_parallel_steps"] > 1 and database_url.startswith("sqlite"):
+            # Each step stores its results in transactions of its own, which
+            # need a connection of their own. An in-memory SQLite database
+            # can't be shared between connections, and concurrent writers
+            # to a SQLite file fail once they time out waiting for its lock.
+            self.logger.warning(
+                "Loading steps in parallel requires a database_url for a database "
+                "server, such as PostgreSQL. Loading one step at a time."
+            )
+            self.options["max_parallel_steps"] = 1
+
+        if self.options["max_parallel_steps"] > 1:
+            self.engine = create_engine(
+                database_url, pool_size=self.options["max_parallel_steps"] + 1
+            )
+
+            # Each thread gets its own DB session, with its own connection.
+            self.session = scoped_session(sessionmaker(bind=self.engine))
+        else:
+            self.engine = create_engine(database_url, connect_args=connect_args)
+
+            # initialize the DB session
+            self.session = Session(self.engine)
+
+        if dataset_uri:
 
-        if self.options.get("sql_path"):
+            @event.listens_for(self.engine, "connect")
+            def attach_dataset(dbapi_connection, connection_record):
+                dbapi_connection.execute(
+                    f"ATTACH DATABASE ? AS {DATASET_SCHEMA}", (dataset_uri,)
+                )
+
+        elif sql_path:
             self._sqlite_load()
 
         # initialize DB metadata
         self.metadata = MetaData()
         self.metadata.bind = self.engine
+        self._read_only_tables = set()
+        if dataset_uri:
+            self._attach_sqlite_dataset()
+        elif dataset_path:
+            self._dataset_load()
 
         # initialize the automap mapping
         self.base = automap_base(bind=self.engine, metadata=self.metadata)
@@ -435,7 +1066,39 @@ class LoadData(SqlAlchemyMixin, BaseSalesforceApiTask):
                 self._create_record_type_table(
                     mapping.get_destination_record_type_table()
                 )
-        self.metadata.create_all()
+        self.metadata.create_all(
+            tables=[
+                table
+                for table in self.metadata.sorted_tables
+                if table.name not in self._read_only_tables
+            ]
+        )
+
+        if self.options["checkpoint"]:
+            # A temporary database doesn't outlive the load, so there's no
+            # point recording progress in it.
+            if (
+                sql_path
+                or dataset_path
+                or (
+                    self.engine.dialect.name == "sqlite"
+                    and self.engine.url.database in (None, "", ":memory:")
+                )
+            ):
+                raise TaskOptionsError(
+                    "The checkpoint and resume options require a database_url to a persistent database."
+                )
+            self.checkpoints = LoadCheckpoints(self.session, self.metadata)
+
+        if self.options["resume"]:
+            # The interrupted load may have created records before this one started.
+            self.load_started = self.checkpoints.load_started()
+        else:
+            self.load_started = datetime.now(timezone.utc)
+            if self.checkpoints:
+                self.checkpoints.clear()
+                self.checkpoints.start_load(self.load_started)
+                self.session.commit()
 
         self._validate_org_has_person_accounts_enabled_if_person_account_data_exists()
 
@@ -545,7 +1208,7 @@ class LoadData(SqlAlchemyMixin, BaseSalesforceApiTask):
         return query.filter(model.__table__.columns.get("IsPersonAccount") == "false")
 
     def _generate_contact_id_map_for_person_accounts(
-        self, contact_mapping, account_id_lookup, conn
+        self, contact_mapping, account_id_lookup, conn, volume
     ):
         """
         Yields (local_id, sf_id) for Contact records where IsPersonAccount
@@ -559,6 +1222,9 @@ class LoadData(SqlAlchemyMixin, BaseSalesforceApiTask):
         - Query Salesforce to get the map: Salesforce Account ID ->
           Salesforce Contact ID
         - Merge the maps
+
+        volume is the estimated number of person account Contact records.
+        Only Contacts created since the load started are queried.
         """
         # Contact table columns
         contact_model = self.models[contact_mapping.table]
@@ -590,30 +1256,90 @@ class LoadData(SqlAlchemyMixin, BaseSalesforceApiTask):
             )
         )
 
-        # Stream the results so we can process batches of 200 Contacts
-        # in case we have large data volumes.
-        query_result = conn.execution_options(stream_results=True).execute(
-            query.statement
+        where = "IsPersonAccount = true"
+        if self.load_started:
+            created_since = (self.load_started - CREATED_DATE_MARGIN).astimezone(
+                timezone.utc
+            )
+            where += (
+                f" AND CreatedDate >= {created_since.strftime('%Y-%m-%dT%H:%M:%SZ')}"
+            )
+        yield from self._generate_sibling_id_map(
+            conn, query, "Contact", "AccountId", where, volume
         )
 
-        while True:
-            # While we have a chunk to process
-            chunk = query_result.fetchmany(200)
-            if not chunk:
-                break
-
-            # Collect Map: Account SF ID --> Contact ID
-            contact_ids_by_account_sf_id = {record[1]: record[0] for record in chunk}
-
-            # Query Map: Account SF ID --> Contact SF ID
-            # It's safe to use query_all since the chunk size to 200.
-            for record in self.sf.query_all(
-                "SELECT Id, AccountId FROM Contact WHERE IsPersonAccount = true AND AccountId IN ('{}')".format(
-                    "','".join(contact_ids_by_account_sf_id.keys())
+    def _generate_sibling_id_map(
+        self, conn, local_query, sobject, parent_field, where, volume
+    ):
+        """Yield (local_id, sf_id) for records of sobject that Salesforce
+        created alongside records we inserted, such as the Contacts of
+        Person Accounts.
+
+        local_query selects (local id, parent Salesforce Id) for each record
+        to map. Records are matched on the parent Id in their parent_field,
+        among those meeting the SOQL where clause, which should limit them to
+        records this load created. Small sets, by the estimated volume, are
+        queried by parent Id in concurrent chunks of 200; larger ones with one
+        Bulk API query, matched against the parent Ids held in memory."""
+        soql = f"SELECT Id, {parent_field} FROM {sobject} WHERE {where}"
+
+        if volume >= SMART_BULK_THRESHOLD:
+            local_ids = {
+                parent_id: local_id
+                for local_id, parent_id in conn.execute(local_query.statement)
+                if parent_id
+            }
+            qs = get_query_operation(
+                sobject=sobject,
+                fields=["Id", parent_field],
+                api_options=self.poll_options,
+                context=self,
+                query=soql,
+                api=DataApi.SMART,
+                volume=volume,
+            )
+            qs.query()
+            if qs.job_result.status is not DataOperationStatus.SUCCESS:
+                raise BulkDataException(
+                    f"Unable to query {sobject} records: {','.join(qs.job_result.job_errors)}"
                 )
-            )["records"]:
-                contact_id = contact_ids_by_account_sf_id.get(record["AccountId"])
-                contact_sf_id = record["Id"]
+            for sf_id, parent_id in qs.get_results():
+                if parent_id in local_ids:
+                    yield (local_ids[parent_id], sf_id)
+            return
+
+        slots = org_request_slots(self.org_config.org_id)
+
+        def query_chunk(chunk):
+            local_ids = {parent_id: local_id for local_id, parent_id in chunk}
+            # It's safe to use query_all since the chunk size is 200.
+            with slots:
+                records = self.sf.query_all(
+                    "{} AND {} IN ('{}')".format(
+                        soql, parent_field, "','".join(local_ids.keys())
+                    )
+                )["records"]
+            return [
+                (local_ids[record[parent_field]], record["Id"]) for record in records
+            ]
+
+        # Stream the local records in chunks of 200 in case we have large
+        # data volumes, keeping a few queries in flight at once.
+        query_result = conn.execution_options(stream_results=True).execute(
+            local_query.statement
+        )
+        with ThreadPoolExecutor(max_workers=DEFAULT_CONCURRENCY) as executor:
+            pending = deque()
+            while True:
+                chunk = query_result.fetchmany(200)
+                if not chunk:
+                    break
+                chunk = [row for row in chunk if row[1]]
+                if not chunk:
+                    continue
+                if len(pending) >= DEFAULT_CONCURRENCY:
+                    yield from pending.popleft().result()
+                pending.append(executor.submit(query_chunk, chunk))
 
-                # Join maps together to get tuple (Contact ID, Contact SF ID) to insert into step's ID Table.
-                yield (contact_id, contact_sf_id)
+            while pending:
+                yield from pending.popleft().result()
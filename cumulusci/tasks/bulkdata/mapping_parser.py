@@ -8,6 +8,7 @@ from pydantic import Field, validator, root_validator, ValidationError
 
 from cumulusci.core.config.OrgConfig import OrgConfig
 from cumulusci.core.exceptions import BulkDataException
+from cumulusci.salesforce_api.describe_cache import get_describe
 from cumulusci.tasks.bulkdata.step import DataOperationType, DataApi
 from cumulusci.tasks.bulkdata.dates import iso_to_date
 from cumulusci.utils.yaml.model_parser import CCIDictModel
@@ -38,6 +39,7 @@ class MappingLookup(CCIDictModel):
     value_field: Optional[str] = None
     join_field: Optional[str] = None
     after: Optional[str] = None
+    external_id_field: Optional[str] = None  # set through the target's external id
     aliased_table: Optional[Any] = None
     name: Optional[str] = None  # populated by parent
 
@@ -64,6 +66,21 @@ class MappingLookup(CCIDictModel):
             + f"Tried {', '.join(guesses)}"
         )
 
+    def get_reference_field(self, field_name=None):
+        """Return the relationship field through which this lookup is set by
+        the related record's external id, such as Parent.External_Id__c.
+
+        field_name is the lookup field as mapped in the step, which differs
+        from the name if a namespace was injected."""
+        field_name = field_name or self.name
+        if field_name.endswith("__c"):
+            relationship = field_name[: -len("__c")] + "__r"
+        elif field_name.endswith("Id"):
+            relationship = field_name[: -len("Id")]
+        else:
+            relationship = field_name
+        return f"{relationship}.{self.external_id_field}"
+
 
 class MappingStep(CCIDictModel):
     "Step in a load or extract process"
@@ -74,6 +91,7 @@ class MappingStep(CCIDictModel):
     static: Dict[str, str] = {}
     filters: List[str] = []
     action: DataOperationType = DataOperationType.INSERT
+    update_key: Optional[str] = None  # the external id field to upsert on
     api: DataApi = DataApi.SMART
     batch_size: int = 200
     oid_as_pk: bool = False  # this one should be discussed and probably deprecated
@@ -81,6 +99,8 @@ class MappingStep(CCIDictModel):
     bulk_mode: Optional[
         Literal["Serial", "Parallel"]
     ] = None  # default should come from task options
+    concurrency: Optional[int] = None  # default comes from the operation
+    pk_chunk_size: Optional[int] = None  # enables PK Chunking for Bulk queries
     anchor_date: Optional[str] = None
 
     def get_oid_as_pk(self):
@@ -118,7 +138,9 @@ class MappingStep(CCIDictModel):
         return fields
 
     def get_fields_by_type(self, field_type: str, org_config: OrgConfig):
-        describe = getattr(org_config.salesforce_client, self.sf_object).describe()
+        describe = get_describe(
+            org_config, org_config.salesforce_client, self.sf_object
+        )
         describe = CaseInsensitiveDict(
             {entry["name"]: entry for entry in describe["fields"]}
         )
@@ -135,14 +157,23 @@ class MappingStep(CCIDictModel):
         columns.extend(self.fields.keys())
 
         # Don't include lookups with an `after:` spec (dependent lookups)
-        columns.extend([f for f in lookups if not lookups[f].after])
+        columns.extend(
+            [
+                lookups[f].get_reference_field(f) if lookups[f].external_id_field else f
+                for f in lookups
+                if not lookups[f].after
+            ]
+        )
         columns.extend(self.static.keys())
 
         # If we're using Record Type mapping, `RecordTypeId` goes at the end.
         if "RecordTypeId" in columns:
             columns.remove("RecordTypeId")
 
-        if self.action is DataOperationType.INSERT and "Id" in columns:
+        if (
+            self.action in (DataOperationType.INSERT, DataOperationType.UPSERT)
+            and "Id" in columns
+        ):
             columns.remove("Id")
         if self.record_type or "RecordTypeId" in self.fields:
             columns.append("RecordTypeId")
@@ -170,6 +201,18 @@ class MappingStep(CCIDictModel):
     def validate_batch_size(cls, v):
         assert v <= 200 and v > 0
 
+    @validator("concurrency")
+    @classmethod
+    def validate_concurrency(cls, v):
+        assert v is None or v > 0
+        return v
+
+    @validator("pk_chunk_size")
+    @classmethod
+    def validate_pk_chunk_size(cls, v):
+        assert v is None or 0 < v <= 250000
+        return v
+
     @validator("anchor_date")
     @classmethod
     def validate_anchor_date(cls, v):
@@ -209,6 +252,32 @@ class MappingStep(CCIDictModel):
 
         return values
 
+    @root_validator
+    @classmethod
+    def validate_upsert(cls, values):
+        """An upsert needs an external id field to match records on, and
+        lookups set through external ids don't need to wait for an `after` step."""
+        if values.get("action") is DataOperationType.UPSERT:
+            update_key = values.get("update_key")
+            assert update_key, "An upsert step must specify an update_key."
+            assert update_key in (
+                values.get("fields_") or {}
+            ), f"The update_key {update_key} must be mapped in fields."
+        for name, lookup in (values.get("lookups") or {}).items():
+            assert not (
+                lookup.external_id_field and lookup.after
+            ), f"The lookup {name} is set through an external id and cannot use after."
+        return values
+
+    @root_validator
+    @classmethod
+    def validate_pk_chunking_api(cls, values):
+        """PK Chunking is only available in Bulk API 1.0."""
+        assert not (
+            values.get("pk_chunk_size") and values.get("api") is DataApi.BULK2
+        ), "pk_chunk_size cannot be used with api: bulk2."
+        return values
+
     @root_validator  # not really a validator, more like a post-processor
     @classmethod
     def fixup_lookup_names(cls, v):
@@ -308,6 +377,61 @@ class MappingStep(CCIDictModel):
 
         return ret
 
+    @staticmethod
+    def _is_external_id_field(field_describe: Dict) -> bool:
+        """Return whether records can be matched on the field."""
+        return bool(field_describe.get("externalId") or field_describe.get("idLookup"))
+
+    def _validate_external_id_fields(
+        self,
+        org_config: OrgConfig,
+        describe: CaseInsensitiveDict,
+        inject: Optional[Callable[[str], str]],
+        drop_missing: bool,
+    ) -> bool:
+        ret = True
+
+        for name, lookup in list(self.lookups.items()):
+            if not lookup.external_id_field:
+                continue
+
+            targets = describe[name].get("referenceTo") or []
+            for target in targets:
+                target_describe = get_describe(
+                    org_config, org_config.salesforce_client, target
+                )
+                target_describe = CaseInsensitiveDict(
+                    {entry["name"]: entry for entry in target_describe["fields"]}
+                )
+
+                # Do we need to inject this field?
+                f = lookup.external_id_field
+                if (
+                    inject
+                    and self._is_injectable(f)
+                    and f not in target_describe
+                    and inject(f) in target_describe
+                ):
+                    f = inject(f)
+
+                if f in target_describe and self._is_external_id_field(
+                    target_describe[f]
+                ):
+                    # Canonicalize the field's case
+                    lookup.external_id_field = target_describe.canonical_key(f)
+                    break
+            else:
+                logger.warning(
+                    f"Lookup {self.sf_object}.{name} cannot be set through {lookup.external_id_field}, "
+                    f"which is not an external id field of {' or '.join(targets) or 'its target'}."
+                )
+                if drop_missing:
+                    del self.lookups[name]
+                else:
+                    ret = False
+
+        return ret
+
     def _validate_sobject(
         self,
         global_describe: CaseInsensitiveDict,
@@ -380,7 +504,9 @@ class MappingStep(CCIDictModel):
         global_describe = CaseInsensitiveDict(
             {
                 entry["name"]: entry
-                for entry in org_config.salesforce_client.describe()["sobjects"]
+                for entry in get_describe(org_config, org_config.salesforce_client)[
+                    "sobjects"
+                ]
             }
         )
 
@@ -390,7 +516,9 @@ class MappingStep(CCIDictModel):
 
         # Validate, inject, and drop (if configured) fields.
         # By this point, we know the attribute is valid.
-        describe = getattr(org_config.salesforce_client, self.sf_object).describe()
+        describe = get_describe(
+            org_config, org_config.salesforce_client, self.sf_object
+        )
         describe = CaseInsensitiveDict(
             {entry["name"]: entry for entry in describe["fields"]}
         )
@@ -400,11 +528,36 @@ class MappingStep(CCIDictModel):
         ):
             return False
 
+        # Follow the update key if its field was injected or canonicalized.
+        if self.update_key and self.update_key not in self.fields:
+            for f in self.fields:
+                if f.lower() in (
+                    self.update_key.lower(),
+                    inject(self.update_key).lower() if inject else None,
+                ):
+                    self.update_key = f
+                    break
+
+        if self.update_key and not (
+            self.update_key in describe
+            and self._is_external_id_field(describe[self.update_key])
+        ):
+            logger.warning(
+                f"The update_key {self.sf_object}.{self.update_key} is not an external id field."
+            )
+            return False
+
         if not self._validate_field_dict(
             describe, self.lookups, inject, drop_missing, operation
         ):
             return False
 
+        # Lookups set through external ids name a field of the target object.
+        if not self._validate_external_id_fields(
+            org_config, describe, inject, drop_missing
+        ):
+            return False
+
         return True
 
 
@@ -460,7 +613,9 @@ def validate_and_inject_mapping(
 
         # Remove any remaining lookups to dropped objects.
         for m in mapping.values():
-            describe = getattr(org_config.salesforce_client, m.sf_object).describe()
+            describe = get_describe(
+                org_config, org_config.salesforce_client, m.sf_object
+            )
             describe = {entry["name"]: entry for entry in describe["fields"]}
 
             for field in list(m.lookups.keys()):
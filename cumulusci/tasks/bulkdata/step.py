@@ -1,21 +1,38 @@
 from abc import ABCMeta, abstractmethod
-from collections import namedtuple
-from contextlib import contextmanager
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, closing, contextmanager
 import csv
 from enum import Enum
 import io
 import itertools
+import operator
 import os
 import pathlib
 import tempfile
+import threading
 import time
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 import lxml.etree as ET
 import requests
 
 from cumulusci.core.exceptions import BulkDataException
 from cumulusci.core.utils import process_bool_arg
+from cumulusci.salesforce_api.describe_cache import get_describe
+
+DEFAULT_CONCURRENCY = 4
+
+# Ceiling on concurrent REST API requests to a single org,
+# shared by all operations running in this process.
+REST_ORG_CONCURRENCY = 10
+# SMART API selection uses the Bulk API at this many records or more.
+SMART_BULK_THRESHOLD = 2000
+# Bulk API 2.0 query jobs were introduced in API 47.0.
+BULK2_MIN_API_VERSION = 47.0
+# Bulk API 2.0 accepts up to 150MB of base64-encoded CSV per job,
+# which corresponds to roughly 100MB of raw data.
+BULK2_MAX_UPLOAD_BYTES = 100 * 1024 * 1024
 
 
 def get_batch_iterator(iterator, n):
@@ -32,6 +49,7 @@ class DataOperationType(Enum):
 
     INSERT = "insert"
     UPDATE = "update"
+    UPSERT = "upsert"
     DELETE = "delete"
     HARD_DELETE = "hardDelete"
     QUERY = "query"
@@ -41,6 +59,7 @@ class DataApi(Enum):
     """Enum defining requested Salesforce data API for an operation."""
 
     BULK = "bulk"
+    BULK2 = "bulk2"
     REST = "rest"
     SMART = "smart"
 
@@ -81,6 +100,206 @@ def download_file(uri, bulk_api):
         pathlib.Path(path).unlink()
 
 
+def download_files(uris, bulk_api, prefetch=DEFAULT_CONCURRENCY):
+    """Download a sequence of Bulk API result files, keeping up to `prefetch`
+    downloads running ahead of the consumer.
+
+    Yields one context manager per uri, in order. Entering it waits for that
+    download to complete and returns the open file; exiting it removes the file."""
+
+    @contextmanager
+    def _wait_for(download, future):
+        try:
+            yield future.result()
+        finally:
+            download.__exit__(None, None, None)
+
+    uris = iter(uris)
+    pending = deque()
+
+    with ThreadPoolExecutor(max_workers=prefetch) as executor:
+
+        def _fill():
+            for uri in itertools.islice(uris, prefetch - len(pending)):
+                download = download_file(uri, bulk_api)
+                pending.append((download, executor.submit(download.__enter__)))
+
+        try:
+            _fill()
+            while pending:
+                download, future = pending.popleft()
+                _fill()
+                yield _wait_for(download, future)
+        finally:
+            # The consumer stopped early: discard anything already downloaded.
+            for download, future in pending:
+                if future.cancel():
+                    continue
+                try:
+                    future.result()
+                except Exception:
+                    continue
+                download.__exit__(None, None, None)
+
+
+_org_request_slots = {}
+_org_request_slots_lock = threading.Lock()
+
+
+def org_request_slots(org_id):
+    """Return the semaphore that bounds concurrent REST API requests to
+    the given org across all operations in this process."""
+    with _org_request_slots_lock:
+        if org_id not in _org_request_slots:
+            _org_request_slots[org_id] = threading.BoundedSemaphore(
+                REST_ORG_CONCURRENCY
+            )
+        return _org_request_slots[org_id]
+
+
+class _ByteCountingStringIO(io.StringIO):
+    """A StringIO that records the UTF-8 encoded size of the last text written."""
+
+    last_write_bytes = 0
+
+    def write(self, s):
+        self.last_write_bytes = len(s) if s.isascii() else len(s.encode("utf-8"))
+        return super().write(s)
+
+
+class CsvBatchWriter:
+    """Serializes records into a reusable CSV buffer, one batch at a time.
+
+    Rows are written directly into the buffer, which starts with the header
+    row, and the batch's row, character, and encoded byte counts are tracked
+    as rows are added. Each batch is encoded once, when it is complete."""
+
+    def __init__(self, header):
+        self.buffer = _ByteCountingStringIO(newline="")
+        self.writer = csv.writer(self.buffer)
+        self.header_chars = self.writer.writerow(header)
+        self.header_bytes = self.buffer.last_write_bytes
+        self.row_count = 0
+        self.char_count = self.header_chars
+        self.byte_count = self.header_bytes
+        self.last_row_chars = 0
+        self.last_row_bytes = 0
+
+    def write(self, record):
+        """Append a record to the current batch."""
+        self.last_row_chars = self.writer.writerow(record)
+        self.last_row_bytes = self.buffer.last_write_bytes
+        self.row_count += 1
+        self.char_count += self.last_row_chars
+        self.byte_count += self.last_row_bytes
+
+    def pop(self):
+        """Remove the most recently written row from the batch
+        and return it as serialized text."""
+        start = self.char_count - self.last_row_chars
+        self.buffer.seek(start)
+        row = self.buffer.read()
+        self.buffer.seek(start)
+        self.buffer.truncate()
+        self.row_count -= 1
+        self.char_count = start
+        self.byte_count -= self.last_row_bytes
+        self.last_row_chars = 0
+        self.last_row_bytes = 0
+        return row
+
+    def getvalue(self):
+        """Return the current batch, including the header, as UTF-8 bytes."""
+        return self.buffer.getvalue().encode("utf-8")
+
+    def reset(self, carry=""):
+        """Start a new batch, optionally beginning with a serialized row
+        returned by pop()."""
+        self.buffer.seek(self.header_chars)
+        self.buffer.truncate()
+        self.row_count = 0
+        self.char_count = self.header_chars
+        self.byte_count = self.header_bytes
+        self.last_row_chars = 0
+        self.last_row_bytes = 0
+        if carry:
+            self.buffer.write(carry)
+            self.row_count = 1
+            self.char_count += len(carry)
+            self.byte_count += self.buffer.last_write_bytes
+            self.last_row_chars = len(carry)
+            self.last_row_bytes = self.buffer.last_write_bytes
+
+
+class JobPoller:
+    """Polling schedule for asynchronous API jobs.
+
+    Polls quickly at first, so that small jobs finish promptly, then backs off
+    exponentially up to `max_interval` seconds, so that long-running jobs
+    don't poll more than necessary. Iterate over the poller to poll:
+    it sleeps between iterations and counts the polls made."""
+
+    def __init__(self, *, initial_interval=1, max_interval=30, backoff=2):
+        self.initial_interval = initial_interval
+        self.interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.poll_count = 0
+
+    @classmethod
+    def from_api_options(cls, api_options):
+        """Create a poller configured by the `poll_interval` and
+        `max_poll_interval` keys in api_options, where present."""
+        kwargs = {
+            name: api_options[key]
+            for name, key in (
+                ("initial_interval", "poll_interval"),
+                ("max_interval", "max_poll_interval"),
+            )
+            if api_options.get(key) is not None
+        }
+        return cls(**kwargs)
+
+    def __iter__(self):
+        while True:
+            self.poll_count += 1
+            yield self.poll_count
+
+            time.sleep(self.interval)
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+
+    def reset(self):
+        """Return to the initial interval, e.g. after the job made progress."""
+        self.interval = self.initial_interval
+
+
+# Task options that configure job polling, shared by the bulk data tasks.
+POLL_TASK_OPTIONS = {
+    "poll_interval": {
+        "description": "The number of seconds to wait before first checking the status of a "
+        "Bulk API job. The wait doubles after each check, up to max_poll_interval. Defaults to 1."
+    },
+    "max_poll_interval": {
+        "description": "The maximum number of seconds to wait between checks of the status "
+        "of a Bulk API job. Defaults to 30."
+    },
+}
+
+
+def get_poll_options(task_options: Dict) -> Dict:
+    """Return the api_options that configure job polling,
+    from the task options in POLL_TASK_OPTIONS that are set."""
+    return {
+        key: float(task_options[key])
+        for key in POLL_TASK_OPTIONS
+        if task_options.get(key) is not None
+    }
+
+
+# Batch states from which a Bulk API batch won't change.
+FINISHED_BATCH_STATES = ("Completed", "Failed", "Not Processed")
+
+
 class BulkJobMixin:
     """Provides mixin utilities for classes that manage Bulk API jobs."""
 
@@ -100,13 +319,18 @@ class BulkJobMixin:
             el.text for el in tree.iterfind(".//{%s}stateMessage" % self.bulk.jobNS)
         ]
 
-        failures = tree.find(".//{%s}numberRecordsFailed" % self.bulk.jobNS)
-        record_failure_count = int(failures.text) if failures is not None else 0
-        processed = tree.find(".//{%s}numberRecordsProcessed" % self.bulk.jobNS)
-        records_processed = int(processed.text) if processed is not None else 0
+        # Sum counts across all batches in the job.
+        record_failure_count = sum(
+            int(el.text)
+            for el in tree.iterfind(".//{%s}numberRecordsFailed" % self.bulk.jobNS)
+        )
+        records_processed = sum(
+            int(el.text)
+            for el in tree.iterfind(".//{%s}numberRecordsProcessed" % self.bulk.jobNS)
+        )
 
-        # FIXME: "Not Processed" to be expected for original batch with PK Chunking Query
-        # PK Chunking is not currently supported.
+        # "Not Processed" is expected for the original batch of a PK Chunking query,
+        # but BulkApiQueryOperation tracks those jobs through their chunk batches.
         if "Not Processed" in statuses:
             return DataOperationJobResult(
                 DataOperationStatus.ABORTED, [], records_processed, record_failure_count
@@ -138,19 +362,44 @@ class BulkJobMixin:
             DataOperationStatus.SUCCESS, [], records_processed, record_failure_count
         )
 
+    def _job_may_be_done(self, job_status):
+        """Return whether the job-level counters in job_status show that
+        none of the job's batches are queued or in progress.
+
+        Returns True if the counters are not available, so that the
+        batch list is checked instead."""
+        try:
+            queued = int(job_status["numberBatchesQueued"])
+            in_progress = int(job_status["numberBatchesInProgress"])
+        except (KeyError, TypeError, ValueError):
+            return True
+
+        return not (queued or in_progress)
+
+    def _get_poller(self):
+        return JobPoller.from_api_options(getattr(self, "api_options", None) or {})
+
     def _wait_for_job(self, job_id):
-        """Wait for the given job to enter a completed state (success or failure)."""
-        while True:
+        """Wait for the given job to enter a completed state (success or failure).
+
+        Each poll makes a single job status request. The batch list is fetched
+        only once the job's counters show that it is done, or if the counters
+        are unavailable."""
+        poller = self._get_poller()
+        for _ in poller:
             job_status = self.bulk.job_status(job_id)
             self.logger.info(
                 f"Waiting for job {job_id} ({job_status['numberBatchesCompleted']}/{job_status['numberBatchesTotal']} batches complete)"
             )
-            result = self._job_state_from_batches(job_id)
-            if result.status is not DataOperationStatus.IN_PROGRESS:
-                break
-
-            time.sleep(10)
-        self.logger.info(f"Job {job_id} finished with result: {result.status.value}")
+            if self._job_may_be_done(job_status):
+                result = self._job_state_from_batches(job_id)
+                if result.status is not DataOperationStatus.IN_PROGRESS:
+                    break
+
+        self.poll_count = poller.poll_count
+        self.logger.info(
+            f"Job {job_id} finished with result: {result.status.value} ({poller.poll_count} status checks)"
+        )
         if result.status is DataOperationStatus.JOB_FAILURE:
             for state_message in result.job_errors:
                 self.logger.error(f"Batch failure message: {state_message}")
@@ -158,6 +407,77 @@ class BulkJobMixin:
         return result
 
 
+class Bulk2JobMixin:
+    """Provides mixin utilities for classes that manage Bulk API 2.0 jobs."""
+
+    def _wait_for_bulk2_job(self, job_path):
+        """Poll the job status resource at job_path until the job
+        enters a completed state, and return a summary status record."""
+        poller = JobPoller.from_api_options(self.api_options)
+        for _ in poller:
+            job = self.sf.restful(job_path)
+            if job["state"] not in ("Open", "UploadComplete", "InProgress"):
+                break
+
+            self.logger.info(
+                f"Waiting for job {job['id']} ({job.get('numberRecordsProcessed', 0)} records processed)"
+            )
+
+        self.poll_count = poller.poll_count
+        result = self._parse_bulk2_job(job)
+        self.logger.info(
+            f"Job {job['id']} finished with result: {result.status.value} ({poller.poll_count} status checks)"
+        )
+        for error in result.job_errors:
+            self.logger.error(f"Job failure message: {error}")
+
+        return result
+
+    def _parse_bulk2_job(self, job):
+        """Generate a summary status record from a Bulk API 2.0 job info."""
+        records_processed = int(job.get("numberRecordsProcessed", 0))
+        record_failure_count = int(job.get("numberRecordsFailed", 0))
+
+        if job["state"] in ("Failed", "Aborted"):
+            return DataOperationJobResult(
+                DataOperationStatus.JOB_FAILURE,
+                [job.get("errorMessage") or f"Job {job['state']}"],
+                records_processed,
+                record_failure_count,
+            )
+        elif record_failure_count:
+            return DataOperationJobResult(
+                DataOperationStatus.ROW_FAILURE,
+                [],
+                records_processed,
+                record_failure_count,
+            )
+
+        return DataOperationJobResult(
+            DataOperationStatus.SUCCESS, [], records_processed, record_failure_count
+        )
+
+    @contextmanager
+    def _bulk2_csv_reader(self, path, params=None):
+        """Stream a CSV resource from the Bulk API 2.0 into a csv.reader
+        without downloading it first. Yields the response and the reader."""
+        headers = dict(self.sf.headers)
+        headers["Accept"] = "text/csv"
+        response = self.sf.session.get(
+            self.sf.base_url + path, headers=headers, params=params, stream=True
+        )
+        try:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            # Let the TextIOWrapper detect the end of the stream itself.
+            response.raw.auto_close = False
+            yield response, csv.reader(
+                io.TextIOWrapper(response.raw, encoding="utf-8", newline="")
+            )
+        finally:
+            response.close()
+
+
 class BaseDataOperation(metaclass=ABCMeta):
     """Abstract base class for all data operations (queries and DML)."""
 
@@ -203,38 +523,131 @@ class BaseQueryOperation(BaseDataOperation, metaclass=ABCMeta):
 
 
 class BulkApiQueryOperation(BaseQueryOperation, BulkJobMixin):
-    """Operation class for Bulk API query jobs."""
+    """Operation class for Bulk API query jobs.
+
+    If `pk_chunk_size` is set in api_options, the job is created with PK Chunking
+    enabled. Salesforce then splits the query into chunk batches, whose results
+    are streamed from get_results() as each chunk completes."""
+
+    api = DataApi.BULK
 
     def query(self):
-        self.job_id = self.bulk.create_query_job(self.sobject, contentType="CSV")
+        pk_chunk_size = self.api_options.get("pk_chunk_size")
+        if pk_chunk_size:
+            self.job_id = self.bulk.create_query_job(
+                self.sobject, contentType="CSV", pk_chunking=pk_chunk_size
+            )
+        else:
+            self.job_id = self.bulk.create_query_job(self.sobject, contentType="CSV")
         self.logger.info(f"Created Bulk API query job {self.job_id}")
         self.batch_id = self.bulk.query(self.job_id, self.soql)
 
-        self.job_result = self._wait_for_job(self.job_id)
+        if pk_chunk_size:
+            self.job_result = self._wait_for_chunking()
+        else:
+            self.job_result = self._wait_for_job(self.job_id)
         self.bulk.close_job(self.job_id)
 
+    def _wait_for_chunking(self):
+        """Wait until Salesforce has split the original batch into chunk batches.
+
+        Returns an IN_PROGRESS result once the chunk batches exist (or a final
+        result if the original batch completed or failed without chunking).
+        get_results() waits for the chunks themselves."""
+        for _ in self._get_poller():
+            batch = self.bulk.batch_status(self.batch_id, self.job_id, reload=True)
+            state = batch["state"]
+            if state == "Not Processed":
+                self.logger.info(f"Job {self.job_id} split into PK chunk batches")
+                return DataOperationJobResult(DataOperationStatus.IN_PROGRESS, [], 0, 0)
+            elif state == "Failed":
+                self.logger.error(f"Batch failure message: {batch['stateMessage']}")
+                return DataOperationJobResult(
+                    DataOperationStatus.JOB_FAILURE, [batch["stateMessage"]], 0, 0
+                )
+            elif state == "Completed":
+                return DataOperationJobResult(
+                    DataOperationStatus.SUCCESS,
+                    [],
+                    int(batch["numberRecordsProcessed"]),
+                    0,
+                )
+
     def get_results(self):
-        # FIXME: For PK Chunking, need to get new batch Ids
-        # and retrieve their results. Original batch will not be processed.
+        if self.job_result.status is DataOperationStatus.IN_PROGRESS:
+            yield from self._get_chunked_results()
+        else:
+            yield from self._get_batch_results([self.batch_id])
+
+    def _get_chunked_results(self):
+        """Poll the job's chunk batches together and yield the rows
+        of each chunk as soon as it completes."""
+        seen = set()
+        poller = self._get_poller()
+        for _ in poller:
+            batches = self.bulk.get_batch_list(self.job_id)
+            failures = [b["stateMessage"] for b in batches if b["state"] == "Failed"]
+            if failures:
+                self.job_result = DataOperationJobResult(
+                    DataOperationStatus.JOB_FAILURE, failures, 0, 0
+                )
+                raise BulkDataException(
+                    f"PK chunk batches failed for job {self.job_id}: {','.join(failures)}"
+                )
 
-        result_ids = self.bulk.get_query_batch_result_ids(
-            self.batch_id, job_id=self.job_id
-        )
-        for result_id in result_ids:
-            uri = f"{self.bulk.endpoint}/job/{self.job_id}/batch/{self.batch_id}/result/{result_id}"
+            completed = [
+                b["id"]
+                for b in batches
+                if b["state"] == "Completed" and b["id"] not in seen
+            ]
+            seen.update(completed)
+            yield from self._get_batch_results(completed)
+
+            if all(b["state"] in ("Completed", "Not Processed") for b in batches):
+                self.job_result = DataOperationJobResult(
+                    DataOperationStatus.SUCCESS,
+                    [],
+                    sum(int(b["numberRecordsProcessed"]) for b in batches),
+                    0,
+                )
+                return
+
+            if completed:
+                poller.reset()
+            else:
+                self.logger.info(
+                    f"Waiting for job {self.job_id} ({len(seen)}/{len(batches) - 1} chunks complete)"
+                )
+
+    def _get_batch_results(self, batch_ids):
+        """Yield the rows for the given completed batches, downloading
+        result files ahead of the consumer."""
+
+        def _result_urls():
+            for batch_id in batch_ids:
+                result_ids = self.bulk.get_query_batch_result_ids(
+                    batch_id, job_id=self.job_id
+                )
+                for result_id in result_ids:
+                    yield f"{self.bulk.endpoint}/job/{self.job_id}/batch/{batch_id}/result/{result_id}"
 
-            with download_file(uri, self.bulk) as f:
-                reader = csv.reader(f)
-                self.headers = next(reader)
-                if "Records not found for this query" in self.headers:
-                    return
+        prefetch = self.api_options.get("concurrency") or DEFAULT_CONCURRENCY
+        with closing(download_files(_result_urls(), self.bulk, prefetch)) as downloads:
+            for download in downloads:
+                with download as f:
+                    reader = csv.reader(f)
+                    self.headers = next(reader)
+                    if "Records not found for this query" in self.headers:
+                        continue
 
-                yield from reader
+                    yield from reader
 
 
 class RestApiQueryOperation(BaseQueryOperation):
     """Operation class for REST API query jobs."""
 
+    api = DataApi.REST
+
     def __init__(self, *, sobject, fields, api_options, context, query):
         super().__init__(
             sobject=sobject, api_options=api_options, context=context, query=query
@@ -248,17 +661,73 @@ class RestApiQueryOperation(BaseQueryOperation):
         )
 
     def get_results(self):
-        def convert(rec):
-            return [str(rec[f]) if rec[f] is not None else "" for f in self.fields]
+        """Yield the records of each page of results, fetching
+        the next page in the background while the current one is consumed."""
+        getter = operator.itemgetter(*self.fields)
+        if len(self.fields) == 1:
+            # itemgetter returns a bare value, not a tuple, for a single field.
+            def convert(rec):
+                value = getter(rec)
+                return ["" if value is None else str(value)]
+
+        else:
+
+            def convert(rec):
+                return ["" if v is None else str(v) for v in getter(rec)]
+
+        def fetch_next(response):
+            if response["done"]:
+                return None
+            return self.sf.query_more(
+                response["nextRecordsUrl"], identifier_is_url=True
+            )
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            next_page = None
+            try:
+                page = self.response
+                while page is not None:
+                    next_page = executor.submit(fetch_next, page)
+                    yield from (convert(rec) for rec in page["records"])
+                    page = next_page.result()
+            finally:
+                if next_page is not None:
+                    next_page.cancel()
+
 
+class Bulk2ApiQueryOperation(BaseQueryOperation, Bulk2JobMixin):
+    """Operation class for Bulk API 2.0 query jobs."""
+
+    api = DataApi.BULK2
+
+    def query(self):
+        job = self.sf.restful(
+            "jobs/query",
+            method="POST",
+            json={"operation": "query", "query": self.soql, "contentType": "CSV"},
+        )
+        self.job_id = job["id"]
+        self.logger.info(f"Created Bulk API 2.0 query job {self.job_id}")
+
+        self.job_result = self._wait_for_bulk2_job(f"jobs/query/{self.job_id}")
+
+    def get_results(self):
+        """Stream each page of results into the CSV reader,
+        following the Sforce-Locator header until all pages are read."""
+        params = {}
         while True:
-            yield from (convert(rec) for rec in self.response["records"])
-            if not self.response["done"]:
-                self.response = self.sf.query_more(
-                    self.response["nextRecordsUrl"], identifier_is_url=True
-                )
-            else:
+            with self._bulk2_csv_reader(
+                f"jobs/query/{self.job_id}/results", params
+            ) as (response, reader):
+                self.headers = next(reader, None)
+                if self.headers:
+                    yield from reader
+
+                locator = response.headers.get("Sforce-Locator")
+
+            if not locator or locator == "null":
                 return
+            params = {"locator": locator}
 
 
 class BaseDmlOperation(BaseDataOperation, metaclass=ABCMeta):
@@ -298,10 +767,29 @@ class BaseDmlOperation(BaseDataOperation, metaclass=ABCMeta):
         """Return a generator of DataOperationResult objects."""
         pass
 
+    def iter_batch_results(self):
+        """Finish the operation, as end() does, and yield (offset, results)
+        for each batch of records as soon as its results are available.
+
+        `results` is a list of DataOperationResult objects, and `offset` is the
+        position of the batch's first record in the input. job_result is set
+        once the generator is exhausted. By default, this waits for the whole
+        operation to finish and then yields its results in chunks."""
+        self.end()
+        if self.job_result.status is DataOperationStatus.JOB_FAILURE:
+            return
+
+        offset = 0
+        for results in get_batch_iterator(self.get_results(), 10000):
+            yield offset, results
+            offset += len(results)
+
 
 class BulkApiDmlOperation(BaseDmlOperation, BulkJobMixin):
     """Operation class for all DML operations run using the Bulk API."""
 
+    api = DataApi.BULK
+
     def __init__(self, *, sobject, operation, api_options, context, fields):
         super().__init__(
             sobject=sobject,
@@ -310,105 +798,240 @@ class BulkApiDmlOperation(BaseDmlOperation, BulkJobMixin):
             context=context,
             fields=fields,
         )
-        self.csv_buff = io.StringIO(newline="")
-        self.csv_writer = csv.writer(self.csv_buff)
+        self.batch_ids = []
+        self.batch_sizes = []
 
     def start(self):
+        options = {}
+        if self.operation is DataOperationType.UPSERT:
+            options["external_id_name"] = self.api_options["update_key"]
         self.job_id = self.bulk.create_job(
             self.sobject,
             self.operation.value,
             contentType="CSV",
             concurrency=self.api_options.get("bulk_mode", "Parallel"),
+            **options,
         )
 
     def end(self):
         self.bulk.close_job(self.job_id)
         self.job_result = self._wait_for_job(self.job_id)
 
-    def load_records(self, records):
-        self.batch_ids = []
+    def load_records(self, records, on_batch_uploaded=None):
+        """Upload batches using a bounded pool of concurrent requests.
+
+        At most `concurrency` batches are in flight (and held in memory) at once.
+        Batch ids are collected in upload order so that results can be
+        correlated with the input rows.
 
-        for count, csv_batch in enumerate(self._batch(records)):
-            self.context.logger.info(f"Uploading batch {count + 1}")
-            self.batch_ids.append(self.bulk.post_batch(self.job_id, iter(csv_batch)))
+        on_batch_uploaded, if given, is called on this thread with the id, offset
+        and size of each batch as soon as its upload returns. If an upload fails,
+        the batches already in flight are still reported before the error is raised."""
+        self.batch_ids = []
+        self.batch_sizes = []
+        concurrency = self.api_options.get("concurrency") or DEFAULT_CONCURRENCY
 
-    def _batch(self, records, n=10000, char_limit=10000000):
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            pending = deque()
+            offset = 0
+            try:
+                for count, csv_batch in enumerate(self._batch(records)):
+                    # Wait for the oldest upload before queueing another batch,
+                    # so that memory use stays bounded.
+                    if len(pending) >= concurrency:
+                        self._finish_upload(*pending.popleft(), on_batch_uploaded)
+
+                    self.context.logger.info(f"Uploading batch {count + 1}")
+                    size = self.batch_sizes[-1]
+                    future = executor.submit(
+                        self.bulk.post_batch, self.job_id, csv_batch
+                    )
+                    pending.append((future, offset, size))
+                    offset += size
+
+                while pending:
+                    self._finish_upload(*pending.popleft(), on_batch_uploaded)
+            except Exception:
+                # Salesforce may have accepted the other batches in flight.
+                for upload in pending:
+                    try:
+                        self._finish_upload(*upload, on_batch_uploaded)
+                    except Exception as e:
+                        self.logger.error(f"Batch upload failed: {e}")
+                raise
+
+    def _finish_upload(self, future, offset, size, on_batch_uploaded):
+        batch_id = future.result()
+        self.batch_ids.append(batch_id)
+        if on_batch_uploaded:
+            on_batch_uploaded(batch_id, offset, size)
+
+    def _batch(self, records, n=10000, char_limit=10000000, byte_limit=10000000):
         """Given an iterator of records, yields batches of
-        records serialized in .csv format.
+        records serialized in .csv format, as bytes.
 
         Batches adhere to the following, in order of precedence:
-        (1) They do not exceed the given character limit
+        (1) They do not exceed the given character limit or the given limit
+            on their size in bytes once encoded; Salesforce enforces both
         (2) They do not contain more than n records per batch
-        """
-        serialized_csv_fields = self._serialize_csv_record(self.fields)
-        len_csv_fields = len(serialized_csv_fields)
 
-        # append fields to first row
-        batch = [serialized_csv_fields]
-        current_chars = len_csv_fields
+        The number of records in each batch is appended to self.batch_sizes.
+        """
+        batch = CsvBatchWriter(self.fields)
         for record in records:
-            serialized_record = self._serialize_csv_record(record)
-            # Does the next record put us over the character limit?
-            if len(serialized_record) + current_chars > char_limit:
-                yield batch
-                batch = [serialized_csv_fields]
-                current_chars = len_csv_fields
-
-            batch.append(serialized_record)
-            current_chars += len(serialized_record)
+            batch.write(record)
+            # Did this record put us over the character or byte limit?
+            if (
+                batch.char_count > char_limit or batch.byte_count > byte_limit
+            ) and batch.row_count > 1:
+                row = batch.pop()
+                self.batch_sizes.append(batch.row_count)
+                yield batch.getvalue()
+                batch.reset(row)
 
             # yield batch if we're at desired size
-            # -1 due to first row being field names
-            if len(batch) - 1 == n:
-                yield batch
-                batch = [serialized_csv_fields]
-                current_chars = len_csv_fields
+            if batch.row_count == n:
+                self.batch_sizes.append(batch.row_count)
+                yield batch.getvalue()
+                batch.reset()
 
         # give back anything leftover
-        if len(batch) > 1:
-            yield batch
+        if batch.row_count:
+            self.batch_sizes.append(batch.row_count)
+            yield batch.getvalue()
 
-    def _serialize_csv_record(self, record):
-        """Given a list of strings (record) return
-        the corresponding record serialized in .csv format"""
-        self.csv_writer.writerow(record)
-        serialized = self.csv_buff.getvalue().encode("utf-8")
-        # flush buffer
-        self.csv_buff.truncate(0)
-        self.csv_buff.seek(0)
+    def get_results(self):
+        for batch_id, results in self._get_batch_results(self.batch_ids):
+            yield from results
 
-        return serialized
+    def iter_batch_results(self):
+        """Close the job and yield (offset, results) for each batch as soon
+        as it completes, while the job's other batches are still processing."""
+        self.bulk.close_job(self.job_id)
 
-    def get_results(self):
-        for batch_id in self.batch_ids:
-            try:
-                results_url = (
-                    f"{self.bulk.endpoint}/job/{self.job_id}/batch/{batch_id}/result"
+        offsets = dict(
+            zip(self.batch_ids, itertools.accumulate([0] + self.batch_sizes))
+        )
+        for batch_id, results in self._iter_finished_batches(self.batch_ids):
+            yield offsets[batch_id], results
+
+        self.job_result = self._job_state_from_batches(self.job_id)
+        # The job's batches may not have left the queue yet.
+        if self.job_state == "Aborted":
+            self.job_result = self.job_result._replace(
+                status=DataOperationStatus.ABORTED
+            )
+        elif self.job_state == "Failed":
+            self.job_result = self.job_result._replace(
+                status=DataOperationStatus.JOB_FAILURE,
+                job_errors=self.job_result.job_errors or [f"Job {self.job_id} failed"],
+            )
+        self.logger.info(
+            f"Job {self.job_id} finished with result: {self.job_result.status.value} ({self.poll_count} status checks)"
+        )
+        for state_message in self.job_result.job_errors:
+            self.logger.error(f"Batch failure message: {state_message}")
+
+    def resume_batch_results(self, job_id, batch_ids):
+        """Yield (batch_id, results) for each of the given batches of an
+        existing job as soon as it completes. Batches that failed, were not
+        processed or no longer exist are skipped, as are the remaining batches
+        if the job was aborted or failed."""
+        self.job_id = job_id
+        yield from self._iter_finished_batches(batch_ids)
+
+    def _iter_finished_batches(self, batch_ids):
+        """Poll the job until the given batches have finished, yielding
+        (batch_id, results) for each one that completed, and set poll_count.
+
+        Stops early if the job was aborted or failed, setting job_state."""
+        pending = set(batch_ids)
+        self.job_state = None
+        poller = self._get_poller()
+        for _ in poller:
+            # Check the job before its batches, so that no batch that
+            # completed before the job stopped is missed.
+            job_state = self.bulk.job_status(self.job_id).get("state")
+            batches = self.bulk.get_batch_list(self.job_id)
+            if isinstance(batches, dict):
+                batches = [batches]
+            finished = [
+                b
+                for b in batches
+                if b["id"] in pending and b["state"] in FINISHED_BATCH_STATES
+            ]
+            pending.difference_update(b["id"] for b in finished)
+            completed = [b["id"] for b in finished if b["state"] == "Completed"]
+            yield from self._get_batch_results(completed)
+
+            # Batches that Salesforce has deleted will never finish.
+            missing = pending.difference(b["id"] for b in batches)
+            if missing:
+                self.logger.warning(
+                    f"{len(missing)} batches of job {self.job_id} no longer exist."
                 )
-                # Download entire result file to a temporary file first
-                # to avoid the server dropping connections
-                with download_file(results_url, self.bulk) as f:
-                    self.logger.info(f"Downloaded results for batch {batch_id}")
+                pending.difference_update(missing)
 
-                    reader = csv.reader(f)
-                    next(reader)  # skip header
-
-                    for row in reader:
-                        success = process_bool_arg(row[1])
-                        yield DataOperationResult(
-                            row[0] if success else None,
-                            success,
-                            row[3] if not success else None,
-                        )
-            except Exception as e:
-                raise BulkDataException(
-                    f"Failed to download results for batch {batch_id} ({str(e)})"
+            if not pending:
+                break
+            elif job_state in ("Aborted", "Failed"):
+                self.job_state = job_state
+                self.logger.warning(
+                    f"Job {self.job_id} is {job_state.lower()}, so {len(pending)} batches will not complete."
+                )
+                break
+            elif finished:
+                poller.reset()
+            else:
+                self.logger.info(
+                    f"Waiting for job {self.job_id} ({len(batch_ids) - len(pending)}/{len(batch_ids)} batches complete)"
                 )
 
+        self.poll_count = poller.poll_count
+
+    def _get_batch_results(self, batch_ids):
+        """Yield (batch_id, results) for each of the given completed batches,
+        where results is a list of DataOperationResult objects."""
+        results_urls = [
+            f"{self.bulk.endpoint}/job/{self.job_id}/batch/{batch_id}/result"
+            for batch_id in batch_ids
+        ]
+        # Download entire result files to temporary files first
+        # to avoid the server dropping connections, fetching
+        # the next batches' results while the current one is parsed.
+        prefetch = self.api_options.get("concurrency") or DEFAULT_CONCURRENCY
+        with closing(download_files(results_urls, self.bulk, prefetch)) as downloads:
+            for batch_id, download in zip(batch_ids, downloads):
+                try:
+                    with download as f:
+                        self.logger.info(f"Downloaded results for batch {batch_id}")
+
+                        reader = csv.reader(f)
+                        next(reader)  # skip header
+
+                        results = []
+                        for row in reader:
+                            success = process_bool_arg(row[1])
+                            results.append(
+                                DataOperationResult(
+                                    row[0] if success else None,
+                                    success,
+                                    row[3] if not success else None,
+                                )
+                            )
+                except Exception as e:
+                    raise BulkDataException(
+                        f"Failed to download results for batch {batch_id} ({str(e)})"
+                    )
+
+                yield batch_id, results
+
 
 class RestApiDmlOperation(BaseDmlOperation):
     """Operation class for all DML operations run using the REST API."""
 
+    api = DataApi.REST
+
     def __init__(self, *, sobject, operation, api_options, context, fields):
         super().__init__(
             sobject=sobject,
@@ -421,9 +1044,14 @@ class RestApiDmlOperation(BaseDmlOperation):
         # Because we send values in JSON, we must convert Booleans and nulls
         describe = {
             field["name"]: field
-            for field in getattr(context.sf, sobject).describe()["fields"]
+            for field in get_describe(context.org_config, context.sf, sobject)["fields"]
         }
-        self.boolean_fields = [f for f in fields if describe[f]["type"] == "boolean"]
+        # Relationship fields such as Parent.External_Id__c aren't in the
+        # describe; they're sent as references to the related record.
+        self.boolean_fields = [
+            f for f in fields if f in describe and describe[f]["type"] == "boolean"
+        ]
+        self.reference_fields = [f for f in fields if "." in f]
 
     def load_records(self, records):
         def _convert(rec):
@@ -431,10 +1059,18 @@ class RestApiDmlOperation(BaseDmlOperation):
             for boolean_field in self.boolean_fields:
                 result[boolean_field] = bool(result[boolean_field])
 
+            # A related record is identified by its external id. Without
+            # one, the field is left unset, as it is by the Bulk API.
+            for reference_field in self.reference_fields:
+                value = result.pop(reference_field)
+                if value is not None and value != "":
+                    relationship, external_id_field = reference_field.split(".", 1)
+                    result[relationship] = {external_id_field: value}
+
             # Remove empty fields (different semantics in REST API)
-            # We do this for insert only - on update, any fields set to `null`
-            # are meant to be blanked out.
-            if self.operation is DataOperationType.INSERT:
+            # We do this for insert and upsert only - on update, any fields
+            # set to `null` are meant to be blanked out.
+            if self.operation in (DataOperationType.INSERT, DataOperationType.UPSERT):
                 result = {
                     k: result[k]
                     for k in result
@@ -444,30 +1080,57 @@ class RestApiDmlOperation(BaseDmlOperation):
             result["attributes"] = {"type": self.sobject}
             return result
 
-        self.results = []
         method = {
             DataOperationType.INSERT: "POST",
             DataOperationType.UPDATE: "PATCH",
+            DataOperationType.UPSERT: "PATCH",
             DataOperationType.DELETE: "DELETE",
         }[self.operation]
-
-        for chunk in get_batch_iterator(
-            records, self.api_options.get("batch_size", 200)
-        ):
+        if self.operation is DataOperationType.UPSERT:
+            upsert_path = f"/{self.sobject}/{self.api_options['update_key']}"
+        else:
+            upsert_path = ""
+        concurrency = self.api_options.get("concurrency") or DEFAULT_CONCURRENCY
+        slots = org_request_slots(self.context.org_config.org_id)
+
+        def _send(chunk):
             if self.operation is DataOperationType.DELETE:
                 url_string = "?ids=" + ",".join(_convert(rec)["Id"] for rec in chunk)
                 json = None
             else:
-                url_string = ""
+                url_string = upsert_path
                 json = {"allOrNone": False, "records": [_convert(rec) for rec in chunk]}
 
-            self.results.extend(
-                self.sf.restful(
+            with slots:
+                return self.sf.restful(
                     f"composite/sobjects{url_string}", method=method, json=json
                 )
-            )
 
-        row_errors = len([res for res in self.results if not res["success"]])
+        self.results = deque()
+        row_errors = 0
+
+        def _collect(future):
+            nonlocal row_errors
+            for res in future.result():
+                result = self._convert_result(res)
+                row_errors += not result.success
+                self.results.append(result)
+
+        # Keep up to `concurrency` composite requests in flight, collecting
+        # responses in the order the chunks were sent.
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            pending = deque()
+            for chunk in get_batch_iterator(
+                records, self.api_options.get("batch_size", 200)
+            ):
+                if len(pending) >= concurrency:
+                    _collect(pending.popleft())
+
+                pending.append(executor.submit(_send, chunk))
+
+            while pending:
+                _collect(pending.popleft())
+
         self.job_result = DataOperationJobResult(
             DataOperationStatus.SUCCESS
             if not row_errors
@@ -477,22 +1140,248 @@ class RestApiDmlOperation(BaseDmlOperation):
             row_errors,
         )
 
+    @staticmethod
+    def _convert_result(res):
+        # TODO: make DataOperationResult handle this error variant
+        if res.get("errors"):
+            errors = "\n".join(
+                f"{e['statusCode']}: {e['message']} ({','.join(e['fields'])})"
+                for e in res["errors"]
+            )
+        else:
+            errors = ""
+
+        return DataOperationResult(res.get("id"), res["success"], errors)
+
     def get_results(self):
-        """Return a generator of DataOperationResult objects."""
+        """Return a generator of DataOperationResult objects.
 
-        def _convert(res):
-            # TODO: make DataOperationResult handle this error variant
-            if res.get("errors"):
-                errors = "\n".join(
-                    f"{e['statusCode']}: {e['message']} ({','.join(e['fields'])})"
-                    for e in res["errors"]
-                )
-            else:
-                errors = ""
+        Results are released as they are consumed."""
+        while self.results:
+            yield self.results.popleft()
+
+
+class Bulk2ApiDmlOperation(BaseDmlOperation, Bulk2JobMixin):
+    """Operation class for all DML operations run using Bulk API 2.0.
+
+    Records are uploaded in a single request per job. If the data exceeds
+    the upload limit for one job, additional jobs are created.
+
+    Bulk API 2.0 returns successful, failed and unprocessed records in
+    separate result sets, each listing its records in the order they were
+    uploaded. Uploaded rows are paired with the next record of whichever
+    result set it belongs to, so that neither duplicate rows nor values that
+    Salesforce normalizes in its results can mismatch them."""
+
+    api = DataApi.BULK2
+
+    def __init__(self, *, sobject, operation, api_options, context, fields):
+        super().__init__(
+            sobject=sobject,
+            operation=operation,
+            api_options=api_options,
+            context=context,
+            fields=fields,
+        )
+        self.csv_buff = io.StringIO(newline="")
+        self.csv_writer = csv.writer(self.csv_buff)
+        self.job_ids = []
+
+    def load_records(self, records):
+        self.job_ids = []
+        # The uploaded data of each job, kept to pair with its results.
+        self.job_data = []
+        self.row_count = 0
+
+        header = self._serialize_csv_record(self.fields)
+        data = None
+        try:
+            for record in records:
+                row = self._serialize_csv_record(record)
+                if data is not None and data.tell() + len(row) > BULK2_MAX_UPLOAD_BYTES:
+                    self._upload(data)
+                    data = None
+                if data is None:
+                    data = tempfile.TemporaryFile()
+                    self.job_data.append(data)
+                    data.write(header)
+
+                data.write(row)
+                self.row_count += 1
+
+            if data is not None:
+                self._upload(data)
+        except BaseException:
+            self._close_job_data()
+            raise
+
+    def _close_job_data(self):
+        for data in self.job_data:
+            data.close()
+        self.job_data = []
+
+    def _upload(self, data):
+        """Create a job, upload the CSV data in `data`, and
+        mark the job as ready for processing."""
+        job = self.sf.restful(
+            "jobs/ingest",
+            method="POST",
+            json={
+                "object": self.sobject,
+                "operation": self.operation.value,
+                "contentType": "CSV",
+                "lineEnding": "CRLF",
+                **(
+                    {"externalIdFieldName": self.api_options["update_key"]}
+                    if self.operation is DataOperationType.UPSERT
+                    else {}
+                ),
+            },
+        )
+        job_id = job["id"]
+        self.job_ids.append(job_id)
+        self.logger.info(f"Uploading data for Bulk API 2.0 job {job_id}")
+
+        data.seek(0)
+        headers = dict(self.sf.headers)
+        headers["Content-Type"] = "text/csv"
+        response = self.sf.session.put(
+            f"{self.sf.base_url}jobs/ingest/{job_id}/batches",
+            data=data,
+            headers=headers,
+        )
+        response.raise_for_status()
+
+        self.sf.restful(
+            f"jobs/ingest/{job_id}",
+            method="PATCH",
+            json={"state": "UploadComplete"},
+        )
+
+    def end(self):
+        results = [
+            self._wait_for_bulk2_job(f"jobs/ingest/{job_id}") for job_id in self.job_ids
+        ]
+        job_errors = [error for result in results for error in result.job_errors]
+        records_processed = sum(result.records_processed for result in results)
+        total_row_errors = sum(result.total_row_errors for result in results)
 
-            return DataOperationResult(res.get("id"), res["success"], errors)
+        if job_errors:
+            status = DataOperationStatus.JOB_FAILURE
+        elif total_row_errors:
+            status = DataOperationStatus.ROW_FAILURE
+        else:
+            status = DataOperationStatus.SUCCESS
 
-        yield from (_convert(res) for res in self.results)
+        self.job_result = DataOperationJobResult(
+            status, job_errors, records_processed, total_row_errors
+        )
+
+    def _serialize_csv_record(self, record):
+        """Given a list of strings (record) return
+        the corresponding record serialized in .csv format"""
+        self.csv_writer.writerow(record)
+        serialized = self.csv_buff.getvalue().encode("utf-8")
+        # flush buffer
+        self.csv_buff.truncate(0)
+        self.csv_buff.seek(0)
+
+        return serialized
+
+    def get_results(self):
+        try:
+            for job_id, data in zip(self.job_ids, self.job_data):
+                data.seek(0)
+                rows = csv.reader(io.TextIOWrapper(data, encoding="utf-8", newline=""))
+                next(rows)
+                with ExitStack() as stack:
+                    streams = []
+                    for result_type in (
+                        "successfulResults",
+                        "failedResults",
+                        "unprocessedrecords",
+                    ):
+                        results = stack.enter_context(
+                            closing(self._iter_job_results(job_id, result_type))
+                        )
+                        streams.append([next(results, None), results])
+
+                    for row in rows:
+                        yield self._next_result(row, streams)
+
+                    if any(head is not None for head, _ in streams):
+                        raise BulkDataException(
+                            f"Bulk API 2.0 job {job_id} returned more results than records uploaded."
+                        )
+        finally:
+            self._close_job_data()
+
+    def _iter_job_results(self, job_id, result_type):
+        """Yield the field values and DataOperationResult of each record
+        in one of a job's result sets, in the order they were uploaded."""
+        with self._bulk2_csv_reader(f"jobs/ingest/{job_id}/{result_type}") as (
+            response,
+            reader,
+        ):
+            headers = next(reader, None)
+            if not headers:
+                return
+
+            field_indexes = [headers.index(f) for f in self.fields]
+            for row in reader:
+                if result_type == "successfulResults":
+                    result = DataOperationResult(
+                        row[headers.index("sf__Id")], True, None
+                    )
+                elif result_type == "failedResults":
+                    result = DataOperationResult(
+                        None, False, row[headers.index("sf__Error")]
+                    )
+                else:
+                    result = DataOperationResult(
+                        None, False, "Record was not processed"
+                    )
+                yield [row[i] for i in field_indexes], result
+
+    def _next_result(self, row, streams):
+        """Take the result of an uploaded row from the next record of the
+        result set that row belongs to.
+
+        Only that set's next record can be the row's result, so of those
+        candidates, the one agreeing with the row on the most values is used.
+        Comparing values decides only between result sets, and never which
+        record within a set, so inexact or repeated values are harmless."""
+        candidates = [stream for stream in streams if stream[0] is not None]
+        if not candidates:
+            return DataOperationResult(None, False, "Record was not processed")
+
+        row = [value.casefold() for value in row]
+        stream = max(
+            candidates,
+            key=lambda stream: sum(
+                value == result_value.casefold()
+                for value, result_value in zip(row, stream[0][0])
+            ),
+        )
+        result = stream[0][1]
+        stream[0] = next(stream[1], None)
+        return result
+
+
+def get_record_counts(sf, sobjects: List[str]) -> Dict[str, int]:
+    """Return the approximate number of records of each of the given sObjects,
+    using a single request to the Record Count API.
+
+    sObjects that the Record Count API does not report are counted as 0."""
+    counts = dict.fromkeys(sobjects, 0)
+    if sobjects:
+        response = sf.restful(f"limits/recordCount?sObjects={','.join(sobjects)}")
+        counts.update(
+            (entry["name"], entry["count"])
+            for entry in response["sObjects"]
+            if entry["name"] in counts
+        )
+    return counts
 
 
 def get_query_operation(
@@ -503,33 +1392,45 @@ def get_query_operation(
     context: Any,
     query: str,
     api: DataApi,
+    volume: Optional[int] = None,
 ) -> BaseQueryOperation:
     """Create an appropriate QueryOperation instance for the given parameters, selecting
     between REST and Bulk APIs based upon volume (Bulk > 2000 records) if DataApi.SMART
-    is provided."""
+    is provided. Bulk API 2.0 is preferred over Bulk API 1.0 where the org's API version
+    supports it, unless `pk_chunk_size` is set in api_options: PK Chunking is only
+    available in Bulk API 1.0.
+
+    If the sObject's record count is already known, pass it as `volume`;
+    otherwise, SMART selection looks it up."""
 
     # The Record Count endpoint requires API 40.0. REST Collections requires 42.0.
     api_version = float(context.sf.sf_version)
     if api_version < 42.0 and api is not DataApi.BULK:
         api = DataApi.BULK
+    if api_version < BULK2_MIN_API_VERSION and api is DataApi.BULK2:
+        api = DataApi.BULK
 
     if api is DataApi.SMART:
-        record_count_response = context.sf.restful(
-            f"limits/recordCount?sObjects={sobject}"
-        )
-        sobject_map = {
-            entry["name"]: entry["count"] for entry in record_count_response["sObjects"]
-        }
-        api = (
-            DataApi.BULK
-            if sobject in sobject_map and sobject_map[sobject] >= 2000
-            else DataApi.REST
-        )
+        if volume is None:
+            volume = get_record_counts(context.sf, [sobject])[sobject]
+        if volume >= SMART_BULK_THRESHOLD:
+            api = (
+                DataApi.BULK2
+                if api_version >= BULK2_MIN_API_VERSION
+                and not api_options.get("pk_chunk_size")
+                else DataApi.BULK
+            )
+        else:
+            api = DataApi.REST
 
     if api is DataApi.BULK:
         return BulkApiQueryOperation(
             sobject=sobject, api_options=api_options, context=context, query=query
         )
+    elif api is DataApi.BULK2:
+        return Bulk2ApiQueryOperation(
+            sobject=sobject, api_options=api_options, context=context, query=query
+        )
     else:
         return RestApiQueryOperation(
             sobject=sobject,
@@ -552,22 +1453,28 @@ def get_dml_operation(
 ) -> BaseDmlOperation:
     """Create an appropriate DmlOperation instance for the given parameters, selecting
     between REST and Bulk APIs based upon volume (Bulk used at volumes over 2000 records,
-    or if the operation is HARD_DELETE, which is only available for Bulk)."""
+    or if the operation is HARD_DELETE, which is only available for Bulk).
+
+    SMART selection uses Bulk API 1.0 rather than Bulk API 2.0, whose results must be
+    matched to the input rows in memory, and whose jobs can't be resumed batch by batch."""
 
     # REST Collections requires 42.0.
     api_version = float(context.sf.sf_version)
     if api_version < 42.0 and api is not DataApi.BULK:
         api = DataApi.BULK
+    if api_version < BULK2_MIN_API_VERSION and api is DataApi.BULK2:
+        api = DataApi.BULK
 
     if api is DataApi.SMART:
-        api = (
-            DataApi.BULK
-            if volume >= 2000 or operation is DataOperationType.HARD_DELETE
-            else DataApi.REST
-        )
+        if volume >= SMART_BULK_THRESHOLD or operation is DataOperationType.HARD_DELETE:
+            api = DataApi.BULK
+        else:
+            api = DataApi.REST
 
     if api is DataApi.BULK:
         api_class = BulkApiDmlOperation
+    elif api is DataApi.BULK2:
+        api_class = Bulk2ApiDmlOperation
     else:
         api_class = RestApiDmlOperation
 
@@ -0,0 +1,86 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import MetaData, create_engine
+from sqlalchemy.orm import Session
+
+from cumulusci.tasks.bulkdata.checkpoints import (
+    CHECKPOINT_TABLE,
+    ExtractWatermarks,
+    LoadCheckpoints,
+)
+
+
+def _make_checkpoints():
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    metadata.bind = engine
+    return LoadCheckpoints(Session(engine), metadata)
+
+
+class TestLoadCheckpoints:
+    def test_step_progress(self):
+        checkpoints = _make_checkpoints()
+        assert not checkpoints.was_started("Accounts")
+
+        checkpoints.start("Accounts", "JOB")
+        checkpoints.batch_uploaded("Accounts", "JOB", "B1", [1, 2])
+        checkpoints.batch_uploaded("Accounts", "JOB", "B2", ["a"])
+        checkpoints.batch_uploaded("Contacts", "JOB2", "B3", [3])
+        assert checkpoints.was_started("Accounts")
+        assert checkpoints.uploaded_batches("Accounts") == [
+            ("JOB", "B1", ["1", "2"]),
+            ("JOB", "B2", ["a"]),
+        ]
+
+        checkpoints.batch_persisted("Accounts", "B1")
+        assert checkpoints.uploaded_batches("Accounts") == [("JOB", "B2", ["a"])]
+
+        checkpoints.complete("Accounts")
+        assert checkpoints.is_completed("Accounts")
+        assert not checkpoints.was_started("Accounts")
+        assert checkpoints.uploaded_batches("Accounts") == []
+        assert checkpoints.uploaded_batches("Contacts") == [("JOB2", "B3", ["3"])]
+
+        checkpoints.clear()
+        assert not checkpoints.is_completed("Accounts")
+        assert checkpoints.uploaded_batches("Contacts") == []
+
+    def test_load_started(self):
+        checkpoints = _make_checkpoints()
+        assert checkpoints.load_started() is None
+
+        started = datetime(2020, 1, 1, 12, 30, tzinfo=timezone.utc)
+        checkpoints.start_load(started)
+        checkpoints.start("Accounts", "JOB")
+        checkpoints.complete("Accounts")
+        assert checkpoints.load_started() == started
+
+        checkpoints.clear()
+        assert checkpoints.load_started() is None
+
+    def test_reuses_existing_table(self):
+        checkpoints = _make_checkpoints()
+        checkpoints.complete("Accounts")
+
+        metadata = MetaData()
+        metadata.reflect(bind=checkpoints.session.connection())
+        assert CHECKPOINT_TABLE in metadata.tables
+        reflected = LoadCheckpoints(checkpoints.session, metadata)
+        assert reflected.table is metadata.tables[CHECKPOINT_TABLE]
+        assert reflected.is_completed("Accounts")
+
+
+class TestExtractWatermarks:
+    def test_watermarks(self):
+        engine = create_engine("sqlite://")
+        metadata = MetaData()
+        metadata.bind = engine
+        watermarks = ExtractWatermarks(Session(engine), metadata)
+        assert watermarks.get("Accounts") is None
+
+        watermarks.set("Accounts", "2020-01-01T00:00:00Z")
+        watermarks.set("Accounts", "2020-01-02T00:00:00Z")
+        watermarks.set("Contacts", "2020-01-03T00:00:00Z")
+
+        assert watermarks.get("Accounts") == "2020-01-02T00:00:00Z"
+        assert watermarks.get("Contacts") == "2020-01-03T00:00:00Z"
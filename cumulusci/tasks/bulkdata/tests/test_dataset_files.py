@@ -0,0 +1,102 @@
+import gzip
+import json
+import os
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, Unicode, create_engine
+
+from cumulusci.core.exceptions import BulkDataException
+from cumulusci.tasks.bulkdata.dataset_files import (
+    MANIFEST_FILE,
+    define_table,
+    hash_mapping,
+    iter_rows,
+    read_manifest,
+    write_dataset,
+)
+from cumulusci.utils import temporary_dir
+
+
+def _make_database():
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    Table(
+        "contacts",
+        metadata,
+        Column("id", Integer(), primary_key=True),
+        Column("last_name", Unicode(255)),
+        Column("household_id", Unicode(255)),
+    )
+    Table(
+        "Account_rt_mapping",
+        metadata,
+        Column("record_type_id", Unicode(18), primary_key=True),
+        Column("developer_name", Unicode(255)),
+    )
+    metadata.create_all(engine)
+    connection = engine.connect()
+    connection.execute(
+        metadata.tables["contacts"].insert(),
+        [
+            {"id": 2, "last_name": "Ünicode", "household_id": None},
+            {"id": 1, "last_name": "", "household_id": "1"},
+        ],
+    )
+    return connection
+
+
+class TestDatasetFiles:
+    def test_round_trip(self):
+        connection = _make_database()
+        with temporary_dir() as d:
+            write_dataset(connection, d, "HASH")
+
+            manifest = read_manifest(d)
+            assert manifest["mapping_hash"] == "HASH"
+            contacts = next(t for t in manifest["tables"] if t["name"] == "contacts")
+            assert contacts == {
+                "name": "contacts",
+                "file": "contacts.ndjson.gz",
+                "rows": 2,
+                "columns": [
+                    {"name": "id", "type": "integer", "primary_key": True},
+                    {"name": "last_name", "type": "string", "length": 255},
+                    {"name": "household_id", "type": "string", "length": 255},
+                ],
+            }
+            with gzip.open(os.path.join(d, "contacts.ndjson.gz"), "rt") as f:
+                assert f.readline() == '[1, "", "1"]\n'
+
+            # Rows are read back in primary key order, with NULLs kept
+            # apart from empty strings.
+            assert list(iter_rows(d, contacts)) == [
+                [1, "", "1"],
+                [2, "Ünicode", None],
+            ]
+
+            metadata = MetaData()
+            table = define_table(contacts, metadata)
+            assert [column.name for column in table.primary_key.columns] == ["id"]
+            assert isinstance(table.columns.id.type, Integer)
+            assert table.columns.last_name.type.length == 255
+
+    def test_read_manifest__missing(self):
+        with temporary_dir() as d:
+            with pytest.raises(BulkDataException):
+                read_manifest(d)
+
+    def test_read_manifest__unsupported_version(self):
+        with temporary_dir() as d:
+            with open(os.path.join(d, MANIFEST_FILE), "w") as f:
+                json.dump({"version": 99, "tables": []}, f)
+            with pytest.raises(BulkDataException):
+                read_manifest(d)
+
+    def test_hash_mapping(self):
+        with temporary_dir() as d:
+            with open("mapping.yml", "w") as f:
+                f.write("Insert Accounts:\n    sf_object: Account\n")
+            assert hash_mapping(os.path.join(d, "mapping.yml")) == hash_mapping(
+                "mapping.yml"
+            )
+            assert len(hash_mapping("mapping.yml")) == 64
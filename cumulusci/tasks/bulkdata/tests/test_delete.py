@@ -14,7 +14,10 @@ from cumulusci.tasks.bulkdata.step import (
     DataApi,
 )
 from cumulusci.tasks.bulkdata.tests.utils import _make_task
-from cumulusci.tasks.bulkdata.tests.test_utils import mock_describe_calls
+from cumulusci.tasks.bulkdata.tests.test_utils import (
+    mock_describe_calls,
+    mock_record_count_calls,
+)
 
 
 class TestDeleteData(unittest.TestCase):
@@ -23,6 +26,7 @@ class TestDeleteData(unittest.TestCase):
     @mock.patch("cumulusci.tasks.bulkdata.delete.get_dml_operation")
     def test_run(self, dml_mock, query_mock):
         mock_describe_calls()
+        mock_record_count_calls({"Contact": 2})
         task = _make_task(DeleteData, {"options": {"objects": "Contact"}})
         query_mock.return_value.get_results.return_value = iter(
             ["001000000000000", "001000000000001"]
@@ -49,6 +53,7 @@ class TestDeleteData(unittest.TestCase):
             context=task,
             query="SELECT Id FROM Contact",
             api=DataApi.SMART,
+            volume=2,
         )
         query_mock.return_value.query.assert_called_once()
         query_mock.return_value.get_results.assert_called_once()
@@ -72,7 +77,10 @@ class TestDeleteData(unittest.TestCase):
     @mock.patch("cumulusci.tasks.bulkdata.delete.get_dml_operation")
     def test_run__no_results(self, dml_mock, query_mock):
         mock_describe_calls()
-        task = _make_task(DeleteData, {"options": {"objects": "Contact"}})
+        mock_record_count_calls({"Contact": 2})
+        task = _make_task(
+            DeleteData, {"options": {"objects": "Contact", "poll_interval": "5"}}
+        )
         query_mock.return_value.get_results.return_value = iter([])
         query_mock.return_value.job_result = DataOperationJobResult(
             DataOperationStatus.SUCCESS, [], 0, 0
@@ -83,10 +91,11 @@ class TestDeleteData(unittest.TestCase):
         query_mock.assert_called_once_with(
             sobject="Contact",
             fields=["Id"],
-            api_options={},
+            api_options={"poll_interval": 5.0},
             context=task,
             query="SELECT Id FROM Contact",
             api=DataApi.SMART,
+            volume=2,
         )
         query_mock.return_value.query.assert_called_once()
         query_mock.return_value.get_results.assert_not_called()
@@ -98,6 +107,7 @@ class TestDeleteData(unittest.TestCase):
     @mock.patch("cumulusci.tasks.bulkdata.delete.get_dml_operation")
     def test_run__job_error_delete(self, dml_mock, query_mock):
         mock_describe_calls()
+        mock_record_count_calls({"Contact": 2})
         task = _make_task(DeleteData, {"options": {"objects": "Contact"}})
         query_mock.return_value.get_results.return_value = iter(
             ["001000000000000", "001000000000001"]
@@ -119,6 +129,7 @@ class TestDeleteData(unittest.TestCase):
     @mock.patch("cumulusci.tasks.bulkdata.delete.get_dml_operation")
     def test_run__job_error_query(self, dml_mock, query_mock):
         mock_describe_calls()
+        mock_record_count_calls({"Contact": 2})
         task = _make_task(DeleteData, {"options": {"objects": "Contact"}})
         query_mock.return_value.get_results.return_value = iter(
             ["001000000000000", "001000000000001"]
@@ -134,6 +145,7 @@ class TestDeleteData(unittest.TestCase):
     @mock.patch("cumulusci.tasks.bulkdata.delete.get_dml_operation")
     def test_run__row_error(self, dml_mock, query_mock):
         mock_describe_calls()
+        mock_record_count_calls({"Contact": 2})
         task = _make_task(DeleteData, {"options": {"objects": "Contact"}})
         query_mock.return_value.get_results.return_value = iter(
             ["001000000000000", "001000000000001"]
@@ -155,6 +167,7 @@ class TestDeleteData(unittest.TestCase):
     @mock.patch("cumulusci.tasks.bulkdata.delete.get_dml_operation")
     def test_run__ignore_error(self, dml_mock, query_mock):
         mock_describe_calls()
+        mock_record_count_calls({"Contact": 2})
         task = _make_task(
             DeleteData,
             {
@@ -189,6 +202,7 @@ class TestDeleteData(unittest.TestCase):
             context=task,
             query="SELECT Id FROM Contact",
             api=DataApi.SMART,
+            volume=2,
             fields=["Id"],
         )
         query_mock.return_value.query.assert_called_once()
@@ -213,6 +227,7 @@ class TestDeleteData(unittest.TestCase):
     @mock.patch("cumulusci.tasks.bulkdata.delete.get_dml_operation")
     def test_run__ignore_error_throttling(self, dml_mock, query_mock):
         mock_describe_calls()
+        mock_record_count_calls({"Contact": 2})
         task = _make_task(
             DeleteData,
             {
@@ -249,6 +264,7 @@ class TestDeleteData(unittest.TestCase):
     @mock.patch("cumulusci.tasks.bulkdata.delete.get_dml_operation")
     def test_run__where(self, dml_mock, query_mock):
         mock_describe_calls()
+        mock_record_count_calls({"Contact": 2})
         task = _make_task(
             DeleteData, {"options": {"objects": "Contact", "where": "Id != null"}}
         )
@@ -275,6 +291,7 @@ class TestDeleteData(unittest.TestCase):
             query="SELECT Id FROM Contact WHERE Id != null",
             fields=["Id"],
             api=DataApi.SMART,
+            volume=2,
         )
         query_mock.return_value.query.assert_called_once()
         query_mock.return_value.get_results.assert_called_once()
@@ -298,6 +315,7 @@ class TestDeleteData(unittest.TestCase):
     @mock.patch("cumulusci.tasks.bulkdata.delete.get_dml_operation")
     def test_run__query_fails(self, dml_mock, query_mock):
         mock_describe_calls()
+        mock_record_count_calls({"Contact": 2})
         task = _make_task(
             DeleteData, {"options": {"objects": "Contact", "where": "Id != null"}}
         )
@@ -403,3 +421,6 @@ class TestDeleteData(unittest.TestCase):
 
         t = _make_task(DeleteData, {"options": {"objects": "a,b"}})
         assert t.options["objects"] == ["a", "b"]
+
+        t = _make_task(DeleteData, {"options": {"objects": "a", "api": "bulk2"}})
+        assert t.options["api"] is DataApi.BULK2
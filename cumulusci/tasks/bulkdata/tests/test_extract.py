@@ -1,10 +1,16 @@
 from datetime import date, timedelta
 import os
+import threading
 import unittest
 from unittest import mock
 
 from cumulusci.core.exceptions import TaskOptionsError, BulkDataException
 from cumulusci.tasks.bulkdata import ExtractData
+from cumulusci.tasks.bulkdata.dataset_files import (
+    hash_mapping,
+    iter_rows,
+    read_manifest,
+)
 from cumulusci.tasks.bulkdata.step import (
     BaseQueryOperation,
     DataOperationStatus,
@@ -13,7 +19,10 @@ from cumulusci.tasks.bulkdata.step import (
     DataApi,
 )
 from cumulusci.tasks.bulkdata.tests.utils import _make_task
-from cumulusci.tasks.bulkdata.tests.test_utils import mock_describe_calls
+from cumulusci.tasks.bulkdata.tests.test_utils import (
+    mock_describe_calls,
+    mock_record_count_calls,
+)
 from cumulusci.utils import temporary_dir
 from cumulusci.tasks.bulkdata.mapping_parser import MappingLookup, MappingStep
 
@@ -21,6 +30,8 @@ import responses
 
 
 class MockBulkQueryOperation(BaseQueryOperation):
+    api = DataApi.BULK
+
     def __init__(self, *, sobject, api_options, context, query):
         super().__init__(
             sobject=sobject, api_options=api_options, context=context, query=query
@@ -48,6 +59,7 @@ class TestExtractData(unittest.TestCase):
         base_path = os.path.dirname(__file__)
         mapping_path = os.path.join(base_path, self.mapping_file_v1)
         mock_describe_calls()
+        mock_record_count_calls()
 
         task = _make_task(
             ExtractData,
@@ -97,6 +109,7 @@ class TestExtractData(unittest.TestCase):
         base_path = os.path.dirname(__file__)
         mapping_path = os.path.join(base_path, self.mapping_file_v1)
         mock_describe_calls()
+        mock_record_count_calls()
 
         task = _make_task(
             ExtractData,
@@ -148,6 +161,7 @@ class TestExtractData(unittest.TestCase):
         base_path = os.path.dirname(__file__)
         mapping_path = os.path.join(base_path, self.mapping_file_v1)
         mock_describe_calls()
+        mock_record_count_calls()
 
         with temporary_dir():
             task = _make_task(
@@ -180,12 +194,182 @@ class TestExtractData(unittest.TestCase):
 
             assert os.path.exists("testdata.sql")
 
+    @responses.activate
+    @mock.patch("cumulusci.tasks.bulkdata.extract.get_query_operation")
+    def test_run__dataset(self, query_op_mock):
+        base_path = os.path.dirname(__file__)
+        mapping_path = os.path.join(base_path, self.mapping_file_v1)
+        mock_describe_calls()
+        mock_record_count_calls()
+
+        with temporary_dir():
+            task = _make_task(
+                ExtractData,
+                {
+                    "options": {
+                        "sql_path": "testdata.sql",
+                        "dataset_path": "dataset",
+                        "mapping": mapping_path,
+                    }
+                },
+            )
+            task.bulk = mock.Mock()
+            task.sf = mock.Mock()
+            task.org_config._is_person_accounts_enabled = False
+
+            mock_query_households = MockBulkQueryOperation(
+                sobject="Account",
+                api_options={},
+                context=task,
+                query="SELECT Id FROM Account",
+            )
+            mock_query_contacts = MockBulkQueryOperation(
+                sobject="Contact",
+                api_options={},
+                context=task,
+                query="SELECT Id, FirstName, LastName, Email, AccountId FROM Contact",
+            )
+            mock_query_households.results = [["001"]]
+            mock_query_contacts.results = [
+                ["003", "First☃", "Last", "test@example.com", "001"]
+            ]
+            query_op_mock.side_effect = [mock_query_households, mock_query_contacts]
+
+            task()
+
+            # The dataset is written instead of the SQL script.
+            assert not os.path.exists("testdata.sql")
+            manifest = read_manifest("dataset")
+            assert manifest["mapping_hash"] == hash_mapping(mapping_path)
+            tables = {table["name"]: table for table in manifest["tables"]}
+            assert set(tables) == {"households", "contacts"}
+            # The mapping uses Salesforce Ids as primary keys.
+            assert list(iter_rows("dataset", tables["contacts"])) == [
+                ["003", "First☃", "Last", "test@example.com", "001"]
+            ]
+
+    @responses.activate
+    @mock.patch("cumulusci.tasks.bulkdata.extract.get_query_operation")
+    def test_run__incremental(self, query_op_mock):
+        base_path = os.path.dirname(__file__)
+        mapping_path = os.path.join(base_path, self.mapping_file_v2)
+        mock_describe_calls()
+        mock_record_count_calls()
+        queries = []
+
+        def run(results):
+            def get_query_operation(
+                *, sobject, fields, api_options, context, query, **kw
+            ):
+                queries.append(query)
+                operation = MockBulkQueryOperation(
+                    sobject=sobject, api_options={}, context=context, query=query
+                )
+                operation.results = results[sobject]
+                return operation
+
+            query_op_mock.side_effect = get_query_operation
+            task = _make_task(
+                ExtractData,
+                {
+                    "options": {
+                        "database_url": "sqlite:///incremental.db",
+                        "mapping": mapping_path,
+                        "incremental": True,
+                    }
+                },
+            )
+            task.bulk = mock.Mock()
+            task.sf = mock.Mock()
+            task.org_config._is_person_accounts_enabled = False
+            task()
+            return task
+
+        with temporary_dir():
+            run(
+                {
+                    "Account": [["001A", "Household", "2020-01-01T00:00:00.000Z"]],
+                    "Contact": [
+                        [
+                            "003A",
+                            "First",
+                            "Last",
+                            "",
+                            "001A",
+                            "2020-01-02T00:00:00.000Z",
+                        ]
+                    ],
+                }
+            )
+            assert queries == [
+                "SELECT Id, Name, SystemModstamp FROM Account "
+                "WHERE RecordType.DeveloperName = 'HH_Account'",
+                "SELECT Id, FirstName, LastName, Email, AccountId, SystemModstamp "
+                "FROM Contact",
+            ]
+
+            queries.clear()
+            task = run(
+                {
+                    "Account": [
+                        ["001B", "Household 2", "2020-01-03T00:00:00.000+0000"]
+                    ],
+                    "Contact": [
+                        [
+                            "003A",
+                            "First",
+                            "Changed",
+                            "",
+                            "001B",
+                            "2020-01-04T00:00:00.000Z",
+                        ],
+                        [
+                            "003C",
+                            "New",
+                            "Contact",
+                            "",
+                            "001A",
+                            "2020-01-04T00:00:05.000Z",
+                        ],
+                    ],
+                }
+            )
+            assert queries == [
+                "SELECT Id, Name, SystemModstamp FROM Account "
+                "WHERE RecordType.DeveloperName = 'HH_Account' "
+                "AND SystemModstamp >= 2020-01-01T00:00:00Z",
+                "SELECT Id, FirstName, LastName, Email, AccountId, SystemModstamp "
+                "FROM Contact WHERE SystemModstamp >= 2020-01-02T00:00:00Z",
+            ]
+
+            def rows(table):
+                table = task.metadata.tables[table]
+                return task.session.execute(
+                    table.select().order_by(table.columns.id)
+                ).fetchall()
+
+            assert rows("households") == [
+                (1, "Household", "HH_Account"),
+                (2, "Household 2", "HH_Account"),
+            ]
+            # The changed contact is updated in place, keeping its local id,
+            # and the lookups of both changed contacts are converted.
+            assert rows("contacts") == [
+                (1, "First", "Changed", "", "2"),
+                (2, "New", "Contact", "", "1"),
+            ]
+            assert rows("contacts_extract_sf_ids") == [(1, "003A"), (2, "003C")]
+            assert "contacts_sf_ids" not in task.metadata.tables
+            assert task.watermarks.get("Insert Households") == "2020-01-03T00:00:00Z"
+            assert task.watermarks.get("Insert Contacts") == "2020-01-04T00:00:05Z"
+
     @responses.activate
     @mock.patch("cumulusci.tasks.bulkdata.extract.get_query_operation")
     def test_run__v2__person_accounts_disabled(self, query_op_mock):
         base_path = os.path.dirname(__file__)
         mapping_path = os.path.join(base_path, self.mapping_file_v2)
         mock_describe_calls()
+        mock_record_count_calls()
 
         task = _make_task(
             ExtractData,
@@ -233,6 +417,7 @@ class TestExtractData(unittest.TestCase):
         base_path = os.path.dirname(__file__)
         mapping_path = os.path.join(base_path, self.mapping_file_v2)
         mock_describe_calls()
+        mock_record_count_calls()
 
         task = _make_task(
             ExtractData,
@@ -303,8 +488,7 @@ class TestExtractData(unittest.TestCase):
             record_iterable=log_mock.return_value,
         )
 
-    @mock.patch("cumulusci.tasks.bulkdata.extract.csv.reader")
-    def test_import_results__autopk(self, csv_mock):
+    def test_import_results__autopk(self):
         task = _make_task(
             ExtractData,
             {"options": {"database_url": "sqlite://", "mapping": "mapping.yml"}},
@@ -321,27 +505,24 @@ class TestExtractData(unittest.TestCase):
             [["111", "Test Opportunity", "1"], ["222", "Test Opportunity 2", "1"]]
         )
         task.session = mock.Mock()
-        task._sql_bulk_insert_from_records = mock.Mock()
+        task._sql_bulk_insert_split_records = mock.Mock()
         task._import_results(mapping, step)
 
         task.session.connection.assert_called_once_with()
         step.get_results.assert_called_once_with()
-        task._sql_bulk_insert_from_records.assert_has_calls(
-            [
-                mock.call(
-                    connection=task.session.connection.return_value,
-                    table="Opportunity",
-                    columns=["Name", "AccountId"],
-                    record_iterable=csv_mock.return_value,
-                ),
-                mock.call(
-                    connection=task.session.connection.return_value,
-                    table=mapping.get_sf_id_table(),
-                    columns=["sf_id"],
-                    record_iterable=csv_mock.return_value,
-                ),
-            ]
+        task._sql_bulk_insert_split_records.assert_called_once_with(
+            connection=task.session.connection.return_value,
+            tables=[
+                ("Opportunity", ["Name", "AccountId"], slice(1, None)),
+                (mapping.get_sf_id_table(), ["sf_id"], slice(1)),
+            ],
+            record_iterable=mock.ANY,
         )
+        records = task._sql_bulk_insert_split_records.call_args[1]["record_iterable"]
+        assert list(records) == [
+            ["111", "Test Opportunity", "1"],
+            ["222", "Test Opportunity 2", "1"],
+        ]
 
     @responses.activate
     def test_import_results__relative_dates(self):
@@ -386,7 +567,7 @@ class TestExtractData(unittest.TestCase):
             {"options": {"database_url": "sqlite://", "mapping": mapping_path}},
         )
         task._extract_record_types = mock.Mock()
-        task._sql_bulk_insert_from_records = mock.Mock()
+        task._sql_bulk_insert_split_records = mock.Mock()
         task.session = mock.Mock()
         task.org_config._is_person_accounts_enabled = False
 
@@ -517,40 +698,95 @@ class TestExtractData(unittest.TestCase):
 
     def test_convert_lookups_to_id__sqlite(self):
         task = _make_task(
-            ExtractData, {"options": {"database_url": "sqlite:///", "mapping": ""}}
+            ExtractData, {"options": {"database_url": "sqlite://", "mapping": ""}}
         )
-
-        task.session = mock.Mock()
-        task.models = {
-            "Account": mock.Mock(),
-            "Account_sf_ids": mock.Mock(),
-            "Opportunity": mock.Mock(),
-            "Opportunity_sf_ids": mock.Mock(),
-        }
         task.mapping = {
-            "Account": MappingStep(sf_object="Account"),
-            "Opportunity": MappingStep(sf_object="Opportunity"),
+            "Account": MappingStep(sf_object="Account", fields=["Name"]),
+            "Opportunity": MappingStep(
+                sf_object="Opportunity",
+                fields=["Name"],
+                lookups={"AccountId": MappingLookup(table="Account", name="AccountId")},
+            ),
         }
-        task.session.query.return_value.filter.return_value.update.side_effect = (
-            NotImplementedError
+        task._init_db()
+        conn = task.session.connection()
+        conn.execute(
+            task.metadata.tables["Account_sf_ids"].insert(),
+            [{"sf_id": "001000000000001"}, {"sf_id": "001000000000002"}],
         )
+        conn.execute(
+            task.metadata.tables["Opportunity"].insert(),
+            [
+                {"Name": "Matched", "AccountId": "001000000000002"},
+                {"Name": "Unmatched", "AccountId": "001000000000009"},
+                {"Name": "Empty", "AccountId": None},
+            ],
+        )
+
+        with mock.patch.object(task.session, "bulk_update_mappings") as bulk_update:
+            task._convert_lookups_to_id(task.mapping["Opportunity"], ["AccountId"])
+        bulk_update.assert_not_called()
+
+        opportunities = task.metadata.tables["Opportunity"]
+        assert task.session.execute(
+            opportunities.select().order_by(opportunities.c.id)
+        ).fetchall() == [
+            (1, "Matched", "2"),
+            (2, "Unmatched", "001000000000009"),
+            (3, "Empty", None),
+        ]
+        assert [
+            index.name for index in task.metadata.tables["Account_sf_ids"].indexes
+        ] == ["ix_Account_sf_ids_sf_id"]
 
-        item = mock.Mock()
-
-        task.session.query.return_value.join.return_value = [(item, "1")]
-
-        task._convert_lookups_to_id(
-            MappingStep(
+    def test_convert_lookups_to_id__incremental(self):
+        task = _make_task(
+            ExtractData,
+            {
+                "options": {
+                    "database_url": "sqlite://",
+                    "mapping": "",
+                    "incremental": True,
+                }
+            },
+        )
+        task.mapping = {
+            "Account": MappingStep(sf_object="Account", fields=["Name"]),
+            "Opportunity": MappingStep(
                 sf_object="Opportunity",
+                fields=["Name"],
                 lookups={"AccountId": MappingLookup(table="Account", name="AccountId")},
             ),
-            ["AccountId"],
+        }
+        task._init_db()
+        conn = task.session.connection()
+        conn.execute(
+            task.metadata.tables["Account_extract_sf_ids"].insert(),
+            [{"sf_id": "001000000000001"}, {"sf_id": "001000000000002"}],
         )
-
-        task.session.bulk_update_mappings.assert_called_once_with(
-            task.models["Opportunity"], [{"id": item.id, "AccountId": "1"}]
+        conn.execute(
+            task.metadata.tables["Opportunity"].insert(),
+            [
+                {"Name": "Changed", "AccountId": "001000000000002"},
+                {"Name": "Unchanged", "AccountId": "001000000000001"},
+            ],
         )
-        task.session.commit.assert_called_once_with()
+        task.incremental_chunk_size = 1
+        task.changed_row_ids = {"Opportunity": {1}}
+
+        task._convert_lookups_to_id(task.mapping["Opportunity"], ["AccountId"])
+
+        # Only the lookups of the rows stored by this extract are converted.
+        opportunities = task.metadata.tables["Opportunity"]
+        assert task.session.execute(
+            opportunities.select().order_by(opportunities.c.id)
+        ).fetchall() == [(1, "Changed", "2"), (2, "Unchanged", "001000000000001")]
+
+        # Nothing is converted in tables that this extract didn't store rows in.
+        task.changed_row_ids = {}
+        task.session = mock.Mock()
+        task._convert_lookups_to_id(task.mapping["Opportunity"], ["AccountId"])
+        task.session.query.assert_not_called()
 
     @mock.patch("cumulusci.tasks.bulkdata.extract.create_table")
     @mock.patch("cumulusci.tasks.bulkdata.extract.mapper")
@@ -567,7 +803,7 @@ class TestExtractData(unittest.TestCase):
         task.models = {}
         task.metadata = mock.Mock()
         task._create_table(mapping)
-        create_mock.assert_called_once_with(mapping, task.metadata)
+        create_mock.assert_called_once_with(mapping, task.metadata, exists_ok=False)
 
         assert "accounts" in task.models
 
@@ -636,7 +872,7 @@ class TestExtractData(unittest.TestCase):
 
         task._create_table(mapping)
 
-        create_mock.assert_called_once_with(mapping, task.metadata)
+        create_mock.assert_called_once_with(mapping, task.metadata, exists_ok=False)
         assert len(table_mock.mock_calls) == 1
 
         assert "accounts" in task.models
@@ -793,15 +1029,51 @@ class TestExtractData(unittest.TestCase):
             sobject="Contact",
             fields=["Id"],
             api=DataApi.SMART,
-            api_options={},
+            api_options={"pk_chunk_size": None, "concurrency": None},
             context=task,
             query="SELECT Id FROM Contact",
+            volume=None,
         )
         query_op_mock.return_value.query.assert_called_once_with()
         task._import_results.assert_called_once_with(
             MappingStep(sf_object="Contact"), query_op_mock.return_value
         )
 
+    @responses.activate
+    def test_init_record_counts(self):
+        mock_describe_calls()
+        mock_record_count_calls({"Account": 2500, "Contact": 10})
+        task = _make_task(
+            ExtractData, {"options": {"database_url": "sqlite:///", "mapping": ""}}
+        )
+        task.mapping = {
+            "Account": MappingStep(sf_object="Account"),
+            "Contact": MappingStep(sf_object="Contact"),
+            "Person Contact": MappingStep(sf_object="Contact"),
+        }
+        task._init_task()
+
+        task._init_record_counts()
+
+        assert task.record_counts == {"Account": 2500, "Contact": 10}
+        assert len(responses.calls) == 1
+        assert "sObjects=Account,Contact" in responses.calls[0].request.url
+
+    @mock.patch("cumulusci.tasks.bulkdata.extract.get_query_operation")
+    def test_run_query__volume(self, query_op_mock):
+        task = _make_task(
+            ExtractData, {"options": {"database_url": "sqlite:///", "mapping": ""}}
+        )
+        task._import_results = mock.Mock()
+        task.record_counts = {"Contact": 2500}
+        query_op_mock.return_value.job_result = DataOperationJobResult(
+            DataOperationStatus.SUCCESS, [], 2500, 0
+        )
+
+        task._run_query("SELECT Id FROM Contact", MappingStep(sf_object="Contact"))
+
+        assert query_op_mock.call_args[1]["volume"] == 2500
+
     @mock.patch("cumulusci.tasks.bulkdata.extract.get_query_operation")
     def test_run_query__no_results(self, query_op_mock):
         task = _make_task(
@@ -818,13 +1090,40 @@ class TestExtractData(unittest.TestCase):
             sobject="Contact",
             fields=["Id"],
             api=DataApi.SMART,
-            api_options={},
+            api_options={"pk_chunk_size": None, "concurrency": None},
             context=task,
             query="SELECT Id FROM Contact",
+            volume=None,
         )
         query_op_mock.return_value.query.assert_called_once_with()
         task._import_results.assert_not_called()
 
+    @mock.patch("cumulusci.tasks.bulkdata.extract.get_query_operation")
+    def test_run_query__pk_chunking(self, query_op_mock):
+        task = _make_task(
+            ExtractData, {"options": {"database_url": "sqlite:///", "mapping": ""}}
+        )
+        task._import_results = mock.Mock()
+        query_op_mock.return_value.job_result = DataOperationJobResult(
+            DataOperationStatus.IN_PROGRESS, [], 0, 0
+        )
+        mapping = MappingStep(sf_object="Contact", pk_chunk_size=100000)
+
+        task._run_query("SELECT Id FROM Contact", mapping)
+
+        query_op_mock.assert_called_once_with(
+            sobject="Contact",
+            fields=["Id"],
+            api=DataApi.SMART,
+            api_options={"pk_chunk_size": 100000, "concurrency": None},
+            context=task,
+            query="SELECT Id FROM Contact",
+            volume=None,
+        )
+        task._import_results.assert_called_once_with(
+            mapping, query_op_mock.return_value
+        )
+
     @mock.patch("cumulusci.tasks.bulkdata.extract.get_query_operation")
     def test_run_query__failure(self, query_op_mock):
         task = _make_task(
@@ -837,6 +1136,133 @@ class TestExtractData(unittest.TestCase):
         with self.assertRaises(BulkDataException):
             task._run_query("SELECT Id FROM Contact", MappingStep(sf_object="Contact"))
 
+    def test_run_queries_in_parallel(self):
+        task = _make_task(
+            ExtractData,
+            {
+                "options": {
+                    "database_url": "sqlite:///",
+                    "mapping": "",
+                    "max_parallel_queries": 3,
+                }
+            },
+        )
+        task.mapping = {
+            "Account": MappingStep(sf_object="Account"),
+            "Contact": MappingStep(sf_object="Contact"),
+            "Lead": MappingStep(sf_object="Lead"),
+        }
+        started = threading.Barrier(3, timeout=5)
+        others_stored = threading.Event()
+        writers = []
+
+        def start_query(soql, mapping):
+            # All queries are in progress at once.
+            started.wait()
+            if mapping.sf_object == "Account":
+                # The first query finishes last.
+                assert others_stored.wait(timeout=5)
+            return mapping.sf_object
+
+        def store_query_results(mapping, step):
+            writers.append((threading.get_ident(), step))
+            if len(writers) == 2:
+                others_stored.set()
+
+        task._start_query = mock.Mock(side_effect=start_query)
+        task._store_query_results = mock.Mock(side_effect=store_query_results)
+
+        task._run_queries_in_parallel()
+
+        task._start_query.assert_any_call(
+            "SELECT Id FROM Contact", task.mapping["Contact"]
+        )
+        # Results are stored as each query completes, from this thread only.
+        assert [step for _, step in writers][-1] == "Account"
+        assert sorted(step for _, step in writers) == ["Account", "Contact", "Lead"]
+        assert {ident for ident, _ in writers} == {threading.get_ident()}
+
+    def test_run_queries_in_parallel__failure(self):
+        task = _make_task(
+            ExtractData,
+            {
+                "options": {
+                    "database_url": "sqlite:///",
+                    "mapping": "",
+                    "max_parallel_queries": 2,
+                }
+            },
+        )
+        task.mapping = {
+            "Account": MappingStep(sf_object="Account"),
+            "Contact": MappingStep(sf_object="Contact"),
+        }
+        task._import_results = mock.Mock()
+
+        def start_query(soql, mapping):
+            step = mock.Mock()
+            status = (
+                DataOperationStatus.JOB_FAILURE
+                if mapping.sf_object == "Account"
+                else DataOperationStatus.SUCCESS
+            )
+            step.job_result = DataOperationJobResult(status, ["Failed"], 1, 0)
+            return step
+
+        task._start_query = mock.Mock(side_effect=start_query)
+
+        with self.assertRaises(BulkDataException):
+            task._run_queries_in_parallel()
+
+    def test_run__parallel_queries(self):
+        task = _make_task(
+            ExtractData,
+            {
+                "options": {
+                    "database_url": "sqlite:///",
+                    "mapping": "",
+                    "max_parallel_queries": 2,
+                }
+            },
+        )
+        task._init_mapping = mock.Mock()
+        task._init_db = mock.Mock()
+        task._init_record_counts = mock.Mock()
+        task._map_autopks = mock.Mock()
+        task._run_queries_in_parallel = mock.Mock()
+        task._run_query = mock.Mock()
+
+        task()
+
+        task._run_queries_in_parallel.assert_called_once_with()
+        task._run_query.assert_not_called()
+
+    def test_init_options__max_parallel_queries(self):
+        with self.assertRaises(TaskOptionsError):
+            _make_task(
+                ExtractData,
+                {
+                    "options": {
+                        "database_url": "sqlite:///",
+                        "mapping": "",
+                        "max_parallel_queries": 0,
+                    }
+                },
+            )
+
+    def test_init_options__incremental_sql_path(self):
+        with self.assertRaises(TaskOptionsError):
+            _make_task(
+                ExtractData,
+                {
+                    "options": {
+                        "sql_path": "sample.sql",
+                        "mapping": "",
+                        "incremental": True,
+                    }
+                },
+            )
+
     def test_init_options__missing_output(self):
         with self.assertRaises(TaskOptionsError):
             _make_task(ExtractData, {"options": {}})
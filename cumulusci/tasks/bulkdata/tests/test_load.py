@@ -1,31 +1,46 @@
-from datetime import date, timedelta
+import functools
+from datetime import date, datetime, timedelta, timezone
 import os
 import json
 import shutil
 import random
 import string
+import threading
 import unittest
 from unittest import mock
 
+import pytest
 import responses
-from sqlalchemy import Column, Table, Unicode
+from salesforce_bulk import BulkApiError
+from sqlalchemy import Column, Table, Unicode, create_engine, inspect
+from sqlalchemy.orm import scoped_session
+from sqlalchemy.dialects import postgresql
 
 from cumulusci.core.exceptions import BulkDataException, TaskOptionsError
 from cumulusci.tasks.bulkdata import LoadData
+from cumulusci.tasks.bulkdata.dataset_files import hash_mapping, write_dataset
 from cumulusci.tasks.bulkdata.step import (
     DataOperationResult,
     DataOperationJobResult,
     DataOperationType,
     DataOperationStatus,
     BaseDmlOperation,
+    BulkApiDmlOperation,
     DataApi,
 )
 from cumulusci.tasks.bulkdata.tests.utils import _make_task
+from cumulusci.tasks.bulkdata.utils import RowErrorChecker
 from cumulusci.tasks.bulkdata.tests.test_utils import mock_describe_calls
 from cumulusci.utils import temporary_dir
 from cumulusci.tasks.bulkdata.mapping_parser import MappingLookup, MappingStep
 
 
+def _make_error_checker(task):
+    return RowErrorChecker(
+        task.logger, task.options["ignore_row_errors"], task.row_warning_limit
+    )
+
+
 class MockBulkApiDmlOperation(BaseDmlOperation):
     def __init__(
         self, *, context, sobject=None, operation=None, api_options=None, fields=None
@@ -153,7 +168,7 @@ class TestLoadData(unittest.TestCase):
         )
         task()
         task._execute_step.assert_called_once_with(
-            MappingStep(sf_object="two", fields={})
+            MappingStep(sf_object="two", fields={}), step_name="Insert Contacts"
         )
 
     def test_run_task__after_steps(self):
@@ -179,7 +194,13 @@ class TestLoadData(unittest.TestCase):
         )
         task()
         task._execute_step.assert_has_calls(
-            [mock.call(1), mock.call(4), mock.call(5), mock.call(2), mock.call(3)]
+            [
+                mock.call(1, step_name="Insert Households"),
+                mock.call(4, step_name="four"),
+                mock.call(5, step_name="five"),
+                mock.call(2, step_name="Insert Contacts"),
+                mock.call(3, step_name="three"),
+            ]
         )
 
     def test_run_task__after_steps_failure(self):
@@ -209,6 +230,527 @@ class TestLoadData(unittest.TestCase):
         with self.assertRaises(BulkDataException):
             task()
 
+    def test_get_step_dependencies(self):
+        mappings = [
+            MappingStep(sf_object="Account", table="Account"),
+            MappingStep(sf_object="Product2", table="Product2"),
+            MappingStep(
+                sf_object="Contact",
+                table="Contact",
+                lookups={"AccountId": MappingLookup(table="Account")},
+            ),
+            MappingStep(
+                sf_object="Opportunity",
+                table="Opportunity",
+                lookups={
+                    "AccountId": MappingLookup(table="Account"),
+                    "ContactId": MappingLookup(table="Contact", after="Insert Contact"),
+                },
+            ),
+            MappingStep(sf_object="Account", table="BusinessAccount"),
+        ]
+
+        assert LoadData._get_step_dependencies(mappings) == [
+            set(),
+            set(),
+            {0},
+            {0},
+            {0},
+        ]
+
+    def _make_parallel_task(self, **options):
+        task = _make_task(
+            LoadData,
+            {
+                "options": {
+                    "database_url": "sqlite://",
+                    "mapping": "mapping.yml",
+                    "max_parallel_steps": 2,
+                    **options,
+                }
+            },
+        )
+        task._init_db = mock.Mock()
+        task._init_mapping = mock.Mock()
+        task._expand_mapping = mock.Mock()
+        task.session = mock.Mock()
+        task.mapping = {
+            "Insert Accounts": MappingStep(sf_object="Account", table="Account"),
+            "Insert Products": MappingStep(sf_object="Product2", table="Product2"),
+            "Insert Contacts": MappingStep(
+                sf_object="Contact",
+                table="Contact",
+                lookups={"AccountId": MappingLookup(table="Account")},
+            ),
+        }
+        task.after_steps = {}
+        return task
+
+    def test_run_task__parallel(self):
+        task = self._make_parallel_task()
+        events = []
+        accounts_started = threading.Event()
+        products_started = threading.Event()
+
+        def execute_step(mapping, step_name):
+            events.append(("start", mapping.sf_object))
+            if mapping.sf_object == "Account":
+                accounts_started.set()
+                # Products start while Accounts are still loading.
+                assert products_started.wait(5)
+            elif mapping.sf_object == "Product2":
+                products_started.set()
+                assert accounts_started.wait(5)
+            events.append(("end", mapping.sf_object))
+            return DataOperationJobResult(DataOperationStatus.SUCCESS, [], 0, 0)
+
+        task._execute_step = mock.Mock(side_effect=execute_step)
+        task()
+
+        assert events.index(("start", "Contact")) > events.index(("end", "Account"))
+        assert task._execute_step.call_count == 3
+        assert task.session.remove.call_count == 3
+
+    def test_run_task__parallel_start_step(self):
+        task = self._make_parallel_task(start_step="Insert Products")
+        task._execute_step = mock.Mock(
+            return_value=DataOperationJobResult(DataOperationStatus.SUCCESS, [], 0, 0)
+        )
+        task()
+
+        assert sorted(
+            call[0][0].sf_object for call in task._execute_step.call_args_list
+        ) == ["Contact", "Product2"]
+
+    def test_run_task__parallel_failure(self):
+        task = self._make_parallel_task()
+
+        def execute_step(mapping, step_name):
+            status = (
+                DataOperationStatus.JOB_FAILURE
+                if mapping.sf_object == "Account"
+                else DataOperationStatus.SUCCESS
+            )
+            return DataOperationJobResult(status, ["Bad"], 0, 0)
+
+        task._execute_step = mock.Mock(side_effect=execute_step)
+
+        with pytest.raises(BulkDataException, match="Insert Accounts"):
+            task()
+
+        # Contacts depend on Accounts, so they are never started.
+        assert "Contact" not in [
+            call[0][0].sf_object for call in task._execute_step.call_args_list
+        ]
+
+    def test_init_options__max_parallel_steps(self):
+        with pytest.raises(TaskOptionsError):
+            _make_task(
+                LoadData,
+                {
+                    "options": {
+                        "database_url": "sqlite://",
+                        "mapping": "mapping.yml",
+                        "max_parallel_steps": 0,
+                    }
+                },
+            )
+
+    @responses.activate
+    @mock.patch("cumulusci.tasks.bulkdata.load.get_dml_operation")
+    def test_run__sql_parallel(self, dml_mock):
+        responses.add(
+            method="GET",
+            url="https://example.com/services/data/v46.0/query/?q=SELECT+Id+FROM+RecordType+WHERE+SObjectType%3D%27Account%27AND+DeveloperName+%3D+%27HH_Account%27+LIMIT+1",
+            body=json.dumps({"records": [{"Id": "1"}]}),
+            status=200,
+        )
+
+        base_path = os.path.dirname(__file__)
+        sql_path = os.path.join(base_path, "testdata.sql")
+        mapping_path = os.path.join(base_path, self.mapping_file)
+
+        task = _make_task(
+            LoadData,
+            {
+                "options": {
+                    "sql_path": sql_path,
+                    "mapping": mapping_path,
+                    "max_parallel_steps": 2,
+                }
+            },
+        )
+        task.bulk = mock.Mock()
+        task.sf = mock.Mock()
+        step = MockBulkApiDmlOperation(
+            sobject="Contact",
+            operation=DataOperationType.INSERT,
+            api_options={},
+            context=task,
+            fields=[],
+        )
+        dml_mock.return_value = step
+        step.results = [
+            DataOperationResult("001000000000000", True, None),
+            DataOperationResult("003000000000000", True, None),
+            DataOperationResult("003000000000001", True, None),
+        ]
+        mock_describe_calls()
+        task.logger = mock.Mock()
+        task()
+
+        # SQLite can't give each step a connection of its own,
+        # so the steps are loaded one at a time.
+        task.logger.warning.assert_any_call(
+            "Loading steps in parallel requires a database_url for a database "
+            "server, such as PostgreSQL. Loading one step at a time."
+        )
+        assert task.options["max_parallel_steps"] == 1
+        assert step.records == [
+            ["TestHousehold", "1"],
+            ["Test☃", "User", "test@example.com", "001000000000000"],
+            ["Error", "User", "error@example.com", "001000000000000"],
+        ]
+        hh_ids = task.session.query(
+            *task.metadata.tables["households_sf_ids"].columns
+        ).one()
+        assert hh_ids == ("1", "001000000000000")
+
+    @mock.patch("cumulusci.tasks.bulkdata.load.create_engine")
+    def test_init_db__parallel_connections(self, create_engine_mock):
+        task = _make_task(
+            LoadData,
+            {
+                "options": {
+                    "database_url": "postgresql://localhost/test",
+                    "mapping": "mapping.yml",
+                    "max_parallel_steps": 3,
+                }
+            },
+        )
+        task.mapping = {}
+        with mock.patch("cumulusci.tasks.bulkdata.load.MetaData"), mock.patch(
+            "cumulusci.tasks.bulkdata.load.automap_base"
+        ), mock.patch("cumulusci.tasks.bulkdata.load.LoadCheckpoints"):
+            task._init_db()
+
+        # Each worker thread and the main thread check out a connection.
+        create_engine_mock.assert_called_once_with(
+            "postgresql://localhost/test", pool_size=4
+        )
+        assert task.options["max_parallel_steps"] == 3
+        assert isinstance(task.session, scoped_session)
+
+    @responses.activate
+    @mock.patch("cumulusci.tasks.bulkdata.load.get_dml_operation")
+    def test_run__resume(self, dml_mock):
+        responses.add(
+            method="GET",
+            url="https://example.com/services/data/v46.0/query/?q=SELECT+Id+FROM+RecordType+WHERE+SObjectType%3D%27Account%27AND+DeveloperName+%3D+%27HH_Account%27+LIMIT+1",
+            body=json.dumps({"records": [{"Id": "1"}]}),
+            status=200,
+        )
+
+        base_path = os.path.dirname(__file__)
+        db_path = os.path.join(base_path, "testdata.db")
+        mapping_path = os.path.join(base_path, self.mapping_file)
+
+        def make_task(resume):
+            task = _make_task(
+                LoadData,
+                {
+                    "options": {
+                        "database_url": f"sqlite:///{tmp_db_path}",
+                        "mapping": mapping_path,
+                        "checkpoint": True,
+                        "resume": resume,
+                    }
+                },
+            )
+            task.bulk = mock.Mock()
+            task.sf = mock.Mock()
+            return task
+
+        def make_step(task, results):
+            step = MockBulkApiDmlOperation(context=task)
+            step.results = results
+            return step
+
+        def interrupted_results():
+            yield 0, [DataOperationResult("003000000000000", True, None)]
+            raise ConnectionError("Interrupted")
+
+        with temporary_dir() as d:
+            tmp_db_path = os.path.join(d, "testdata.db")
+            shutil.copyfile(db_path, tmp_db_path)
+
+            # The first load is interrupted after the first contact is stored.
+            task = make_task(resume=False)
+            households = make_step(
+                task, [DataOperationResult("001000000000000", True, None)]
+            )
+            contacts = make_step(task, [])
+            contacts.iter_batch_results = interrupted_results
+            dml_mock.side_effect = [households, contacts]
+            mock_describe_calls()
+            with pytest.raises(ConnectionError):
+                task()
+            task.session.close()
+            task.engine.dispose()
+
+            # Resuming skips the completed step and the stored contact.
+            task = make_task(resume=True)
+            contacts = make_step(
+                task, [DataOperationResult("003000000000001", True, None)]
+            )
+            dml_mock.side_effect = [contacts]
+            task()
+
+            assert contacts.records == [
+                ["Error", "User", "error@example.com", "001000000000000"]
+            ]
+            contact_ids = task.session.query(
+                *task.metadata.tables["contacts_sf_ids"].columns
+            ).all()
+            assert sorted(contact_ids) == [
+                ("1", "003000000000000"),
+                ("2", "003000000000001"),
+            ]
+            assert task.checkpoints.is_completed("Insert Contacts")
+
+            task.session.close()
+            task.engine.dispose()
+
+    @responses.activate
+    @mock.patch("cumulusci.tasks.bulkdata.load.get_dml_operation")
+    def test_run__resume_failed_upload(self, dml_mock):
+        responses.add(
+            method="GET",
+            url="https://example.com/services/data/v46.0/query/?q=SELECT+Id+FROM+RecordType+WHERE+SObjectType%3D%27Account%27AND+DeveloperName+%3D+%27HH_Account%27+LIMIT+1",
+            body=json.dumps({"records": [{"Id": "1"}]}),
+            status=200,
+        )
+
+        base_path = os.path.dirname(__file__)
+        db_path = os.path.join(base_path, "testdata.db")
+        mapping_path = os.path.join(base_path, self.mapping_file)
+
+        def make_task(resume):
+            task = _make_task(
+                LoadData,
+                {
+                    "options": {
+                        "database_url": f"sqlite:///{tmp_db_path}",
+                        "mapping": mapping_path,
+                        "checkpoint": True,
+                        "resume": resume,
+                    }
+                },
+            )
+            task.bulk = mock.Mock()
+            task.sf = mock.Mock()
+            return task
+
+        def post_batch(job_id, data):
+            if b"Error" in data:
+                raise ConnectionError("Interrupted")
+            return "B1"
+
+        with temporary_dir() as d:
+            tmp_db_path = os.path.join(d, "testdata.db")
+            shutil.copyfile(db_path, tmp_db_path)
+
+            # The first load uploads one batch of contacts, then fails.
+            task = make_task(resume=False)
+            households = MockBulkApiDmlOperation(context=task)
+            households.results = [DataOperationResult("001000000000000", True, None)]
+            contacts = BulkApiDmlOperation(
+                sobject="Contact",
+                operation=DataOperationType.INSERT,
+                api_options={"concurrency": 1},
+                context=task,
+                fields=["FirstName", "LastName", "Email", "AccountId"],
+            )
+            contacts._batch = functools.partial(contacts._batch, n=1)
+            task.bulk.create_job.return_value = "JOB"
+            task.bulk.post_batch.side_effect = post_batch
+            dml_mock.side_effect = [households, contacts]
+            mock_describe_calls()
+            with pytest.raises(ConnectionError):
+                task()
+            task.session.close()
+            task.engine.dispose()
+
+            # Resuming stores the uploaded batch and uploads only the rest.
+            task = make_task(resume=True)
+            contacts = MockBulkApiDmlOperation(context=task)
+            contacts.results = [DataOperationResult("003000000000001", True, None)]
+            dml_mock.side_effect = [contacts]
+            with mock.patch.object(
+                BulkApiDmlOperation,
+                "resume_batch_results",
+                return_value=[
+                    ("B1", [DataOperationResult("003000000000000", True, None)])
+                ],
+            ) as resume_batch_results:
+                task()
+
+            resume_batch_results.assert_called_once_with("JOB", ["B1"])
+            assert contacts.records == [
+                ["Error", "User", "error@example.com", "001000000000000"]
+            ]
+            contact_ids = task.session.query(
+                *task.metadata.tables["contacts_sf_ids"].columns
+            ).all()
+            assert sorted(contact_ids) == [
+                ("1", "003000000000000"),
+                ("2", "003000000000001"),
+            ]
+
+            task.session.close()
+            task.engine.dispose()
+
+    def test_recover_uploaded_batches(self):
+        with temporary_dir() as d:
+            task = _make_task(
+                LoadData,
+                {
+                    "options": {
+                        "database_url": f"sqlite:///{os.path.join(d, 'test.db')}",
+                        "mapping": "mapping.yml",
+                        "resume": True,
+                    }
+                },
+            )
+            task.mapping = {}
+            task._init_db()
+            mapping = MappingStep(sf_object="Contact", table="contacts")
+            task.checkpoints.start("Insert Contacts", "JOB")
+            task.checkpoints.batch_uploaded("Insert Contacts", "JOB", "B1", [1, 2])
+            task.checkpoints.batch_uploaded("Insert Contacts", "JOB", "B2", [3])
+            task.session.commit()
+
+            with mock.patch(
+                "cumulusci.tasks.bulkdata.load.BulkApiDmlOperation"
+            ) as bulk_op:
+                # B2 failed, so it isn't returned.
+                bulk_op.return_value.resume_batch_results.return_value = [
+                    (
+                        "B1",
+                        [
+                            DataOperationResult("003000000000001", True, None),
+                            DataOperationResult("003000000000002", True, None),
+                        ],
+                    )
+                ]
+                task._recover_uploaded_batches(mapping, "Insert Contacts")
+
+            bulk_op.return_value.resume_batch_results.assert_called_once_with(
+                "JOB", ["B1", "B2"]
+            )
+            contact_ids = task.session.query(
+                *task.metadata.tables["contacts_sf_ids"].columns
+            ).all()
+            assert sorted(contact_ids) == [
+                ("1", "003000000000001"),
+                ("2", "003000000000002"),
+            ]
+            assert task.checkpoints.uploaded_batches("Insert Contacts") == []
+            task.session.close()
+            task.engine.dispose()
+
+    def test_recover_uploaded_batches__job_deleted(self):
+        task = _make_task(
+            LoadData,
+            {"options": {"database_url": "sqlite://", "mapping": "mapping.yml"}},
+        )
+        task.session = mock.Mock()
+        task.checkpoints = mock.Mock()
+        task.checkpoints.uploaded_batches.return_value = [("JOB", "B1", ["1"])]
+        task._initialize_id_table = mock.Mock(return_value="contacts_sf_ids")
+        task.bulk = mock.Mock()
+        task.sf = mock.Mock()
+        task.logger = mock.Mock()
+
+        with mock.patch.object(
+            BulkApiDmlOperation,
+            "resume_batch_results",
+            side_effect=BulkApiError("InvalidJob", 400),
+        ):
+            task._recover_uploaded_batches(
+                MappingStep(sf_object="Contact", table="contacts"), "Insert Contacts"
+            )
+
+        # The batch's records are queried and loaded again.
+        assert "loaded again" in task.logger.warning.call_args[0][0]
+        task.checkpoints.batch_persisted.assert_called_once_with(
+            "Insert Contacts", "B1"
+        )
+
+    def test_recover_uploaded_batches__interrupted_upload(self):
+        task = _make_task(
+            LoadData,
+            {"options": {"database_url": "sqlite://", "mapping": "mapping.yml"}},
+        )
+        task.checkpoints = mock.Mock()
+        task.checkpoints.uploaded_batches.return_value = []
+        task.checkpoints.was_started.return_value = True
+        task.logger = mock.Mock()
+
+        task._recover_uploaded_batches(
+            MappingStep(sf_object="Contact", table="contacts"), "Insert Contacts"
+        )
+
+        assert "loaded again" in task.logger.warning.call_args[0][0]
+
+    def test_init_db__checkpoint(self):
+        with temporary_dir() as d:
+            database_url = f"sqlite:///{os.path.join(d, 'test.db')}"
+            for options, has_checkpoints in (
+                ({}, False),
+                ({"checkpoint": True}, True),
+                ({"resume": True}, True),
+            ):
+                task = _make_task(
+                    LoadData,
+                    {
+                        "options": {
+                            "database_url": database_url,
+                            "mapping": "mapping.yml",
+                            **options,
+                        }
+                    },
+                )
+                task.mapping = {}
+                task._init_db()
+
+                assert (task.checkpoints is not None) is has_checkpoints
+                assert (
+                    "cumulusci_load_checkpoints"
+                    in inspect(task.engine).get_table_names()
+                ) is has_checkpoints
+                task.session.close()
+                task.engine.dispose()
+
+    def test_init_db__resume_in_memory(self):
+        task = _make_task(
+            LoadData,
+            {
+                "options": {
+                    "database_url": "sqlite://",
+                    "mapping": "mapping.yml",
+                    "resume": True,
+                }
+            },
+        )
+        task.mapping = {}
+        with pytest.raises(TaskOptionsError, match="resume"):
+            task._init_db()
+
+        task.options["resume"] = False
+        with pytest.raises(TaskOptionsError, match="checkpoint"):
+            task._init_db()
+
     @responses.activate
     @mock.patch("cumulusci.tasks.bulkdata.load.get_dml_operation")
     def test_run__sql(self, dml_mock):
@@ -235,25 +777,148 @@ class TestLoadData(unittest.TestCase):
             context=task,
             fields=[],
         )
-        dml_mock.return_value = step
-        step.results = [
-            DataOperationResult("001000000000000", True, None),
-            DataOperationResult("003000000000000", True, None),
-            DataOperationResult("003000000000001", True, None),
-        ]
-        mock_describe_calls()
-        task()
+        dml_mock.return_value = step
+        step.results = [
+            DataOperationResult("001000000000000", True, None),
+            DataOperationResult("003000000000000", True, None),
+            DataOperationResult("003000000000001", True, None),
+        ]
+        mock_describe_calls()
+        task()
+
+        assert step.records == [
+            ["TestHousehold", "1"],
+            ["Test☃", "User", "test@example.com", "001000000000000"],
+            ["Error", "User", "error@example.com", "001000000000000"],
+        ]
+
+        hh_ids = task.session.query(
+            *task.metadata.tables["households_sf_ids"].columns
+        ).one()
+        assert hh_ids == ("1", "001000000000000")
+
+    @responses.activate
+    @mock.patch("cumulusci.tasks.bulkdata.load.get_dml_operation")
+    def test_run__sqlite_database(self, dml_mock):
+        responses.add(
+            method="GET",
+            url="https://example.com/services/data/v46.0/query/?q=SELECT+Id+FROM+RecordType+WHERE+SObjectType%3D%27Account%27AND+DeveloperName+%3D+%27HH_Account%27+LIMIT+1",
+            body=json.dumps({"records": [{"Id": "1"}]}),
+            status=200,
+        )
+
+        base_path = os.path.dirname(__file__)
+        db_path = os.path.join(base_path, "testdata.db")
+        mapping_path = os.path.join(base_path, self.mapping_file)
+
+        with temporary_dir() as d:
+            tmp_db_path = os.path.join(d, "testdata.db")
+            shutil.copyfile(db_path, tmp_db_path)
+            os.chmod(tmp_db_path, 0o444)
+
+            task = _make_task(
+                LoadData,
+                {"options": {"sql_path": tmp_db_path, "mapping": mapping_path}},
+            )
+            task.bulk = mock.Mock()
+            task.sf = mock.Mock()
+            step = MockBulkApiDmlOperation(context=task)
+            dml_mock.return_value = step
+            step.results = [
+                DataOperationResult("001000000000000", True, None),
+                DataOperationResult("003000000000000", True, None),
+                DataOperationResult("003000000000001", True, None),
+            ]
+            mock_describe_calls()
+            task()
+
+            # The database is read in place, and the Ids are stored elsewhere.
+            assert step.records == [
+                ["TestHousehold", "1"],
+                ["Test", "User", "test@example.com", "001000000000000"],
+                ["Error", "User", "error@example.com", "001000000000000"],
+            ]
+            hh_ids = task.session.query(
+                *task.metadata.tables["households_sf_ids"].columns
+            ).one()
+            assert hh_ids == ("1", "001000000000000")
+            task.session.close()
+            task.engine.dispose()
+
+            with open(db_path, "rb") as original, open(tmp_db_path, "rb") as f:
+                assert f.read() == original.read()
+
+    @responses.activate
+    @mock.patch("cumulusci.tasks.bulkdata.load.get_dml_operation")
+    def test_run__dataset(self, dml_mock):
+        responses.add(
+            method="GET",
+            url="https://example.com/services/data/v46.0/query/?q=SELECT+Id+FROM+RecordType+WHERE+SObjectType%3D%27Account%27AND+DeveloperName+%3D+%27HH_Account%27+LIMIT+1",
+            body=json.dumps({"records": [{"Id": "1"}]}),
+            status=200,
+        )
 
-        assert step.records == [
-            ["TestHousehold", "1"],
-            ["Test☃", "User", "test@example.com", "001000000000000"],
-            ["Error", "User", "error@example.com", "001000000000000"],
-        ]
+        base_path = os.path.dirname(__file__)
+        mapping_path = os.path.join(base_path, self.mapping_file)
+        engine = create_engine(f"sqlite:///{os.path.join(base_path, 'testdata.db')}")
 
-        hh_ids = task.session.query(
-            *task.metadata.tables["households_sf_ids"].columns
-        ).one()
-        assert hh_ids == ("1", "001000000000000")
+        with temporary_dir() as d:
+            with engine.connect() as connection:
+                write_dataset(connection, d, hash_mapping(mapping_path))
+            engine.dispose()
+
+            task = _make_task(
+                LoadData,
+                {"options": {"dataset_path": d, "mapping": mapping_path}},
+            )
+            task.bulk = mock.Mock()
+            task.sf = mock.Mock()
+            task.logger = mock.Mock()
+            step = MockBulkApiDmlOperation(context=task)
+            dml_mock.return_value = step
+            step.results = [
+                DataOperationResult("001000000000000", True, None),
+                DataOperationResult("003000000000000", True, None),
+                DataOperationResult("003000000000001", True, None),
+            ]
+            mock_describe_calls()
+            task()
+
+            assert step.records == [
+                ["TestHousehold", "1"],
+                ["Test", "User", "test@example.com", "001000000000000"],
+                ["Error", "User", "error@example.com", "001000000000000"],
+            ]
+            task.logger.warning.assert_not_called()
+            task.session.close()
+            task.engine.dispose()
+
+    def test_sqlite_load__commits_in_chunks(self):
+        with temporary_dir() as d:
+            sql_path = os.path.join(d, "widgets.sql")
+            with open(sql_path, "w") as f:
+                f.write(
+                    """BEGIN TRANSACTION;
+CREATE TABLE widgets (id INTEGER PRIMARY KEY, name VARCHAR(255));
+INSERT INTO widgets VALUES (1, 'a;b'); INSERT INTO widgets VALUES (2, 'c
+d');
+COMMIT;
+"""
+                )
+            task = _make_task(
+                LoadData, {"options": {"sql_path": sql_path, "mapping": "mapping.yml"}}
+            )
+            task.mapping = {}
+            with mock.patch("cumulusci.tasks.bulkdata.load.SQL_IMPORT_COMMIT_SIZE", 1):
+                task._init_db()
+
+            assert task.engine.url.database.startswith(task._temp_dir.name)
+            assert task.session.execute(
+                "SELECT id, name FROM widgets ORDER BY id"
+            ).fetchall() == [(1, "a;b"), (2, "c\nd")]
+            assert task.checkpoints is None
+            task.session.close()
+            task.engine.dispose()
 
     def test_init_options__missing_input(self):
         with self.assertRaises(TaskOptionsError):
@@ -449,6 +1114,25 @@ class TestLoadData(unittest.TestCase):
             records,
         )
 
+    def test_stream_queried_data__logs_progress(self):
+        task = _make_task(
+            LoadData, {"options": {"database_url": "sqlite://", "mapping": "test.yml"}}
+        )
+        task.sf = mock.Mock()
+        task.logger = mock.Mock()
+        mapping = MappingStep(sf_object="Account", fields=["Name"])
+        query = mock.Mock()
+        query.yield_per.return_value = [[str(i), "Test"] for i in range(10001)]
+
+        list(task._stream_queried_data(mapping, [], query, 20000))
+
+        task.logger.info.assert_has_calls(
+            [
+                mock.call("Prepared 10000 of ~20000 rows for insert to Account"),
+                mock.call("Prepared 10001 rows for insert to Account"),
+            ]
+        )
+
     @responses.activate
     def test_stream_queried_data__adjusts_relative_dates(self):
         mock_describe_calls()
@@ -482,6 +1166,195 @@ class TestLoadData(unittest.TestCase):
             records,
         )
 
+    def _make_volume_task(self, tmpdir, **mapping):
+        sql_path = os.path.join(tmpdir, "widgets.sql")
+        with open(sql_path, "w") as f:
+            f.write(
+                """CREATE TABLE widgets (id INTEGER PRIMARY KEY, name VARCHAR(255), kind VARCHAR(255));
+WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 2500)
+INSERT INTO widgets SELECT x, 'Widget ' || x, CASE WHEN x <= 100 THEN 'small' ELSE 'big' END FROM c;
+"""
+            )
+        task = _make_task(
+            LoadData, {"options": {"sql_path": sql_path, "mapping": "mapping.yml"}}
+        )
+        task.mapping = {
+            "Insert Widgets": MappingStep(
+                sf_object="Widget__c",
+                table="widgets",
+                fields={"Name": "name"},
+                **mapping,
+            )
+        }
+        task._init_db()
+        return task, task.mapping["Insert Widgets"]
+
+    def _make_lookup_task(self, tmpdir, **options):
+        sql_path = os.path.join(tmpdir, "contacts.sql")
+        with open(sql_path, "w") as f:
+            f.write(
+                """CREATE TABLE households (id INTEGER PRIMARY KEY, name VARCHAR(255));
+CREATE TABLE contacts (id INTEGER PRIMARY KEY, last_name VARCHAR(255), household_id INTEGER);
+INSERT INTO households VALUES (1, 'Household');
+INSERT INTO contacts VALUES (1, 'User', 1);
+"""
+            )
+        task = _make_task(
+            LoadData,
+            {"options": {"sql_path": sql_path, "mapping": "mapping.yml", **options}},
+        )
+        task.logger = mock.Mock()
+        task.mapping = {
+            "Insert Contacts": MappingStep(
+                sf_object="Contact",
+                table="contacts",
+                fields={"LastName": "last_name"},
+                lookups={
+                    "AccountId": MappingLookup(
+                        table="households", key_field="household_id"
+                    )
+                },
+            )
+        }
+        task._init_db()
+        id_table = task._initialize_id_table({"table": "households"}, True)
+        task.session.execute(
+            task.metadata.tables[id_table].insert().values(id="1", sf_id="001")
+        )
+        return task, task.mapping["Insert Contacts"]
+
+    def test_create_step_indexes(self):
+        with temporary_dir() as d:
+            task, mapping = self._make_lookup_task(d)
+
+            task._create_step_indexes(mapping)
+            task._create_step_indexes(mapping)
+
+            indexes = inspect(task.engine).get_indexes("contacts")
+            assert [index["column_names"] for index in indexes] == [["household_id"]]
+            # The id table's primary key is already indexed.
+            assert [
+                call
+                for call in task.logger.info.call_args_list
+                if "Creating index" in call[0][0]
+            ] == [mock.call("Creating index ix_contacts_household_id")]
+
+    def test_query_db__lookup_uses_index(self):
+        with temporary_dir() as d:
+            task, mapping = self._make_lookup_task(d, explain=True)
+
+            # The integer key is compared as a string, as the ids are stored.
+            query = task._query_db(mapping)
+            assert query.all() == [(1, "User", "001")]
+
+            task._explain_query(mapping, query)
+            plan = " ".join(call[0][0] for call in task.logger.info.call_args_list)
+            assert "Query plan for Contact from contacts" in plan
+            assert "USING INDEX" in plan
+
+    def test_query_db__resume_integer_pk(self):
+        with temporary_dir() as d:
+            task, mapping = self._make_lookup_task(d)
+            task.options["resume"] = True
+            task.session.commit()
+            id_table = task._initialize_id_table({"table": "contacts"}, True)
+            task.session.execute(
+                task.metadata.tables[id_table].insert().values(id="1", sf_id="003")
+            )
+
+            query = task._query_db(mapping)
+
+            # PostgreSQL won't compare the integer key with the stored ids.
+            sql = str(query.statement.compile(dialect=postgresql.dialect()))
+            assert "contacts_sf_ids.id = CAST(contacts.id AS VARCHAR(255))" in sql
+            assert query.all() == []
+
+    def test_query_db__external_id_lookup(self):
+        with temporary_dir() as d:
+            task, mapping = self._make_lookup_task(d)
+            task.mapping["Upsert Households"] = MappingStep(
+                sf_object="Account",
+                table="households",
+                fields={"Name": "name", "External_Id__c": "name"},
+                action="upsert",
+                update_key="External_Id__c",
+            )
+            mapping.lookups["AccountId"].external_id_field = "External_Id__c"
+
+            # The related record's own external id is sent; no Id is needed.
+            assert mapping.get_field_list() == [
+                "LastName",
+                "Account.External_Id__c",
+            ]
+            query = task._query_db(mapping)
+            assert query.all() == [(1, "User", "Household")]
+
+    def test_estimate_volume(self):
+        with temporary_dir() as d:
+            task, mapping = self._make_volume_task(d)
+
+            assert task._estimate_volume(mapping, task._query_db(mapping)) == 2500
+            assert task._table_row_counts == {"widgets": (2500, True)}
+
+            # Table counts are cached for the run.
+            query = task._query_db(mapping)
+            with mock.patch.object(task, "session") as session:
+                assert task._estimate_volume(mapping, query) == 2500
+            session.query.assert_not_called()
+
+    def test_estimate_volume__filtered(self):
+        with temporary_dir() as d:
+            task, mapping = self._make_volume_task(d, filters=["kind = 'small'"])
+
+            # The table is over the threshold, so the filtered rows are counted.
+            assert task._estimate_volume(mapping, task._query_db(mapping)) == 100
+
+    def test_estimate_volume__filtered_small_table(self):
+        with temporary_dir() as d:
+            task, mapping = self._make_volume_task(d, filters=["kind = 'small'"])
+            task._table_row_counts["widgets"] = (1000, True)
+
+            # The filtered rows can't reach the threshold; no need to count them.
+            assert task._estimate_volume(mapping, task._query_db(mapping)) == 1000
+
+    def test_estimate_volume__api_specified(self):
+        with temporary_dir() as d:
+            task, mapping = self._make_volume_task(
+                d, filters=["kind = 'small'"], api="bulk"
+            )
+
+            assert task._estimate_volume(mapping, task._query_db(mapping)) == 2500
+
+    def test_estimate_volume__planner_estimate(self):
+        task = _make_task(
+            LoadData,
+            {"options": {"database_url": "postgresql://", "mapping": "mapping.yml"}},
+        )
+        task.engine = mock.Mock()
+        task.engine.dialect.name = "postgresql"
+        task.session = mock.Mock()
+        task.session.execute.return_value.scalar.return_value = 10000.0
+        task.session.query.return_value.select_from.return_value.scalar.return_value = (
+            1800
+        )
+        task.models = {"widgets": type("Widget", (), {"__table__": mock.Mock()})}
+        mapping = MappingStep(sf_object="Widget__c", table="widgets")
+        query = mock.Mock(whereclause=None)
+
+        assert task._estimate_volume(mapping, query) == 10000
+        task.session.query.assert_not_called()
+
+        # Estimates close to the SMART threshold are checked with an exact count.
+        task._table_row_counts = {}
+        task.session.execute.return_value.scalar.return_value = 1500.0
+        assert task._estimate_volume(mapping, query) == 1800
+        assert task._table_row_counts == {"widgets": (1800, True)}
+
+        # Tables that were never analyzed have no estimate.
+        task._table_row_counts = {}
+        task.session.execute.return_value.scalar.return_value = -1.0
+        assert task._estimate_volume(mapping, query) == 1800
+
     def test_get_statics(self):
         task = _make_task(
             LoadData, {"options": {"database_url": "sqlite://", "mapping": "test.yml"}}
@@ -947,12 +1820,73 @@ class TestLoadData(unittest.TestCase):
         mapping = MappingStep(sf_object="Account", table="Account")
         task._process_job_results(mapping, step, local_ids)
 
-        task.session.connection.assert_called_once()
         task._initialize_id_table.assert_called_once_with(mapping, True)
         task._sql_bulk_insert_from_records.assert_not_called()
-        task.session.commit.assert_called_once()
+        task.session.commit.assert_not_called()
         assert len(task.logger.mock_calls) == 4
 
+    def test_process_job_results__persists_each_batch(self):
+        task = _make_task(
+            LoadData,
+            {"options": {"database_url": "sqlite://", "mapping": "mapping.yml"}},
+        )
+
+        task.session = mock.Mock()
+        task._initialize_id_table = mock.Mock(return_value="Account_sf_ids")
+        task._sql_bulk_insert_from_records = mock.Mock()
+        task._can_load_person_accounts = mock.Mock(return_value=True)
+        task._generate_contact_id_map_for_person_accounts = mock.Mock()
+        task.bulk = mock.Mock()
+        task.sf = mock.Mock()
+
+        step = MockBulkApiDmlOperation(
+            sobject="Contact",
+            operation=DataOperationType.INSERT,
+            api_options={},
+            context=task,
+            fields=[],
+        )
+        inserted = []
+
+        def iter_batch_results():
+            yield 2, [DataOperationResult("003000000000003", True, None)]
+            # The first batch's Ids are stored before the next batch completes.
+            inserted.extend(task._sql_bulk_insert_from_records.call_args_list)
+            yield 0, [
+                DataOperationResult("003000000000001", True, None),
+                DataOperationResult("003000000000002", True, None),
+            ]
+            step.job_result = DataOperationJobResult(
+                DataOperationStatus.JOB_FAILURE, ["Bad"], 3, 0
+            )
+
+        step.iter_batch_results = iter_batch_results
+
+        mapping = MappingStep(
+            sf_object="Contact",
+            table="Contact",
+            lookups={"AccountId": MappingLookup(table="Account")},
+        )
+        task._process_job_results(mapping, step, ["1", "2", "3"])
+
+        assert inserted == [
+            mock.call(
+                connection=task.session.connection.return_value,
+                table="Account_sf_ids",
+                columns=("id", "sf_id"),
+                record_iterable=[("3", "003000000000003")],
+            )
+        ]
+        task._sql_bulk_insert_from_records.assert_called_with(
+            connection=task.session.connection.return_value,
+            table="Account_sf_ids",
+            columns=("id", "sf_id"),
+            record_iterable=[("1", "003000000000001"), ("2", "003000000000002")],
+        )
+        assert task.session.commit.call_count == 2
+        # The job failed, so person account Contacts aren't mapped.
+        task._generate_contact_id_map_for_person_accounts.assert_not_called()
+
     def test_process_job_results__update_success(self):
         task = _make_task(
             LoadData,
@@ -1300,6 +2234,7 @@ class TestLoadData(unittest.TestCase):
             return_value=can_load_person_accounts
         )
         task._generate_contact_id_map_for_person_accounts = mock.Mock()
+        task._count_table_rows = mock.Mock(return_value=(5, True))
 
         local_ids = ["1"]
 
@@ -1321,8 +2256,12 @@ class TestLoadData(unittest.TestCase):
 
         task._process_job_results(mapping, step, local_ids)
 
+        # The step loaded one of the table's five Contacts.
         task._generate_contact_id_map_for_person_accounts.assert_called_once_with(
-            mapping, mapping.lookups["AccountId"], task.session.connection.return_value
+            mapping,
+            mapping.lookups["AccountId"],
+            task.session.connection.return_value,
+            4,
         )
 
         task._sql_bulk_insert_from_records.assert_called_with(
@@ -1338,17 +2277,16 @@ class TestLoadData(unittest.TestCase):
             {"options": {"database_url": "sqlite://", "mapping": "mapping.yml"}},
         )
 
-        step = mock.Mock()
-        step.get_results.return_value = iter(
-            [
-                DataOperationResult("001000000000000", True, None),
-                DataOperationResult("001000000000001", True, None),
-                DataOperationResult("001000000000002", True, None),
-            ]
-        )
+        results = [
+            DataOperationResult("001000000000000", True, None),
+            DataOperationResult("001000000000001", True, None),
+            DataOperationResult("001000000000002", True, None),
+        ]
 
         generator = task._generate_results_id_map(
-            step, ["001000000000009", "001000000000010", "001000000000011"]
+            results,
+            ["001000000000009", "001000000000010", "001000000000011"],
+            _make_error_checker(task),
         )
 
         assert list(generator) == [
@@ -1363,19 +2301,18 @@ class TestLoadData(unittest.TestCase):
             {"options": {"database_url": "sqlite://", "mapping": "mapping.yml"}},
         )
 
-        step = mock.Mock()
-        step.get_results.return_value = iter(
-            [
-                DataOperationResult("001000000000000", True, None),
-                DataOperationResult(None, False, "error"),
-                DataOperationResult("001000000000002", True, None),
-            ]
-        )
+        results = [
+            DataOperationResult("001000000000000", True, None),
+            DataOperationResult(None, False, "error"),
+            DataOperationResult("001000000000002", True, None),
+        ]
 
         with self.assertRaises(BulkDataException) as ex:
             list(
                 task._generate_results_id_map(
-                    step, ["001000000000009", "001000000000010", "001000000000011"]
+                    results,
+                    ["001000000000009", "001000000000010", "001000000000011"],
+                    _make_error_checker(task),
                 )
             )
 
@@ -1394,31 +2331,29 @@ class TestLoadData(unittest.TestCase):
             },
         )
 
-        step = mock.Mock()
-        step.get_results.return_value = iter(
-            [DataOperationResult(None, False, None)] * 15
-        )
+        results = [DataOperationResult(None, False, None)] * 15
 
         with mock.patch.object(task.logger, "warning") as warning:
             generator = task._generate_results_id_map(
-                step, ["001000000000009", "001000000000010", "001000000000011"] * 15
+                results,
+                ["001000000000009", "001000000000010", "001000000000011"] * 15,
+                _make_error_checker(task),
             )
             _ = list(generator)  # generate the errors
 
         assert len(warning.mock_calls) == task.row_warning_limit + 1 == 11
         assert "warnings suppressed" in str(warning.mock_calls[-1])
 
-        step = mock.Mock()
-        step.get_results.return_value = iter(
-            [
-                DataOperationResult("001000000000000", True, None),
-                DataOperationResult(None, False, None),
-                DataOperationResult("001000000000002", True, None),
-            ]
-        )
+        results = [
+            DataOperationResult("001000000000000", True, None),
+            DataOperationResult(None, False, None),
+            DataOperationResult("001000000000002", True, None),
+        ]
 
         generator = task._generate_results_id_map(
-            step, ["001000000000009", "001000000000010", "001000000000011"]
+            results,
+            ["001000000000009", "001000000000010", "001000000000011"],
+            _make_error_checker(task),
         )
 
         assert list(generator) == [
@@ -1437,6 +2372,8 @@ class TestLoadData(unittest.TestCase):
         task._load_record_types = mock.Mock()
         task._process_job_results = mock.Mock()
         task._query_db = mock.Mock()
+        task._create_step_indexes = mock.Mock()
+        task._estimate_volume = mock.Mock(return_value=1)
 
         task._execute_step(
             MappingStep(
@@ -1463,6 +2400,57 @@ class TestLoadData(unittest.TestCase):
             ["Account"], task.session.connection.return_value
         )
 
+    @mock.patch("cumulusci.tasks.bulkdata.load.get_dml_operation")
+    def test_execute_step__checkpoints_batches(self, dml_mock):
+        task = _make_task(
+            LoadData,
+            {"options": {"database_url": "sqlite://", "mapping": "mapping.yml"}},
+        )
+        task.session = mock.Mock()
+        task.checkpoints = mock.Mock()
+        task._query_db = mock.Mock()
+        task._create_step_indexes = mock.Mock()
+        task._estimate_volume = mock.Mock(return_value=3)
+        task._stream_queried_data = mock.Mock()
+
+        def stream(mapping, local_ids, query, volume):
+            for local_id in ["1", "2", "3"]:
+                local_ids.append(local_id)
+            return []
+
+        def process_job_results(mapping, step, local_ids, on_batch_persisted):
+            on_batch_persisted(2)
+
+        def load_records(records, on_batch_uploaded):
+            # Each batch is recorded and committed as soon as it is uploaded.
+            on_batch_uploaded("B1", 0, 2)
+            task.checkpoints.batch_uploaded.assert_called_once_with(
+                "Accounts", "JOB", "B1", ["1", "2"]
+            )
+            task.session.commit.assert_called()
+            on_batch_uploaded("B2", 2, 1)
+
+        task._stream_queried_data.side_effect = stream
+        task._process_job_results = mock.Mock(side_effect=process_job_results)
+        step = mock.Mock(spec=BulkApiDmlOperation)
+        step.job_id = "JOB"
+        step.job_result = DataOperationJobResult(DataOperationStatus.SUCCESS, [], 3, 0)
+        step.load_records.side_effect = load_records
+        dml_mock.return_value = step
+
+        task._execute_step(
+            MappingStep(sf_object="Account", action="insert"), step_name="Accounts"
+        )
+
+        task.checkpoints.start.assert_called_once_with("Accounts", "JOB")
+        task.checkpoints.batch_uploaded.assert_has_calls(
+            [
+                mock.call("Accounts", "JOB", "B1", ["1", "2"]),
+                mock.call("Accounts", "JOB", "B2", ["3"]),
+            ]
+        )
+        task.checkpoints.batch_persisted.assert_called_once_with("Accounts", "B2")
+
     def test_query_db__record_type_mapping(self):
         task = _make_task(
             LoadData, {"options": {"database_url": "sqlite://", "mapping": "test.yml"}}
@@ -2143,43 +3131,34 @@ class TestLoadData(unittest.TestCase):
             assert 200 == batch_size
 
             # _generate_contact_id_map_for_person_accounts should break if fetchmany returns falsy.
-            return (
-                [(record["id"], record["AccountId"]) for record in chunks[chunks_index]]
-                if chunks_index < len(chunks)
-                else None
-            )
-
-        def query_all(query):
-            nonlocal chunks_index
-            chunk = chunks[chunks_index]
-
-            contact_ids_by_account_sf_id = {
-                record["AccountId"]: record["id"] for record in chunk
-            }
-
-            # query_all is called last; increment to next chunk
+            if chunks_index >= len(chunks):
+                return None
             chunks_index += 1
+            return [
+                (record["id"], record["AccountId"])
+                for record in chunks[chunks_index - 1]
+            ]
 
-            assert (
-                query
-                == "SELECT Id, AccountId FROM Contact WHERE IsPersonAccount = true AND AccountId IN ('{}')".format(
-                    "','".join(contact_ids_by_account_sf_id.keys())
-                )
-            )
-
-            return {
+        # Chunks are queried concurrently, so match each query to its chunk.
+        responses_by_query = {
+            expected_call[1][0]: {
                 "records": [
                     {"Id": record["sf_id"], "AccountId": record["AccountId"]}
                     for record in chunk
                 ]
             }
+            for expected_call, chunk in zip(task.sf.query_all.expected_calls, chunks)
+        }
+
+        def query_all(query):
+            return responses_by_query[query]
 
         conn.execute.return_value.fetchmany.side_effect = fetchmany
         task.sf.query_all.side_effect = query_all
 
         # Execute the test.
         generator = task._generate_contact_id_map_for_person_accounts(
-            contact_mapping, account_id_lookup, conn
+            contact_mapping, account_id_lookup, conn, 204
         )
 
         actual = [value for value in generator]
@@ -2202,4 +3181,126 @@ class TestLoadData(unittest.TestCase):
         assert len(chunks) == chunks_index
 
         query_result.fetchmany.assert_has_calls(query_result.fetchmany.expected_calls)
-        task.sf.query_all.assert_has_calls(task.sf.query_all.expected_calls)
+        task.sf.query_all.assert_has_calls(
+            task.sf.query_all.expected_calls, any_order=True
+        )
+
+    def test_generate_contact_id_map_for_person_accounts__created_since(self):
+        task = _make_task(
+            LoadData,
+            {"options": {"database_url": "sqlite://", "mapping": "mapping.yml"}},
+        )
+        contact_model = mock.Mock()
+        contact_model.__table__ = mock.MagicMock()
+        contact_model.__table__.primary_key.columns.keys.return_value = ["id"]
+        task.models = {"contacts": contact_model}
+        task.session = mock.MagicMock()
+        task._generate_sibling_id_map = mock.Mock(return_value=iter([]))
+        task.load_started = datetime(2020, 1, 1, 12, 30, tzinfo=timezone.utc)
+        account_id_lookup = MappingLookup(
+            table="accounts", key_field="account_id", name="AccountId"
+        )
+        account_id_lookup.aliased_table = mock.MagicMock()
+        conn = mock.Mock()
+
+        list(
+            task._generate_contact_id_map_for_person_accounts(
+                MappingStep(sf_object="Contact", table="contacts"),
+                account_id_lookup,
+                conn,
+                20000,
+            )
+        )
+
+        # Only Contacts created since the load started are queried.
+        task._generate_sibling_id_map.assert_called_once_with(
+            conn,
+            mock.ANY,
+            "Contact",
+            "AccountId",
+            "IsPersonAccount = true AND CreatedDate >= 2020-01-01T12:15:00Z",
+            20000,
+        )
+
+    def test_init_db__load_started(self):
+        with temporary_dir() as d:
+            database_url = f"sqlite:///{os.path.join(d, 'test.db')}"
+
+            def init_db(options):
+                task = _make_task(
+                    LoadData,
+                    {
+                        "options": {
+                            "database_url": database_url,
+                            "mapping": "mapping.yml",
+                            **options,
+                        }
+                    },
+                )
+                task.mapping = {}
+                task._init_db()
+                task.session.close()
+                task.engine.dispose()
+                return task.load_started
+
+            started = init_db({"checkpoint": True})
+            assert started is not None
+            # A resumed load keeps the interrupted load's start time.
+            assert init_db({"resume": True}) == started
+
+    @mock.patch("cumulusci.tasks.bulkdata.load.get_query_operation")
+    def test_generate_sibling_id_map__bulk(self, query_op_mock):
+        task = _make_task(
+            LoadData,
+            {"options": {"database_url": "sqlite://", "mapping": "mapping.yml"}},
+        )
+        task.sf = mock.Mock()
+        local_query = mock.Mock()
+        conn = mock.Mock()
+        conn.execute.return_value = [("1", "001A"), ("2", "001B"), ("3", None)]
+        qs = query_op_mock.return_value
+        qs.job_result = DataOperationJobResult(DataOperationStatus.SUCCESS, [], 3, 0)
+        qs.get_results.return_value = iter(
+            [["003A", "001A"], ["003X", "001X"], ["003B", "001B"]]
+        )
+
+        # Large sets are matched against a single query's results.
+        assert (
+            list(
+                task._generate_sibling_id_map(
+                    conn,
+                    local_query,
+                    "Contact",
+                    "AccountId",
+                    "IsPersonAccount = true",
+                    2500,
+                )
+            )
+            == [("1", "003A"), ("2", "003B")]
+        )
+        local_query.count.assert_not_called()
+        query_op_mock.assert_called_once_with(
+            sobject="Contact",
+            fields=["Id", "AccountId"],
+            api_options={},
+            context=task,
+            query="SELECT Id, AccountId FROM Contact WHERE IsPersonAccount = true",
+            api=DataApi.SMART,
+            volume=2500,
+        )
+        task.sf.query_all.assert_not_called()
+
+        qs.job_result = DataOperationJobResult(
+            DataOperationStatus.JOB_FAILURE, ["Bad"], 0, 0
+        )
+        with pytest.raises(BulkDataException, match="Bad"):
+            list(
+                task._generate_sibling_id_map(
+                    conn,
+                    local_query,
+                    "Contact",
+                    "AccountId",
+                    "IsPersonAccount = true",
+                    2500,
+                )
+            )
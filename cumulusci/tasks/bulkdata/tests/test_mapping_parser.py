@@ -82,6 +82,66 @@ class TestMappingParser:
             with pytest.raises(ValidationError):
                 parse_from_yaml(StringIO(data))
 
+    def test_bad_mapping_concurrency(self):
+        base_path = Path(__file__).parent / "mapping_v2.yml"
+        with open(base_path, "r") as f:
+            data = f.read().replace("record_type: HH_Account", "concurrency: 0")
+            with pytest.raises(ValidationError):
+                parse_from_yaml(StringIO(data))
+
+    def test_upsert(self):
+        ms = MappingStep(
+            sf_object="Account",
+            fields=["Id", "Name", "External_Id__c"],
+            action="upsert",
+            update_key="External_Id__c",
+            lookups={
+                "ParentId": MappingLookup(
+                    table="Account", external_id_field="External_Id__c"
+                ),
+                "Partner__c": MappingLookup(
+                    table="Account", external_id_field="External_Id__c"
+                ),
+            },
+        )
+        assert ms.action is DataOperationType.UPSERT
+        assert ms.get_field_list() == [
+            "Name",
+            "External_Id__c",
+            "Parent.External_Id__c",
+            "Partner__r.External_Id__c",
+        ]
+
+    def test_upsert__requires_update_key(self):
+        with pytest.raises(ValidationError):
+            MappingStep(sf_object="Account", fields=["Name"], action="upsert")
+        with pytest.raises(ValidationError):
+            MappingStep(
+                sf_object="Account",
+                fields=["Name"],
+                action="upsert",
+                update_key="External_Id__c",
+            )
+
+    def test_external_id_lookup__no_after(self):
+        with pytest.raises(ValidationError):
+            MappingStep(
+                sf_object="Account",
+                fields=["Name"],
+                lookups={
+                    "ParentId": MappingLookup(
+                        table="Account",
+                        external_id_field="External_Id__c",
+                        after="Insert Accounts",
+                    )
+                },
+            )
+
+    def test_pk_chunk_size__not_bulk2(self):
+        assert MappingStep(sf_object="Account", api="bulk", pk_chunk_size=100000)
+        with pytest.raises(ValidationError):
+            MappingStep(sf_object="Account", api="bulk2", pk_chunk_size=100000)
+
     def test_default_table_to_sobject_name(self):
         base_path = Path(__file__).parent / "mapping_v3.yml"
         with open(base_path, "r") as f:
@@ -480,6 +540,106 @@ class TestMappingParser:
             ]
         )
 
+    def _make_external_id_org_config(self):
+        org_config = mock.Mock()
+        org_config.salesforce_client.describe.return_value = {
+            "sobjects": [
+                {"name": "Account", "createable": True},
+                {"name": "Contact", "createable": True},
+            ]
+        }
+        org_config.salesforce_client.Account.describe.return_value = {
+            "fields": [
+                {"name": "Name", "createable": True},
+                {"name": "ns__External_Id__c", "createable": True, "externalId": True},
+                {"name": "Description", "createable": True, "externalId": False},
+            ]
+        }
+        org_config.salesforce_client.Contact.describe.return_value = {
+            "fields": [
+                {"name": "LastName", "createable": True},
+                {
+                    "name": "ns__Household__c",
+                    "createable": True,
+                    "referenceTo": ["Account"],
+                },
+            ]
+        }
+        return org_config
+
+    def test_validate_and_inject_namespace__external_id_lookup(self):
+        ms = MappingStep(
+            sf_object="Contact",
+            fields=["LastName"],
+            lookups={
+                "Household__c": MappingLookup(
+                    table="Account", external_id_field="external_id__c"
+                )
+            },
+        )
+        org_config = self._make_external_id_org_config()
+
+        assert ms.validate_and_inject_namespace(
+            org_config, "ns", DataOperationType.INSERT, inject_namespaces=True
+        )
+
+        assert ms.lookups["ns__Household__c"].external_id_field == "ns__External_Id__c"
+        assert ms.get_field_list() == [
+            "LastName",
+            "ns__Household__r.ns__External_Id__c",
+        ]
+
+    def test_validate_and_inject_namespace__update_key(self):
+        org_config = self._make_external_id_org_config()
+
+        ms = MappingStep(
+            sf_object="Account",
+            fields=["Name", "External_Id__c"],
+            action="upsert",
+            update_key="External_Id__c",
+        )
+        assert ms.validate_and_inject_namespace(
+            org_config, "ns", DataOperationType.INSERT, inject_namespaces=True
+        )
+        assert ms.update_key == "ns__External_Id__c"
+
+        # Records can't be matched on a field that isn't an external id.
+        ms = MappingStep(
+            sf_object="Account",
+            fields=["Name", "Description"],
+            action="upsert",
+            update_key="Description",
+        )
+        assert not ms.validate_and_inject_namespace(
+            org_config, "ns", DataOperationType.INSERT, inject_namespaces=True
+        )
+
+    def test_validate_and_inject_namespace__external_id_lookup_invalid(self):
+        org_config = self._make_external_id_org_config()
+
+        for external_id_field in ("Description", "Missing__c"):
+            ms = MappingStep(
+                sf_object="Contact",
+                fields=["LastName"],
+                lookups={
+                    "Household__c": MappingLookup(
+                        table="Account", external_id_field=external_id_field
+                    )
+                },
+            )
+            assert not ms.validate_and_inject_namespace(
+                org_config, "ns", DataOperationType.INSERT, inject_namespaces=True
+            )
+
+            assert ms.validate_and_inject_namespace(
+                org_config,
+                "ns",
+                DataOperationType.INSERT,
+                inject_namespaces=True,
+                drop_missing=True,
+            )
+            assert ms.lookups == {}
+
     @mock.patch(
         "cumulusci.tasks.bulkdata.mapping_parser.MappingStep._validate_sobject",
         return_value=True,
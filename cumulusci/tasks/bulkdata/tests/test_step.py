@@ -1,25 +1,41 @@
+import functools
 import io
 import json
+import os
+import tempfile
+import threading
+import time
 import unittest
 from unittest import mock
 
+import pytest
+import requests
 import responses
 
 from cumulusci.core.exceptions import BulkDataException
 from cumulusci.tasks.bulkdata.step import (
     download_file,
+    download_files,
+    org_request_slots,
+    CsvBatchWriter,
     DataOperationType,
+    JobPoller,
     DataOperationStatus,
     DataOperationResult,
     DataOperationJobResult,
     BulkJobMixin,
     BulkApiQueryOperation,
+    BaseDmlOperation,
     BulkApiDmlOperation,
+    Bulk2ApiQueryOperation,
+    Bulk2ApiDmlOperation,
     RestApiQueryOperation,
     RestApiDmlOperation,
     DataApi,
     get_query_operation,
+    get_record_counts,
     get_dml_operation,
+    get_poll_options,
 )
 from cumulusci.tasks.bulkdata.load import LoadData
 from cumulusci.tasks.bulkdata.tests.test_utils import mock_describe_calls
@@ -51,6 +67,68 @@ class TestDownloadFile(unittest.TestCase):
             assert f.read() == "TEST\u2014"
 
 
+class TestDownloadFiles(unittest.TestCase):
+    @responses.activate
+    def test_download_files(self):
+        bulk_mock = mock.Mock()
+        bulk_mock.headers.return_value = {}
+        urls = [f"https://example.com/{i}" for i in range(5)]
+        for i, url in enumerate(urls):
+            responses.add(method="GET", url=url, body=f"TEST{i}")
+
+        contents = []
+        paths = []
+        for download in download_files(urls, bulk_mock, prefetch=2):
+            with download as f:
+                contents.append(f.read())
+                paths.append(f.name)
+
+        assert contents == [f"TEST{i}" for i in range(5)]
+        assert not any(os.path.exists(path) for path in paths)
+
+    @responses.activate
+    def test_download_files__early_exit(self):
+        bulk_mock = mock.Mock()
+        bulk_mock.headers.return_value = {}
+        urls = [f"https://example.com/{i}" for i in range(5)]
+        for i, url in enumerate(urls):
+            responses.add(method="GET", url=url, body=f"TEST{i}")
+
+        paths = []
+        mkstemp = tempfile.mkstemp
+
+        def record_mkstemp(*args, **kwargs):
+            handle, path = mkstemp(*args, **kwargs)
+            paths.append(path)
+            return handle, path
+
+        with mock.patch("tempfile.mkstemp", record_mkstemp):
+            downloads = download_files(urls, bulk_mock, prefetch=3)
+            with next(downloads) as f:
+                assert f.read() == "TEST0"
+            downloads.close()
+
+        assert paths
+        assert not any(os.path.exists(path) for path in paths)
+
+    def test_download_files__failure(self):
+        bulk_mock = mock.Mock()
+        with mock.patch("cumulusci.tasks.bulkdata.step.download_file") as download:
+            download.return_value.__enter__.side_effect = [
+                io.StringIO("TEST0"),
+                Exception("Failed"),
+            ]
+            downloads = download_files(["https://a", "https://b"], bulk_mock)
+
+            with next(downloads) as f:
+                assert f.read() == "TEST0"
+            with self.assertRaises(Exception):
+                with next(downloads):
+                    pass
+
+            assert download.return_value.__exit__.call_count == 2
+
+
 class TestBulkDataJobTaskMixin(unittest.TestCase):
     @responses.activate
     def test_job_state_from_batches(self):
@@ -146,6 +224,17 @@ class TestBulkDataJobTaskMixin(unittest.TestCase):
             "</root>"
         ) == DataOperationJobResult(DataOperationStatus.ROW_FAILURE, [], 10, 200)
 
+        assert mixin._parse_job_state(
+            '<root xmlns="http://ns">'
+            "  <batch><state>Completed</state>"
+            "    <numberRecordsFailed>1</numberRecordsFailed>"
+            "    <numberRecordsProcessed>10</numberRecordsProcessed></batch>"
+            "  <batch><state>Completed</state>"
+            "    <numberRecordsFailed>2</numberRecordsFailed>"
+            "    <numberRecordsProcessed>20</numberRecordsProcessed></batch>"
+            "</root>"
+        ) == DataOperationJobResult(DataOperationStatus.ROW_FAILURE, [], 30, 3)
+
     @mock.patch("time.sleep")
     def test_wait_for_job(self, sleep_patch):
         mixin = BulkJobMixin()
@@ -207,6 +296,121 @@ class TestBulkDataJobTaskMixin(unittest.TestCase):
         mixin.logger.error.assert_any_call("Batch failure message: Test1")
         mixin.logger.error.assert_any_call("Batch failure message: Test2")
 
+    def _job_status(self, queued, in_progress, completed, total):
+        return {
+            "numberBatchesQueued": str(queued),
+            "numberBatchesInProgress": str(in_progress),
+            "numberBatchesCompleted": str(completed),
+            "numberBatchesFailed": str(total - queued - in_progress - completed),
+            "numberBatchesTotal": str(total),
+            "numberRecordsProcessed": "20",
+            "numberRecordsFailed": "0",
+        }
+
+    def test_job_may_be_done(self):
+        mixin = BulkJobMixin()
+
+        assert not mixin._job_may_be_done(self._job_status(1, 1, 0, 2))
+        assert not mixin._job_may_be_done(self._job_status(0, 1, 1, 2))
+        assert mixin._job_may_be_done(self._job_status(0, 0, 2, 2))
+        assert mixin._job_may_be_done(self._job_status(0, 0, 1, 2))
+        # Without the counters, the batch list is needed.
+        assert mixin._job_may_be_done(
+            {"numberBatchesCompleted": 1, "numberBatchesTotal": 1}
+        )
+
+    @mock.patch("time.sleep")
+    def test_wait_for_job__counters(self, sleep_patch):
+        mixin = BulkJobMixin()
+        mixin.api_options = {"poll_interval": 2, "max_poll_interval": 5}
+
+        mixin.bulk = mock.Mock()
+        mixin.bulk.job_status.side_effect = [
+            self._job_status(2, 0, 0, 2),
+            self._job_status(1, 1, 0, 2),
+            self._job_status(0, 1, 1, 2),
+            self._job_status(0, 0, 2, 2),
+        ]
+        mixin._job_state_from_batches = mock.Mock(
+            return_value=DataOperationJobResult(DataOperationStatus.SUCCESS, [], 20, 0)
+        )
+        mixin.logger = mock.Mock()
+
+        result = mixin._wait_for_job("750000000000000")
+
+        # The batch list is only fetched once the job is done.
+        mixin._job_state_from_batches.assert_called_once_with("750000000000000")
+        sleep_patch.assert_has_calls([mock.call(2), mock.call(4), mock.call(5)])
+        assert mixin.poll_count == 4
+        assert result.status is DataOperationStatus.SUCCESS
+
+
+class TestCsvBatchWriter:
+    def test_write(self):
+        batch = CsvBatchWriter(["Id", "FirstName", "LastName"])
+        assert batch.getvalue() == b"Id,FirstName,LastName\r\n"
+
+        batch.write(["1", "Bob", "Ross"])
+        batch.write(["2", "multiline\ncol2", "Ünïcode"])
+
+        assert batch.getvalue() == (
+            'Id,FirstName,LastName\r\n1,Bob,Ross\r\n2,"multiline\ncol2",Ünïcode\r\n'
+        ).encode("utf-8")
+        assert batch.row_count == 2
+        assert batch.char_count == len(batch.getvalue().decode("utf-8"))
+        assert batch.byte_count == len(batch.getvalue())
+
+    def test_pop_and_reset(self):
+        batch = CsvBatchWriter(["LastName"])
+        batch.write(["Test"])
+        batch.write(["Tést2"])
+
+        row = batch.pop()
+        assert row == "Tést2\r\n"
+        assert batch.getvalue() == b"LastName\r\nTest\r\n"
+        assert (batch.row_count, batch.char_count, batch.byte_count) == (1, 16, 16)
+
+        batch.reset(row)
+        batch.write(["Test3"])
+        assert batch.getvalue() == "LastName\r\nTést2\r\nTest3\r\n".encode("utf-8")
+        assert (batch.row_count, batch.char_count, batch.byte_count) == (2, 24, 25)
+
+        batch.reset()
+        assert batch.getvalue() == b"LastName\r\n"
+        assert (batch.row_count, batch.char_count, batch.byte_count) == (0, 10, 10)
+
+
+class TestJobPoller:
+    @mock.patch("time.sleep")
+    def test_backoff(self, sleep_patch):
+        poller = JobPoller(initial_interval=1, max_interval=10, backoff=3)
+
+        for count in poller:
+            if count == 5:
+                break
+
+        sleep_patch.assert_has_calls(
+            [mock.call(1), mock.call(3), mock.call(9), mock.call(10)]
+        )
+        assert poller.poll_count == 5
+
+        poller.reset()
+        assert poller.interval == 1
+
+    def test_from_api_options(self):
+        poller = JobPoller.from_api_options(
+            {"poll_interval": 5, "max_poll_interval": 60, "concurrency": None}
+        )
+
+        assert poller.interval == 5
+        assert poller.max_interval == 60
+        assert poller.backoff == 2
+
+    def test_get_poll_options(self):
+        assert get_poll_options(
+            {"poll_interval": "0.5", "max_poll_interval": None}
+        ) == {"poll_interval": 0.5}
+
 
 class TestBulkApiQueryOperation(unittest.TestCase):
     def test_query(self):
@@ -346,6 +550,137 @@ class TestBulkApiQueryOperation(unittest.TestCase):
         assert list(results) == []
 
 
+class TestBulkApiQueryOperationPKChunking(unittest.TestCase):
+    def _make_query(self, context):
+        return BulkApiQueryOperation(
+            sobject="Contact",
+            api_options={"pk_chunk_size": 1000},
+            context=context,
+            query="SELECT Id FROM Contact",
+        )
+
+    @mock.patch("time.sleep")
+    def test_query(self, sleep_patch):
+        context = mock.Mock()
+        context.bulk.create_query_job.return_value = "JOB"
+        context.bulk.query.return_value = "BATCH"
+        context.bulk.batch_status.side_effect = [
+            {"state": "Queued"},
+            {"state": "Not Processed"},
+        ]
+        query = self._make_query(context)
+
+        query.query()
+
+        context.bulk.create_query_job.assert_called_once_with(
+            "Contact", contentType="CSV", pk_chunking=1000
+        )
+        context.bulk.batch_status.assert_called_with("BATCH", "JOB", reload=True)
+        context.bulk.close_job.assert_called_once_with("JOB")
+        assert query.job_result.status is DataOperationStatus.IN_PROGRESS
+
+    def test_query__failure(self):
+        context = mock.Mock()
+        context.bulk.batch_status.return_value = {
+            "state": "Failed",
+            "stateMessage": "PK Chunking not supported",
+        }
+        query = self._make_query(context)
+
+        query.query()
+
+        assert query.job_result == DataOperationJobResult(
+            DataOperationStatus.JOB_FAILURE, ["PK Chunking not supported"], 0, 0
+        )
+
+    def test_query__not_chunked(self):
+        context = mock.Mock()
+        context.bulk.batch_status.return_value = {
+            "state": "Completed",
+            "numberRecordsProcessed": "10",
+        }
+        query = self._make_query(context)
+
+        query.query()
+
+        assert query.job_result == DataOperationJobResult(
+            DataOperationStatus.SUCCESS, [], 10, 0
+        )
+
+    @mock.patch("time.sleep")
+    @mock.patch("cumulusci.tasks.bulkdata.step.download_file")
+    def test_get_results(self, download_mock, sleep_patch):
+        context = mock.Mock()
+        context.bulk.endpoint = "https://test"
+        context.bulk.create_query_job.return_value = "JOB"
+        context.bulk.query.return_value = "BATCH"
+        context.bulk.batch_status.return_value = {"state": "Not Processed"}
+        context.bulk.get_batch_list.side_effect = [
+            [
+                {"id": "BATCH", "state": "Not Processed"},
+                {"id": "CHUNK1", "state": "Queued"},
+                {"id": "CHUNK2", "state": "InProgress"},
+            ],
+            [
+                {"id": "BATCH", "state": "Not Processed"},
+                {"id": "CHUNK1", "state": "Completed"},
+                {"id": "CHUNK2", "state": "InProgress"},
+            ],
+            [
+                {
+                    "id": "BATCH",
+                    "state": "Not Processed",
+                    "numberRecordsProcessed": "0",
+                },
+                {"id": "CHUNK1", "state": "Completed", "numberRecordsProcessed": "2"},
+                {"id": "CHUNK2", "state": "Completed", "numberRecordsProcessed": "0"},
+            ],
+        ]
+        context.bulk.get_query_batch_result_ids.return_value = ["RESULT"]
+        download_mock.side_effect = [
+            io.StringIO("Id\n003000000000001\n003000000000002"),
+            io.StringIO("Records not found for this query"),
+        ]
+        query = self._make_query(context)
+        query.query()
+
+        results = list(query.get_results())
+
+        assert results == [["003000000000001"], ["003000000000002"]]
+        context.bulk.get_query_batch_result_ids.assert_has_calls(
+            [mock.call("CHUNK1", job_id="JOB"), mock.call("CHUNK2", job_id="JOB")]
+        )
+        download_mock.assert_has_calls(
+            [
+                mock.call(
+                    "https://test/job/JOB/batch/CHUNK1/result/RESULT", context.bulk
+                ),
+                mock.call(
+                    "https://test/job/JOB/batch/CHUNK2/result/RESULT", context.bulk
+                ),
+            ]
+        )
+        # Polling backs off while nothing completes and resets on progress.
+        sleep_patch.assert_has_calls([mock.call(1), mock.call(1)])
+        assert query.job_result == DataOperationJobResult(
+            DataOperationStatus.SUCCESS, [], 2, 0
+        )
+
+    def test_get_results__chunk_failure(self):
+        context = mock.Mock()
+        context.bulk.batch_status.return_value = {"state": "Not Processed"}
+        context.bulk.get_batch_list.return_value = [
+            {"id": "BATCH", "state": "Not Processed", "stateMessage": None},
+            {"id": "CHUNK1", "state": "Failed", "stateMessage": "Timeout"},
+        ]
+        query = self._make_query(context)
+        query.query()
+
+        with self.assertRaises(BulkDataException):
+            list(query.get_results())
+        assert query.job_result.status is DataOperationStatus.JOB_FAILURE
+
+
 class TestBulkApiDmlOperation(unittest.TestCase):
     def test_start(self):
         context = mock.Mock()
@@ -366,6 +701,28 @@ class TestBulkApiDmlOperation(unittest.TestCase):
         )
         assert step.job_id == "JOB"
 
+    def test_start__upsert(self):
+        context = mock.Mock()
+        context.bulk.create_job.return_value = "JOB"
+
+        step = BulkApiDmlOperation(
+            sobject="Account",
+            operation=DataOperationType.UPSERT,
+            api_options={"update_key": "External_Id__c"},
+            context=context,
+            fields=["Name", "External_Id__c"],
+        )
+
+        step.start()
+
+        context.bulk.create_job.assert_called_once_with(
+            "Account",
+            "upsert",
+            contentType="CSV",
+            concurrency="Parallel",
+            external_id_name="External_Id__c",
+        )
+
     def test_end(self):
         context = mock.Mock()
         context.bulk.create_job.return_value = "JOB"
@@ -441,28 +798,27 @@ class TestBulkApiDmlOperation(unittest.TestCase):
         step._wait_for_job.assert_called_once_with("JOB")
         assert step.job_result.status is DataOperationStatus.SUCCESS
 
-    def test_serialize_csv_record(self):
+    def test_batch(self):
         context = mock.Mock()
+
         step = BulkApiDmlOperation(
             sobject="Contact",
             operation=DataOperationType.INSERT,
             api_options={"batch_size": 2},
             context=context,
-            fields=["Id", "FirstName", "LastName"],
+            fields=["LastName"],
         )
 
-        serialized = step._serialize_csv_record(step.fields)
-        assert serialized == b"Id,FirstName,LastName\r\n"
-
-        record = ["1", "Bob", "Ross"]
-        serialized = step._serialize_csv_record(record)
-        assert serialized == b"1,Bob,Ross\r\n"
+        records = iter([["Test"], ["Test2"], ["Test3"]])
+        results = list(step._batch(records, n=2))
 
-        record = ["col1", "multiline\ncol2"]
-        serialized = step._serialize_csv_record(record)
-        assert serialized == b'col1,"multiline\ncol2"\r\n'
+        assert results == [
+            b"LastName\r\nTest\r\nTest2\r\n",
+            b"LastName\r\nTest3\r\n",
+        ]
+        assert step.batch_sizes == [2, 1]
 
-    def test_batch(self):
+    def test_batch__character_limit(self):
         context = mock.Mock()
 
         step = BulkApiDmlOperation(
@@ -473,54 +829,141 @@ class TestBulkApiDmlOperation(unittest.TestCase):
             fields=["LastName"],
         )
 
-        records = iter([["Test"], ["Test2"], ["Test3"]])
-        results = list(step._batch(records, n=2))
+        records = [["Test"], ["Test2"], ["Test3"]]
+
+        char_limit = len("LastName\r\nTest\r\nTest2\r\nTest3\r\n") - 1
+
+        # Ask for batches of three, but we
+        # should get batches of 2 back
+        results = list(step._batch(iter(records), n=3, char_limit=char_limit))
 
-        assert len(results) == 2
-        assert list(results[0]) == [
-            "LastName\r\n".encode("utf-8"),
-            "Test\r\n".encode("utf-8"),
-            "Test2\r\n".encode("utf-8"),
+        assert results == [
+            b"LastName\r\nTest\r\nTest2\r\n",
+            b"LastName\r\nTest3\r\n",
         ]
-        assert list(results[1]) == [
-            "LastName\r\n".encode("utf-8"),
-            "Test3\r\n".encode("utf-8"),
+        assert step.batch_sizes == [2, 1]
+
+    def test_batch__byte_limit(self):
+        context = mock.Mock()
+
+        step = BulkApiDmlOperation(
+            sobject="Contact",
+            operation=DataOperationType.INSERT,
+            api_options={},
+            context=context,
+            fields=["LastName"],
+        )
+
+        # Each of these characters takes three bytes in UTF-8, so the
+        # rows fit the character limit but not the byte limit together.
+        records = [["☃☃"], ["☃☃"], ["☃☃"]]
+        limit = len("LastName\r\n☃☃\r\n☃☃\r\n")
+
+        results = list(
+            step._batch(iter(records), n=3, char_limit=limit, byte_limit=limit)
+        )
+
+        assert results == [
+            "LastName\r\n☃☃\r\n".encode("utf-8"),
+            "LastName\r\n☃☃\r\n".encode("utf-8"),
+            "LastName\r\n☃☃\r\n".encode("utf-8"),
         ]
+        assert all(len(result) <= limit for result in results)
+        assert step.batch_sizes == [1, 1, 1]
 
-    def test_batch__character_limit(self):
+    def test_load_records__concurrent(self):
         context = mock.Mock()
+        in_flight = []
+        max_in_flight = []
+        lock = threading.Lock()
+
+        def post_batch(job_id, data):
+            rows = data.splitlines(keepends=True)
+            with lock:
+                in_flight.append(rows)
+                max_in_flight.append(len(in_flight))
+            # Make earlier batches finish last.
+            time.sleep(0.05 if rows[1] == b"Test0\r\n" else 0.01)
+            with lock:
+                in_flight.remove(rows)
+            return rows[1].decode("utf-8").strip()
+
+        context.bulk.post_batch.side_effect = post_batch
 
         step = BulkApiDmlOperation(
             sobject="Contact",
             operation=DataOperationType.INSERT,
-            api_options={"batch_size": 2},
+            api_options={"concurrency": 2},
             context=context,
             fields=["LastName"],
         )
+        step.job_id = "JOB"
 
-        records = [["Test"], ["Test2"], ["Test3"]]
+        def _batch(records):
+            for i in range(5):
+                step.batch_sizes.append(1)
+                yield f"LastName\r\nTest{i}\r\n".encode("utf-8")
 
-        csv_rows = [step._serialize_csv_record(step.fields)]
-        for r in records:
-            csv_rows.append(step._serialize_csv_record(r))
+        step._batch = _batch
 
-        char_limit = sum([len(r) for r in csv_rows]) - 1
+        step.load_records(iter([]))
 
-        # Ask for batches of three, but we
-        # should get batches of 2 back
-        results = list(step._batch(iter(records), n=3, char_limit=char_limit))
+        assert step.batch_ids == ["Test0", "Test1", "Test2", "Test3", "Test4"]
+        assert max(max_in_flight) <= 2
 
-        assert len(results) == 2
-        assert list(results[0]) == [
-            "LastName\r\n".encode("utf-8"),
-            "Test\r\n".encode("utf-8"),
-            "Test2\r\n".encode("utf-8"),
-        ]
-        assert list(results[1]) == [
-            "LastName\r\n".encode("utf-8"),
-            "Test3\r\n".encode("utf-8"),
+    def test_load_records__upload_failure(self):
+        context = mock.Mock()
+        context.bulk.post_batch.side_effect = [
+            "BATCH1",
+            BulkDataException("Upload failed"),
         ]
 
+        step = BulkApiDmlOperation(
+            sobject="Contact",
+            operation=DataOperationType.INSERT,
+            api_options={"concurrency": 1},
+            context=context,
+            fields=["LastName"],
+        )
+        step.job_id = "JOB"
+
+        with self.assertRaises(BulkDataException):
+            step.load_records(iter([["Test"], ["Test2"]] * 10000))
+
+    def test_load_records__upload_failure_reports_uploaded_batches(self):
+        context = mock.Mock()
+
+        def post_batch(job_id, data):
+            name = data.splitlines()[1].decode("utf-8")
+            if name == "Test2":
+                raise BulkDataException("Upload failed")
+            return name
+
+        context.bulk.post_batch.side_effect = post_batch
+
+        step = BulkApiDmlOperation(
+            sobject="Contact",
+            operation=DataOperationType.INSERT,
+            api_options={"concurrency": 3},
+            context=context,
+            fields=["LastName"],
+        )
+        step.job_id = "JOB"
+        step._batch = functools.partial(step._batch, n=2)
+        on_batch_uploaded = mock.Mock()
+
+        with self.assertRaises(BulkDataException):
+            step.load_records(
+                iter([[f"Test{i}"] for i in range(5)]),
+                on_batch_uploaded=on_batch_uploaded,
+            )
+
+        assert step.batch_ids == ["Test0", "Test4"]
+        on_batch_uploaded.assert_has_calls(
+            [mock.call("Test0", 0, 2), mock.call("Test4", 4, 1)]
+        )
+        assert on_batch_uploaded.call_count == 2
+
     @mock.patch("cumulusci.tasks.bulkdata.step.download_file")
     def test_get_results(self, download_mock):
         context = mock.Mock()
@@ -581,17 +1024,34 @@ class TestBulkApiDmlOperation(unittest.TestCase):
             list(step.get_results())
 
     @mock.patch("cumulusci.tasks.bulkdata.step.download_file")
-    def test_end_to_end(self, download_mock):
+    def test_iter_batch_results(self, download_mock):
         context = mock.Mock()
         context.bulk.endpoint = "https://test"
-        context.bulk.create_job.return_value = "JOB"
-        context.bulk.post_batch.side_effect = ["BATCH1", "BATCH2"]
-        download_mock.return_value = io.StringIO(
-            """id,success,created,error
-003000000000001,true,true,
-003000000000002,true,true,
+        context.bulk.get_batch_list.side_effect = [
+            [
+                {"id": "BATCH1", "state": "InProgress"},
+                {"id": "BATCH2", "state": "Completed"},
+            ],
+            [
+                {"id": "BATCH1", "state": "InProgress"},
+                {"id": "BATCH2", "state": "Completed"},
+            ],
+            [
+                {"id": "BATCH1", "state": "Completed"},
+                {"id": "BATCH2", "state": "Completed"},
+            ],
+        ]
+        download_mock.side_effect = [
+            io.StringIO(
+                """id,success,created,error
 003000000000003,false,false,error"""
-        )
+            ),
+            io.StringIO(
+                """id,success,created,error
+003000000000001,true,true,
+003000000000002,true,true,"""
+            ),
+        ]
 
         step = BulkApiDmlOperation(
             sobject="Contact",
@@ -600,25 +1060,637 @@ class TestBulkApiDmlOperation(unittest.TestCase):
             context=context,
             fields=["LastName"],
         )
-        step._wait_for_job = mock.Mock()
-        step._wait_for_job.return_value = DataOperationJobResult(
-            DataOperationStatus.SUCCESS, [], 0, 0
+        step.job_id = "JOB"
+        step.batch_ids = ["BATCH1", "BATCH2"]
+        step.batch_sizes = [2, 1]
+        step._job_state_from_batches = mock.Mock(
+            return_value=DataOperationJobResult(
+                DataOperationStatus.ROW_FAILURE, [], 3, 1
+            )
         )
 
-        step.start()
-        step.load_records(iter([["Test"], ["Test2"], ["Test3"]]))
-        step.end()
+        # Batches are returned as they complete, with their input positions.
+        assert list(step.iter_batch_results()) == [
+            (2, [DataOperationResult(None, False, "error")]),
+            (
+                0,
+                [
+                    DataOperationResult("003000000000001", True, None),
+                    DataOperationResult("003000000000002", True, None),
+                ],
+            ),
+        ]
+        context.bulk.close_job.assert_called_once_with("JOB")
+        assert step.job_result.status is DataOperationStatus.ROW_FAILURE
+        assert step.poll_count == 3
 
-        assert step.job_result.status is DataOperationStatus.SUCCESS
-        results = step.get_results()
+    def test_iter_batch_results__failed_batch(self):
+        context = mock.Mock()
+        context.bulk.get_batch_list.return_value = [
+            {"id": "BATCH1", "state": "Failed", "stateMessage": "Bad"}
+        ]
 
-        assert list(results) == [
-            DataOperationResult("003000000000001", True, None),
+        step = BulkApiDmlOperation(
+            sobject="Contact",
+            operation=DataOperationType.INSERT,
+            api_options={},
+            context=context,
+            fields=["LastName"],
+        )
+        step.job_id = "JOB"
+        step.batch_ids = ["BATCH1"]
+        step.batch_sizes = [1]
+        step._job_state_from_batches = mock.Mock(
+            return_value=DataOperationJobResult(
+                DataOperationStatus.JOB_FAILURE, ["Bad"], 0, 0
+            )
+        )
+
+        assert list(step.iter_batch_results()) == []
+        assert step.job_result.status is DataOperationStatus.JOB_FAILURE
+
+    @mock.patch("cumulusci.tasks.bulkdata.step.download_file")
+    def test_iter_batch_results__aborted_job(self, download_mock):
+        context = mock.Mock()
+        context.bulk.endpoint = "https://test"
+        context.bulk.job_status.side_effect = [
+            {"state": "Closed"},
+            {"state": "Aborted"},
+        ]
+        context.bulk.get_batch_list.side_effect = [
+            [
+                {"id": "BATCH1", "state": "InProgress"},
+                {"id": "BATCH2", "state": "Queued"},
+                {"id": "BATCH3", "state": "Queued"},
+            ],
+            [
+                {"id": "BATCH1", "state": "Completed"},
+                {"id": "BATCH2", "state": "Not Processed"},
+                {"id": "BATCH3", "state": "Queued"},
+            ],
+        ]
+        download_mock.return_value = io.StringIO(
+            """id,success,created,error
+003000000000001,true,true,"""
+        )
+
+        step = BulkApiDmlOperation(
+            sobject="Contact",
+            operation=DataOperationType.INSERT,
+            api_options={},
+            context=context,
+            fields=["LastName"],
+        )
+        step.job_id = "JOB"
+        step.batch_ids = ["BATCH1", "BATCH2", "BATCH3"]
+        step.batch_sizes = [1, 1, 1]
+        step._job_state_from_batches = mock.Mock(
+            return_value=DataOperationJobResult(
+                DataOperationStatus.IN_PROGRESS, [], 1, 0
+            )
+        )
+
+        # Polling stops once the job is aborted, with the completed results.
+        assert list(step.iter_batch_results()) == [
+            (0, [DataOperationResult("003000000000001", True, None)])
+        ]
+        assert step.job_result == DataOperationJobResult(
+            DataOperationStatus.ABORTED, [], 1, 0
+        )
+        assert step.poll_count == 2
+
+    def test_iter_batch_results__not_processed(self):
+        context = mock.Mock()
+        context.bulk.job_status.return_value = {"state": "Closed"}
+        context.bulk.get_batch_list.return_value = [
+            {"id": "BATCH1", "state": "Not Processed"}
+        ]
+
+        step = BulkApiDmlOperation(
+            sobject="Contact",
+            operation=DataOperationType.INSERT,
+            api_options={},
+            context=context,
+            fields=["LastName"],
+        )
+        step.job_id = "JOB"
+        step.batch_ids = ["BATCH1"]
+        step.batch_sizes = [1]
+        step._job_state_from_batches = mock.Mock(
+            return_value=DataOperationJobResult(DataOperationStatus.ABORTED, [], 0, 0)
+        )
+
+        assert list(step.iter_batch_results()) == []
+        assert step.job_result.status is DataOperationStatus.ABORTED
+        assert step.poll_count == 1
+
+    @mock.patch("cumulusci.tasks.bulkdata.step.download_file")
+    def test_resume_batch_results(self, download_mock):
+        context = mock.Mock()
+        context.bulk.endpoint = "https://test"
+        context.bulk.get_batch_list.side_effect = [
+            [
+                {"id": "BATCH1", "state": "Completed"},
+                {"id": "BATCH2", "state": "InProgress"},
+                {"id": "BATCH3", "state": "InProgress"},
+            ],
+            [
+                {"id": "BATCH1", "state": "Completed"},
+                {"id": "BATCH2", "state": "Failed"},
+                {"id": "BATCH3", "state": "Completed"},
+            ],
+        ]
+        download_mock.return_value = io.StringIO(
+            """id,success,created,error
+003000000000001,true,true,"""
+        )
+
+        step = BulkApiDmlOperation(
+            sobject="Contact",
+            operation=DataOperationType.INSERT,
+            api_options={},
+            context=context,
+            fields=[],
+        )
+
+        # Only the given batches are waited for, and failed ones are skipped.
+        assert list(step.resume_batch_results("JOB", ["BATCH2", "BATCH3"])) == [
+            ("BATCH3", [DataOperationResult("003000000000001", True, None)])
+        ]
+        context.bulk.close_job.assert_not_called()
+        context.bulk.get_batch_list.assert_called_with("JOB")
+        download_mock.assert_called_once_with(
+            "https://test/job/JOB/batch/BATCH3/result", context.bulk
+        )
+        assert step.poll_count == 2
+
+    def test_resume_batch_results__aborted_job(self):
+        context = mock.Mock()
+        context.bulk.job_status.return_value = {"state": "Aborted"}
+        context.bulk.get_batch_list.return_value = [{"id": "BATCH2", "state": "Queued"}]
+
+        step = BulkApiDmlOperation(
+            sobject="Contact",
+            operation=DataOperationType.INSERT,
+            api_options={},
+            context=context,
+            fields=[],
+        )
+
+        # BATCH1 was deleted and BATCH2 will never be processed.
+        assert list(step.resume_batch_results("JOB", ["BATCH1", "BATCH2"])) == []
+        assert step.job_state == "Aborted"
+        assert step.poll_count == 1
+
+    @mock.patch("cumulusci.tasks.bulkdata.step.download_file")
+    def test_end_to_end(self, download_mock):
+        context = mock.Mock()
+        context.bulk.endpoint = "https://test"
+        context.bulk.create_job.return_value = "JOB"
+        context.bulk.post_batch.side_effect = ["BATCH1", "BATCH2"]
+        download_mock.return_value = io.StringIO(
+            """id,success,created,error
+003000000000001,true,true,
+003000000000002,true,true,
+003000000000003,false,false,error"""
+        )
+
+        step = BulkApiDmlOperation(
+            sobject="Contact",
+            operation=DataOperationType.INSERT,
+            api_options={},
+            context=context,
+            fields=["LastName"],
+        )
+        step._wait_for_job = mock.Mock()
+        step._wait_for_job.return_value = DataOperationJobResult(
+            DataOperationStatus.SUCCESS, [], 0, 0
+        )
+
+        step.start()
+        step.load_records(iter([["Test"], ["Test2"], ["Test3"]]))
+        step.end()
+
+        assert step.job_result.status is DataOperationStatus.SUCCESS
+        results = step.get_results()
+
+        assert list(results) == [
+            DataOperationResult("003000000000001", True, None),
             DataOperationResult("003000000000002", True, None),
             DataOperationResult(None, False, "error"),
         ]
 
 
+class TestBaseDmlOperation:
+    def test_iter_batch_results(self):
+        class Operation(BaseDmlOperation):
+            def load_records(self, records):
+                pass
+
+            def end(self):
+                self.job_result = DataOperationJobResult(
+                    DataOperationStatus.SUCCESS, [], 10001, 0
+                )
+
+            def get_results(self):
+                return (DataOperationResult(str(i), True, None) for i in range(10001))
+
+        step = Operation(
+            sobject="Contact",
+            operation=DataOperationType.INSERT,
+            api_options={},
+            context=mock.Mock(),
+            fields=["LastName"],
+        )
+
+        batches = list(step.iter_batch_results())
+
+        assert [(offset, len(results)) for offset, results in batches] == [
+            (0, 10000),
+            (10000, 1),
+        ]
+        assert batches[1][1] == [DataOperationResult("10000", True, None)]
+
+    def test_iter_batch_results__job_failure(self):
+        class Operation(BaseDmlOperation):
+            def load_records(self, records):
+                pass
+
+            def end(self):
+                self.job_result = DataOperationJobResult(
+                    DataOperationStatus.JOB_FAILURE, ["Bad"], 0, 0
+                )
+
+            def get_results(self):
+                raise AssertionError("Results of a failed job are not read")
+
+        step = Operation(
+            sobject="Contact",
+            operation=DataOperationType.INSERT,
+            api_options={},
+            context=mock.Mock(),
+            fields=["LastName"],
+        )
+
+        assert list(step.iter_batch_results()) == []
+        assert step.job_result.status is DataOperationStatus.JOB_FAILURE
+
+
+def _make_bulk2_context():
+    context = mock.Mock()
+    context.sf.base_url = "https://example.com/services/data/v48.0/"
+    context.sf.headers = {"Authorization": "Bearer TOKEN"}
+    context.sf.session = requests.Session()
+    return context
+
+
+class TestBulk2ApiQueryOperation:
+    @responses.activate
+    @mock.patch("time.sleep")
+    def test_query(self, sleep_patch):
+        context = _make_bulk2_context()
+        context.sf.restful.side_effect = [
+            {"id": "JOB"},
+            {"id": "JOB", "state": "InProgress", "numberRecordsProcessed": 0},
+            {"id": "JOB", "state": "JobComplete", "numberRecordsProcessed": 3},
+        ]
+        results_url = "https://example.com/services/data/v48.0/jobs/query/JOB/results"
+        responses.add(
+            "GET",
+            results_url,
+            body='Id,Name\r\n001000000000001,Test 1\r\n001000000000002,"Test\n2"\r\n',
+            headers={"Sforce-Locator": "LOCATOR"},
+        )
+        responses.add(
+            "GET",
+            results_url,
+            body="Id,Name\r\n001000000000003,Test 3\r\n",
+            headers={"Sforce-Locator": "null"},
+        )
+
+        query = Bulk2ApiQueryOperation(
+            sobject="Account",
+            api_options={},
+            context=context,
+            query="SELECT Id, Name FROM Account",
+        )
+        query.query()
+
+        context.sf.restful.assert_has_calls(
+            [
+                mock.call(
+                    "jobs/query",
+                    method="POST",
+                    json={
+                        "operation": "query",
+                        "query": "SELECT Id, Name FROM Account",
+                        "contentType": "CSV",
+                    },
+                ),
+                mock.call("jobs/query/JOB"),
+                mock.call("jobs/query/JOB"),
+            ]
+        )
+        assert query.job_result == DataOperationJobResult(
+            DataOperationStatus.SUCCESS, [], 3, 0
+        )
+        assert list(query.get_results()) == [
+            ["001000000000001", "Test 1"],
+            ["001000000000002", "Test\n2"],
+            ["001000000000003", "Test 3"],
+        ]
+        assert "locator" not in responses.calls[0].request.url
+        assert responses.calls[1].request.url.endswith("?locator=LOCATOR")
+
+    @responses.activate
+    def test_get_results__empty(self):
+        context = _make_bulk2_context()
+        responses.add(
+            "GET",
+            "https://example.com/services/data/v48.0/jobs/query/JOB/results",
+            body="",
+            headers={"Sforce-Locator": "null"},
+        )
+        query = Bulk2ApiQueryOperation(
+            sobject="Account",
+            api_options={},
+            context=context,
+            query="SELECT Id FROM Account",
+        )
+        query.job_id = "JOB"
+
+        assert list(query.get_results()) == []
+
+    def test_query__failure(self):
+        context = _make_bulk2_context()
+        context.sf.restful.side_effect = [
+            {"id": "JOB"},
+            {"id": "JOB", "state": "Failed", "errorMessage": "Bad SOQL"},
+        ]
+        query = Bulk2ApiQueryOperation(
+            sobject="Account",
+            api_options={},
+            context=context,
+            query="SELECT Id FROM Account",
+        )
+        query.query()
+
+        assert query.job_result == DataOperationJobResult(
+            DataOperationStatus.JOB_FAILURE, ["Bad SOQL"], 0, 0
+        )
+        context.logger.error.assert_called_once_with("Job failure message: Bad SOQL")
+
+
+class TestBulk2ApiDmlOperation:
+    @responses.activate
+    def test_end_to_end(self):
+        context = _make_bulk2_context()
+        context.sf.restful.side_effect = [
+            {"id": "JOB"},
+            None,
+            {
+                "id": "JOB",
+                "state": "JobComplete",
+                "numberRecordsProcessed": 4,
+                "numberRecordsFailed": 1,
+            },
+        ]
+        base = "https://example.com/services/data/v48.0/jobs/ingest/JOB"
+        uploads = []
+
+        def put(url, data, headers):
+            uploads.append((url, data.read(), headers["Content-Type"]))
+            return mock.Mock()
+
+        context.sf.session.put = put
+        responses.add(
+            "GET",
+            f"{base}/successfulResults",
+            body="sf__Id,sf__Created,LastName,Email\r\n"
+            "003000000000001,true,Test,\r\n"
+            "003000000000002,true,Test2,test@example.com\r\n"
+            "003000000000003,true,Test,\r\n",
+        )
+        responses.add(
+            "GET",
+            f"{base}/failedResults",
+            body="sf__Id,sf__Error,LastName,Email\r\n"
+            ",REQUIRED_FIELD_MISSING:Missing,,\r\n",
+        )
+        responses.add("GET", f"{base}/unprocessedrecords", body="")
+
+        step = Bulk2ApiDmlOperation(
+            sobject="Contact",
+            operation=DataOperationType.INSERT,
+            api_options={},
+            context=context,
+            fields=["LastName", "Email"],
+        )
+        step.start()
+        step.load_records(
+            iter(
+                [
+                    ["Test", None],
+                    ["Test2", "test@example.com"],
+                    [None, None],
+                    ["Test", ""],
+                ]
+            )
+        )
+        step.end()
+
+        context.sf.restful.assert_has_calls(
+            [
+                mock.call(
+                    "jobs/ingest",
+                    method="POST",
+                    json={
+                        "object": "Contact",
+                        "operation": "insert",
+                        "contentType": "CSV",
+                        "lineEnding": "CRLF",
+                    },
+                ),
+                mock.call(
+                    "jobs/ingest/JOB", method="PATCH", json={"state": "UploadComplete"}
+                ),
+                mock.call("jobs/ingest/JOB"),
+            ]
+        )
+        assert uploads == [
+            (
+                f"{base}/batches",
+                b"LastName,Email\r\nTest,\r\nTest2,test@example.com\r\n,\r\nTest,\r\n",
+                "text/csv",
+            )
+        ]
+        assert step.job_result == DataOperationJobResult(
+            DataOperationStatus.ROW_FAILURE, [], 4, 1
+        )
+
+        assert list(step.get_results()) == [
+            DataOperationResult("003000000000001", True, None),
+            DataOperationResult("003000000000002", True, None),
+            DataOperationResult(None, False, "REQUIRED_FIELD_MISSING:Missing"),
+            DataOperationResult("003000000000003", True, None),
+        ]
+
+    @responses.activate
+    @mock.patch("cumulusci.tasks.bulkdata.step.BULK2_MAX_UPLOAD_BYTES", 25)
+    def test_load_records__multiple_jobs(self):
+        context = _make_bulk2_context()
+        context.sf.restful.side_effect = [
+            {"id": "JOB1"},
+            None,
+            {"id": "JOB2"},
+            None,
+            {"id": "JOB1", "state": "JobComplete", "numberRecordsProcessed": 2},
+            {"id": "JOB2", "state": "Failed", "errorMessage": "Failure"},
+        ]
+        base = "https://example.com/services/data/v48.0/jobs/ingest"
+        responses.add("PUT", f"{base}/JOB1/batches", status=201)
+        responses.add("PUT", f"{base}/JOB2/batches", status=201)
+        responses.add(
+            "GET",
+            f"{base}/JOB1/successfulResults",
+            body="sf__Id,sf__Created,LastName\r\n"
+            "003000000000001,true,Test1\r\n"
+            "003000000000002,true,Test2\r\n",
+        )
+        responses.add("GET", f"{base}/JOB1/failedResults", body="")
+        responses.add("GET", f"{base}/JOB1/unprocessedrecords", body="")
+        responses.add("GET", f"{base}/JOB2/successfulResults", body="")
+        responses.add("GET", f"{base}/JOB2/failedResults", body="")
+        responses.add(
+            "GET",
+            f"{base}/JOB2/unprocessedrecords",
+            body="LastName\r\nTest3\r\n",
+        )
+
+        step = Bulk2ApiDmlOperation(
+            sobject="Contact",
+            operation=DataOperationType.INSERT,
+            api_options={},
+            context=context,
+            fields=["LastName"],
+        )
+        step.load_records(iter([["Test1"], ["Test2"], ["Test3"]]))
+        step.end()
+
+        assert step.job_ids == ["JOB1", "JOB2"]
+        assert step.job_result == DataOperationJobResult(
+            DataOperationStatus.JOB_FAILURE, ["Failure"], 2, 0
+        )
+        assert list(step.get_results()) == [
+            DataOperationResult("003000000000001", True, None),
+            DataOperationResult("003000000000002", True, None),
+            DataOperationResult(None, False, "Record was not processed"),
+        ]
+
+    def test_load_records__empty(self):
+        context = _make_bulk2_context()
+        step = Bulk2ApiDmlOperation(
+            sobject="Contact",
+            operation=DataOperationType.INSERT,
+            api_options={},
+            context=context,
+            fields=["LastName"],
+        )
+        step.load_records(iter([]))
+        step.end()
+
+        context.sf.restful.assert_not_called()
+        assert step.job_result == DataOperationJobResult(
+            DataOperationStatus.SUCCESS, [], 0, 0
+        )
+        assert list(step.get_results()) == []
+
+    def _load_job(self, context, fields, records, results):
+        """Run a single Bulk API 2.0 job that returns the given result sets."""
+        context.sf.restful.side_effect = [
+            {"id": "JOB"},
+            None,
+            {"id": "JOB", "state": "JobComplete", "numberRecordsProcessed": 1},
+        ]
+        context.sf.session.put = mock.Mock()
+        base = "https://example.com/services/data/v48.0/jobs/ingest/JOB"
+        for result_type in ("successfulResults", "failedResults", "unprocessedrecords"):
+            responses.add(
+                "GET", f"{base}/{result_type}", body=results.get(result_type, "")
+            )
+
+        step = Bulk2ApiDmlOperation(
+            sobject="Contact",
+            operation=DataOperationType.INSERT,
+            api_options={},
+            context=context,
+            fields=fields,
+        )
+        step.load_records(iter(records))
+        step.end()
+        return step
+
+    @responses.activate
+    def test_get_results__duplicate_rows(self):
+        step = self._load_job(
+            _make_bulk2_context(),
+            ["LastName"],
+            [["Test"], ["Test"], ["Other"], ["Test"]],
+            {
+                "successfulResults": "sf__Id,sf__Created,LastName\r\n"
+                "003000000000001,true,Test\r\n"
+                "003000000000002,true,Test\r\n"
+                "003000000000004,true,Test\r\n",
+                "failedResults": "sf__Id,sf__Error,LastName\r\n"
+                ",DUPLICATES_DETECTED:Duplicate,Other\r\n",
+            },
+        )
+
+        # Identical rows are paired with results in upload order.
+        assert list(step.get_results()) == [
+            DataOperationResult("003000000000001", True, None),
+            DataOperationResult("003000000000002", True, None),
+            DataOperationResult(None, False, "DUPLICATES_DETECTED:Duplicate"),
+            DataOperationResult("003000000000004", True, None),
+        ]
+
+    @responses.activate
+    def test_get_results__normalized_values(self):
+        step = self._load_job(
+            _make_bulk2_context(),
+            ["LastName", "Birthdate", "DoNotCall"],
+            [["Test", "2020-1-1", "True"], ["Other", "2020-01-02", "false"]],
+            {
+                "successfulResults": "sf__Id,sf__Created,LastName,Birthdate,DoNotCall\r\n"
+                "003000000000001,true,Test,2020-01-01,true\r\n",
+                "failedResults": "sf__Id,sf__Error,LastName,Birthdate,DoNotCall\r\n"
+                ",FIELD_INTEGRITY_EXCEPTION:Bad,Other,2020-01-02,false\r\n",
+            },
+        )
+
+        assert list(step.get_results()) == [
+            DataOperationResult("003000000000001", True, None),
+            DataOperationResult(None, False, "FIELD_INTEGRITY_EXCEPTION:Bad"),
+        ]
+
+    @responses.activate
+    def test_get_results__unmatched(self):
+        step = self._load_job(
+            _make_bulk2_context(),
+            ["LastName"],
+            [["Test"]],
+            {
+                "successfulResults": "sf__Id,sf__Created,LastName\r\n"
+                "003000000000001,true,Test\r\n"
+                "003000000000002,true,Other\r\n",
+            },
+        )
+
+        with pytest.raises(BulkDataException):
+            list(step.get_results())
+        assert step.job_data == []
+
+
 class TestRestApiQueryOperation:
     def test_query(self):
         context = mock.Mock()
@@ -694,6 +1766,38 @@ class TestRestApiQueryOperation:
             ["003000000000002", "De Vries", ""],
         ]
 
+    def test_query_batches__prefetch(self):
+        context = mock.Mock()
+        context.sf.query.return_value = {
+            "totalSize": 2,
+            "done": False,
+            "records": [{"Id": "003000000000001"}],
+            "nextRecordsUrl": "test",
+        }
+        fetched = threading.Event()
+
+        def query_more(url, identifier_is_url):
+            fetched.set()
+            return {"totalSize": 2, "done": True, "records": [{"Id": None}]}
+
+        context.sf.query_more.side_effect = query_more
+
+        query_op = RestApiQueryOperation(
+            sobject="Contact",
+            fields=["Id"],
+            api_options={},
+            context=context,
+            query="SELECT Id FROM Contact",
+        )
+        query_op.query()
+        results = query_op.get_results()
+
+        assert next(results) == ["003000000000001"]
+        # The next page is requested while the first is still being consumed.
+        assert fetched.wait(5)
+        assert list(results) == [[""]]
+        context.sf.query_more.assert_called_once_with("test", identifier_is_url=True)
+
 
 class TestRestApiDmlOperation:
     @responses.activate
@@ -732,7 +1836,7 @@ class TestRestApiDmlOperation:
         dml_op = RestApiDmlOperation(
             sobject="Contact",
             operation=DataOperationType.INSERT,
-            api_options={"batch_size": 2},
+            api_options={"batch_size": 2, "concurrency": 1},
             context=task,
             fields=["FirstName", "LastName"],
         )
@@ -798,7 +1902,7 @@ class TestRestApiDmlOperation:
         dml_op = RestApiDmlOperation(
             sobject="Contact",
             operation=DataOperationType.INSERT,
-            api_options={"batch_size": 2},
+            api_options={"batch_size": 2, "concurrency": 1},
             context=task,
             fields=["FirstName", "LastName"],
         )
@@ -854,7 +1958,7 @@ class TestRestApiDmlOperation:
         dml_op = RestApiDmlOperation(
             sobject="Contact",
             operation=DataOperationType.DELETE,
-            api_options={"batch_size": 2},
+            api_options={"batch_size": 2, "concurrency": 1},
             context=task,
             fields=["Id"],
         )
@@ -916,6 +2020,106 @@ class TestRestApiDmlOperation:
             }
         ]
 
+    def test_upsert_dml_operation(self):
+        context = mock.Mock()
+        context.sf.restful.return_value = [
+            {"id": "001000000000001", "success": True, "created": False},
+            {"id": "001000000000002", "success": True, "created": True},
+        ]
+
+        context.sf.Account.describe.return_value = {
+            "fields": [
+                {"name": "Name", "type": "string"},
+                {"name": "External_Id__c", "type": "string"},
+                {"name": "ParentId", "type": "reference"},
+            ]
+        }
+        dml_op = RestApiDmlOperation(
+            sobject="Account",
+            operation=DataOperationType.UPSERT,
+            api_options={"update_key": "External_Id__c"},
+            context=context,
+            fields=["Name", "External_Id__c", "Parent.External_Id__c"],
+        )
+        dml_op.start()
+        dml_op.load_records(iter([["Parent", "P", None], ["Child", "C", "P"]]))
+        dml_op.end()
+
+        context.sf.restful.assert_called_once_with(
+            "composite/sobjects/Account/External_Id__c",
+            method="PATCH",
+            json={
+                "allOrNone": False,
+                "records": [
+                    {
+                        "Name": "Parent",
+                        "External_Id__c": "P",
+                        "attributes": {"type": "Account"},
+                    },
+                    {
+                        "Name": "Child",
+                        "External_Id__c": "C",
+                        "Parent": {"External_Id__c": "P"},
+                        "attributes": {"type": "Account"},
+                    },
+                ],
+            },
+        )
+        assert dml_op.job_result == DataOperationJobResult(
+            DataOperationStatus.SUCCESS, [], 2, 0
+        )
+
+    def test_load_records__concurrent(self):
+        context = mock.Mock()
+        context.sf.Contact.describe.return_value = {
+            "fields": [{"name": "LastName", "type": "string"}]
+        }
+        in_flight = []
+        max_in_flight = []
+        lock = threading.Lock()
+
+        def restful(path, method, json):
+            names = [rec["LastName"] for rec in json["records"]]
+            with lock:
+                in_flight.append(names)
+                max_in_flight.append(len(in_flight))
+            # Make earlier requests finish last.
+            time.sleep(0.05 if names[0] == "Test0" else 0.01)
+            with lock:
+                in_flight.remove(names)
+            return [
+                {"id": name, "success": name != "Test3", "errors": []} for name in names
+            ]
+
+        context.sf.restful.side_effect = restful
+
+        dml_op = RestApiDmlOperation(
+            sobject="Contact",
+            operation=DataOperationType.INSERT,
+            api_options={"batch_size": 2, "concurrency": 3},
+            context=context,
+            fields=["LastName"],
+        )
+        dml_op.load_records(iter([[f"Test{i}"] for i in range(10)]))
+
+        assert max(max_in_flight) <= 3
+        assert dml_op.job_result == DataOperationJobResult(
+            DataOperationStatus.ROW_FAILURE, [], 10, 1
+        )
+        assert [result.id for result in dml_op.get_results()] == [
+            f"Test{i}" for i in range(10)
+        ]
+        # Results are released as they are consumed.
+        assert list(dml_op.get_results()) == []
+
+    def test_org_request_slots(self):
+        assert org_request_slots("00D000000000001") is org_request_slots(
+            "00D000000000001"
+        )
+        assert org_request_slots("00D000000000001") is not org_request_slots(
+            "00D000000000002"
+        )
+
 
 class TestGetOperationFunctions:
     @mock.patch("cumulusci.tasks.bulkdata.step.BulkApiQueryOperation")
@@ -996,6 +2200,42 @@ class TestGetOperationFunctions:
         rest_query.assert_not_called()
         context.sf.restful.assert_called_once_with("limits/recordCount?sObjects=Test")
 
+    @mock.patch("cumulusci.tasks.bulkdata.step.BulkApiQueryOperation")
+    @mock.patch("cumulusci.tasks.bulkdata.step.RestApiQueryOperation")
+    def test_get_query_operation__smart_with_volume(self, rest_query, bulk_query):
+        context = mock.Mock()
+        context.sf.sf_version = "42.0"
+        op = get_query_operation(
+            sobject="Test",
+            fields=["Id"],
+            api_options={},
+            context=context,
+            query="SELECT Id FROM Test",
+            api=DataApi.SMART,
+            volume=10000,
+        )
+        assert op == bulk_query.return_value
+
+        context.sf.restful.assert_not_called()
+
+    def test_get_record_counts(self):
+        sf = mock.Mock()
+        sf.restful.return_value = {
+            "sObjects": [
+                {"name": "Account", "count": 10},
+                {"name": "Contact", "count": 3000},
+            ]
+        }
+
+        assert get_record_counts(sf, ["Account", "Contact", "Custom__c"]) == {
+            "Account": 10,
+            "Contact": 3000,
+            "Custom__c": 0,
+        }
+        sf.restful.assert_called_once_with(
+            "limits/recordCount?sObjects=Account,Contact,Custom__c"
+        )
+
     @mock.patch("cumulusci.tasks.bulkdata.step.BulkApiQueryOperation")
     @mock.patch("cumulusci.tasks.bulkdata.step.RestApiQueryOperation")
     def test_get_query_operation__old_api(self, rest_query, bulk_query):
@@ -1013,6 +2253,111 @@ class TestGetOperationFunctions:
 
         context.sf.restful.assert_not_called()
 
+    @mock.patch("cumulusci.tasks.bulkdata.step.Bulk2ApiQueryOperation")
+    @mock.patch("cumulusci.tasks.bulkdata.step.BulkApiQueryOperation")
+    @mock.patch("cumulusci.tasks.bulkdata.step.RestApiQueryOperation")
+    def test_get_query_operation__bulk2(self, rest_query, bulk_query, bulk2_query):
+        context = mock.Mock()
+        context.sf.restful.return_value = {
+            "sObjects": [{"name": "Test", "count": 10000}]
+        }
+        context.sf.sf_version = "48.0"
+        op = get_query_operation(
+            sobject="Test",
+            fields=["Id"],
+            api_options={},
+            context=context,
+            query="SELECT Id FROM Test",
+            api=DataApi.SMART,
+        )
+        assert op == bulk2_query.return_value
+        bulk2_query.assert_called_once_with(
+            sobject="Test",
+            api_options={},
+            context=context,
+            query="SELECT Id FROM Test",
+        )
+
+        # PK Chunking is only available in Bulk API 1.0.
+        op = get_query_operation(
+            sobject="Test",
+            fields=["Id"],
+            api_options={"pk_chunk_size": 100000},
+            context=context,
+            query="SELECT Id FROM Test",
+            api=DataApi.SMART,
+        )
+        assert op == bulk_query.return_value
+
+        context.sf.sf_version = "46.0"
+        op = get_query_operation(
+            sobject="Test",
+            fields=["Id"],
+            api_options={},
+            context=context,
+            query="SELECT Id FROM Test",
+            api=DataApi.BULK2,
+        )
+        assert op == bulk_query.return_value
+
+    @mock.patch("cumulusci.tasks.bulkdata.step.Bulk2ApiDmlOperation")
+    @mock.patch("cumulusci.tasks.bulkdata.step.BulkApiDmlOperation")
+    @mock.patch("cumulusci.tasks.bulkdata.step.RestApiDmlOperation")
+    def test_get_dml_operation__bulk2(self, rest_dml, bulk_dml, bulk2_dml):
+        context = mock.Mock()
+        context.sf.sf_version = "48.0"
+        assert (
+            get_dml_operation(
+                sobject="Test",
+                operation=DataOperationType.INSERT,
+                fields=["Name"],
+                api_options={"bulk_mode": "Parallel"},
+                context=context,
+                api=DataApi.BULK2,
+                volume=10000,
+            )
+            == bulk2_dml.return_value
+        )
+        # SMART selection doesn't use Bulk API 2.0 for DML.
+        assert (
+            get_dml_operation(
+                sobject="Test",
+                operation=DataOperationType.INSERT,
+                fields=["Name"],
+                api_options={"bulk_mode": "Parallel"},
+                context=context,
+                api=DataApi.SMART,
+                volume=10000,
+            )
+            == bulk_dml.return_value
+        )
+        assert (
+            get_dml_operation(
+                sobject="Test",
+                operation=DataOperationType.INSERT,
+                fields=["Name"],
+                api_options={},
+                context=context,
+                api=DataApi.SMART,
+                volume=1,
+            )
+            == rest_dml.return_value
+        )
+
+        context.sf.sf_version = "46.0"
+        assert (
+            get_dml_operation(
+                sobject="Test",
+                operation=DataOperationType.INSERT,
+                fields=["Name"],
+                api_options={},
+                context=context,
+                api=DataApi.BULK2,
+                volume=1,
+            )
+            == bulk_dml.return_value
+        )
+
     @mock.patch("cumulusci.tasks.bulkdata.step.BulkApiDmlOperation")
     @mock.patch("cumulusci.tasks.bulkdata.step.RestApiDmlOperation")
     def test_get_dml_operation(self, rest_dml, bulk_dml):
@@ -1,15 +1,27 @@
+from datetime import datetime
 import os
 import json
+import re
 import unittest
 from unittest import mock
 
 import responses
-from sqlalchemy import create_engine, MetaData, Integer, Unicode, Column, Table
+from sqlalchemy import (
+    create_engine,
+    MetaData,
+    DateTime,
+    Integer,
+    Unicode,
+    Column,
+    Table,
+)
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import create_session, mapper
 
 from cumulusci.tasks import bulkdata
 from cumulusci.utils import temporary_dir
 from cumulusci.tasks.bulkdata.utils import (
+    LocalIdStore,
     create_table,
     generate_batches,
 )
@@ -72,6 +84,20 @@ def mock_describe_calls():
         mock_sobject_describe(sobject)
 
 
+def mock_record_count_calls(counts=None):
+    """Mock the Record Count API, returning the given dict of counts by sObject."""
+    responses.add(
+        method="GET",
+        url=re.compile(r"https://example.com/services/data/v[\d.]+/limits/recordCount"),
+        json={
+            "sObjects": [
+                {"name": name, "count": count} for name, count in (counts or {}).items()
+            ]
+        },
+        status=200,
+    )
+
+
 class TestSqlAlchemyMixin(unittest.TestCase):
     @mock.patch("cumulusci.tasks.bulkdata.utils.Table")
     @mock.patch("cumulusci.tasks.bulkdata.utils.mapper")
@@ -134,6 +160,163 @@ class TestSqlAlchemyMixin(unittest.TestCase):
 
         assert session.query(model).count() == 10
 
+    def _make_util(self, *columns):
+        engine, metadata = create_db_memory()
+        table = Table("TestTable", metadata, *columns)
+        table.create()
+
+        util = bulkdata.utils.SqlAlchemyMixin()
+        util.metadata = metadata
+        util.session = create_session(bind=engine, autocommit=False)
+        return util, table
+
+    def test_sql_bulk_insert_from_records__chunks(self):
+        util, table = self._make_util(
+            Column("id", Unicode(24), primary_key=True), Column("sf_id", Unicode(24))
+        )
+        chunks = []
+        util._get_chunk_inserter = mock.Mock(return_value=chunks.append)
+
+        util._sql_bulk_insert_from_records(
+            connection=util.session.connection(),
+            table="TestTable",
+            columns=("id", "sf_id"),
+            record_iterable=((str(x), f"00100000000000{x}") for x in range(10)),
+            chunk_size=3,
+        )
+
+        assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1]
+
+    def test_sql_bulk_insert_from_records__column_order(self):
+        util, table = self._make_util(
+            Column("id", Unicode(24), primary_key=True), Column("sf_id", Unicode(24))
+        )
+        connection = util.session.connection()
+
+        util._sql_bulk_insert_from_records(
+            connection=connection,
+            table="TestTable",
+            columns=["sf_id", "id"],
+            record_iterable=iter([["001000000000000", "1"], [None, "2"]]),
+        )
+        util._sql_bulk_insert_from_records(
+            connection=connection,
+            table="TestTable",
+            columns=["sf_id", "id"],
+            record_iterable=[],
+        )
+
+        assert connection.execute(table.select().order_by("id")).fetchall() == [
+            ("1", "001000000000000"),
+            ("2", None),
+        ]
+
+    def test_sql_bulk_insert_split_records(self):
+        engine, metadata = create_db_memory()
+        values = Table(
+            "Opportunity",
+            metadata,
+            Column("id", Integer(), primary_key=True, autoincrement=True),
+            Column("Name", Unicode(255)),
+            Column("AccountId", Unicode(255)),
+        )
+        ids = Table(
+            "Opportunity_sf_ids",
+            metadata,
+            Column("id", Integer(), primary_key=True, autoincrement=True),
+            Column("sf_id", Unicode(24)),
+        )
+        metadata.create_all()
+        util = bulkdata.utils.SqlAlchemyMixin()
+        util.metadata = metadata
+        util.session = create_session(bind=engine, autocommit=False)
+        connection = util.session.connection()
+
+        util._sql_bulk_insert_split_records(
+            connection=connection,
+            tables=[
+                ("Opportunity", ["Name", "AccountId"], slice(1, None)),
+                ("Opportunity_sf_ids", ["sf_id"], slice(1)),
+            ],
+            record_iterable=(
+                [f"00600000000000{x}", f"Opportunity {x}", "1"] for x in range(5)
+            ),
+            chunk_size=2,
+        )
+
+        # Both tables are fed from each chunk, so their autopks line up.
+        assert connection.execute(values.select().order_by("id")).fetchall() == [
+            (x + 1, f"Opportunity {x}", "1") for x in range(5)
+        ]
+        assert connection.execute(ids.select().order_by("id")).fetchall() == [
+            (x + 1, f"00600000000000{x}") for x in range(5)
+        ]
+
+    def test_sql_bulk_insert_from_records__converted_types(self):
+        util, table = self._make_util(
+            Column("id", Integer(), primary_key=True, autoincrement=True),
+            Column("created", DateTime()),
+            Column("kind", Unicode(24), default="Widget"),
+        )
+        connection = util.session.connection()
+
+        # DateTime values are converted by SQLAlchemy.
+        util._sql_bulk_insert_from_records(
+            connection=connection,
+            table="TestTable",
+            columns=["created"],
+            record_iterable=[[datetime(2020, 1, 1)]],
+        )
+        # Column defaults are filled in by SQLAlchemy.
+        util._sql_bulk_insert_from_records(
+            connection=connection,
+            table="TestTable",
+            columns=["id"],
+            record_iterable=[[2]],
+        )
+
+        assert util.session.query(table).all() == [
+            (1, datetime(2020, 1, 1), "Widget"),
+            (2, None, "Widget"),
+        ]
+
+    def test_sql_bulk_insert_from_records__postgres_copy(self):
+        metadata = MetaData()
+        Table(
+            "Test Table",
+            metadata,
+            Column("id", Unicode(24)),
+            Column("sf_id", Unicode(24)),
+        )
+        util = bulkdata.utils.SqlAlchemyMixin()
+        util.metadata = metadata
+        util.session = mock.Mock()
+        connection = mock.Mock()
+        connection.dialect = postgresql.psycopg2.dialect()
+        copied = []
+        cursor = connection.connection.cursor.return_value
+        cursor.copy_expert.side_effect = lambda sql, f: copied.append((sql, f.read()))
+
+        util._sql_bulk_insert_from_records(
+            connection=connection,
+            table="Test Table",
+            columns=("id", "sf_id"),
+            record_iterable=[["1", 'Say "hi"'], ["2", None], ["3", ""]],
+            chunk_size=2,
+        )
+
+        assert copied == [
+            (
+                'COPY "Test Table" (id, sf_id) FROM STDIN WITH (FORMAT csv)',
+                '"1","Say ""hi"""\n"2",\n',
+            ),
+            (
+                'COPY "Test Table" (id, sf_id) FROM STDIN WITH (FORMAT csv)',
+                '"3",""\n',
+            ),
+        ]
+        assert cursor.close.call_count == 2
+
 
 class TestCreateTable(unittest.TestCase):
     def test_create_table_legacy_oid_mapping(self):
@@ -187,3 +370,71 @@ class TestBatching(unittest.TestCase):
     def test_batching_with_remainder(self):
         batches = list(generate_batches(num_records=20, batch_size=7))
         assert batches == [(7, 0), (7, 1), (6, 2)]
+
+
+class TestLocalIdStore(unittest.TestCase):
+    def test_integers(self):
+        store = LocalIdStore()
+        for i in range(20000):
+            store.append(i)
+
+        assert len(store) == 20000
+        assert store[0:3] == [0, 1, 2]
+        assert store[9999:10002] == [9999, 10000, 10001]
+        assert store[19999:30000] == [19999]
+        assert store[5:5] == []
+        store.close()
+
+    def test_strings(self):
+        store = LocalIdStore()
+        ids = [f"id-{i}" for i in range(10000)] + ["ünïcode", ""]
+        for local_id in ids:
+            store.append(local_id)
+
+        assert store[0:2] == ["id-0", "id-1"]
+        assert store[5000:5003] == ["id-5000", "id-5001", "id-5002"]
+        assert store[9999:] == ["id-9999", "ünïcode", ""]
+        assert store[:] == ids
+
+    def test_mixed(self):
+        store = LocalIdStore()
+        store.append(1)
+        store.append(2)
+        store.append("a")
+        store.append(2 ** 70)
+
+        assert store[:] == ["1", "2", "a", str(2 ** 70)]
+
+    def test_spill(self):
+        store = LocalIdStore(spill_threshold=1024)
+        for i in range(10000):
+            store.append(i)
+        assert store[:3] == [0, 1, 2]
+
+        # Appending after a read extends the spill file.
+        for i in range(10000, 20000):
+            store.append(i)
+        assert store._values.spilled
+        assert store[9998:10002] == [9998, 9999, 10000, 10001]
+        assert store[:] == list(range(20000))
+        store.close()
+
+    def test_spill__strings(self):
+        store = LocalIdStore(spill_threshold=1024)
+        ids = [f"00Q{i:012d}" for i in range(5000)]
+        for local_id in ids:
+            store.append(local_id)
+
+        assert store[4000:4002] == ids[4000:4002]
+        assert store._values.spilled and store._data.spilled
+        assert store[:] == ids
+        store.close()
+
+    def test_slices_only(self):
+        store = LocalIdStore()
+        store.append(1)
+
+        with self.assertRaises(TypeError):
+            store[0]
+        with self.assertRaises(TypeError):
+            store[::2]
@@ -1,5 +1,13 @@
+from array import array
+import csv
+import io
+import itertools
+import mmap
+import tempfile
+
 from sqlalchemy import Column
 from sqlalchemy import Integer
+from sqlalchemy import String
 from sqlalchemy import Table
 from sqlalchemy import Unicode
 from sqlalchemy.orm import mapper
@@ -8,18 +16,110 @@ from cumulusci.core.exceptions import BulkDataException
 
 
 class SqlAlchemyMixin:
+    # Number of records inserted by each statement in _sql_bulk_insert_from_records
+    sql_insert_chunk_size = 10000
+
     def _sql_bulk_insert_from_records(
-        self, *, connection, table, columns, record_iterable
+        self, *, connection, table, columns, record_iterable, chunk_size=None
     ):
-        """Persist records from the given generator into the local database."""
-        table = self.metadata.tables[table]
+        """Persist records from the given iterable into the local database.
 
-        connection.execute(
-            table.insert(), [dict(zip(columns, row)) for row in record_iterable]
+        Records are consumed in chunks, so the iterable is never held in
+        memory, and passed to the database driver as they are, using COPY on
+        PostgreSQL and executemany() elsewhere. Columns whose values must be
+        converted by SQLAlchemy are inserted through SQLAlchemy instead."""
+        self._sql_bulk_insert_split_records(
+            connection=connection,
+            tables=[(table, columns, slice(None))],
+            record_iterable=record_iterable,
+            chunk_size=chunk_size,
         )
 
+    def _sql_bulk_insert_split_records(
+        self, *, connection, tables, record_iterable, chunk_size=None
+    ):
+        """Persist records from the given iterable into several tables in a
+        single pass, as _sql_bulk_insert_from_records does for one table.
+
+        `tables` is a list of (table, columns, values) tuples, where `values`
+        is the slice of each record that is inserted into that table's columns."""
+        inserters = [
+            (
+                self._get_chunk_inserter(
+                    connection, self.metadata.tables[table], list(columns)
+                ),
+                values,
+            )
+            for table, columns, values in tables
+        ]
+        chunk_size = chunk_size or self.sql_insert_chunk_size
+
+        records = iter(record_iterable)
+        while True:
+            chunk = list(itertools.islice(records, chunk_size))
+            if not chunk:
+                break
+            for insert_chunk, values in inserters:
+                if values == slice(None):
+                    insert_chunk(chunk)
+                else:
+                    insert_chunk([record[values] for record in chunk])
+
         self.session.flush()
 
+    def _get_chunk_inserter(self, connection, table, columns):
+        """Return a function that inserts a list of records into table."""
+        dialect = connection.dialect
+
+        def sqlalchemy_insert(chunk):
+            connection.execute(
+                table.insert(), [dict(zip(columns, row)) for row in chunk]
+            )
+
+        if any(
+            _converts_values(table.columns[column].type, dialect) for column in columns
+        ):
+            return sqlalchemy_insert
+
+        if dialect.name == "postgresql" and dialect.driver == "psycopg2":
+            preparer = dialect.identifier_preparer
+            sql = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+                preparer.format_table(table),
+                ", ".join(preparer.quote(column) for column in columns),
+            )
+
+            def copy_insert(chunk):
+                data = io.StringIO("".join(_copy_csv_line(row) for row in chunk))
+                cursor = connection.connection.cursor()
+                try:
+                    cursor.copy_expert(sql, data)
+                finally:
+                    cursor.close()
+
+            return copy_insert
+
+        if dialect.positional:
+            compiled = table.insert().compile(dialect=dialect, column_keys=columns)
+            if sorted(compiled.positiontup) != sorted(columns):
+                # The statement has parameters for column defaults.
+                return sqlalchemy_insert
+            order = [columns.index(name) for name in compiled.positiontup]
+            reorder = order != list(range(len(order)))
+            sql = str(compiled)
+
+            def executemany_insert(chunk):
+                if reorder:
+                    chunk = [[row[i] for i in order] for row in chunk]
+                cursor = connection.connection.cursor()
+                try:
+                    cursor.executemany(sql, chunk)
+                finally:
+                    cursor.close()
+
+            return executemany_insert
+
+        return sqlalchemy_insert
+
     def _create_record_type_table(self, table_name):
         """Create a table to store mapping between Record Type Ids and Developer Names."""
         rt_map_model_name = f"{table_name}Model"
@@ -51,6 +151,27 @@ class SqlAlchemyMixin:
             )
 
 
+def _converts_values(column_type, dialect):
+    """Return whether SQLAlchemy converts values of column_type before
+    passing them to the database driver."""
+    if isinstance(column_type, String) and dialect.supports_unicode_binds:
+        # Strings are passed through; their processor only warns about bytes.
+        return False
+    return column_type._cached_bind_processor(dialect) is not None
+
+
+def _copy_csv_line(row):
+    """Format a record as a line of CSV for PostgreSQL's COPY, in which an
+    unquoted empty value is NULL and a quoted one is an empty string."""
+    return (
+        ",".join(
+            "" if value is None else '"' + str(value).replace('"', '""') + '"'
+            for value in row
+        )
+        + "\n"
+    )
+
+
 def _handle_primary_key(mapping, fields):
     """Provide support for legacy mappings which used the OID as the pk but
     default to using an autoincrementing int pk and a separate sf_id column"""
@@ -62,11 +183,12 @@ def _handle_primary_key(mapping, fields):
         fields.append(Column("id", Integer(), primary_key=True, autoincrement=True))
 
 
-def create_table(mapping, metadata):
+def create_table(mapping, metadata, exists_ok=False):
     """Given a mapping data structure (from mapping.yml) and SQLAlchemy
     metadata, create a table matching the mapping.
 
-    Mapping should be a MappingStep instance"""
+    Mapping should be a MappingStep instance. Unless exists_ok is True,
+    the table must not already exist in the database."""
 
     fields = []
     _handle_primary_key(mapping, fields)
@@ -81,7 +203,7 @@ def create_table(mapping, metadata):
     if mapping.record_type:
         fields.append(Column("record_type", Unicode(255)))
     t = Table(mapping.table, metadata, *fields)
-    if t.exists():
+    if t.exists() and not exists_ok:
         raise BulkDataException(f"Table already exists: {mapping.table}")
     return t
 
@@ -118,3 +240,150 @@ class RowErrorChecker:
                 return self.row_error_count
             else:
                 raise BulkDataException(msg)
+
+
+class _SpillBuffer:
+    """Append-only byte buffer that moves to a memory-mapped
+    temporary file once it grows past spill_threshold bytes."""
+
+    def __init__(self, spill_threshold):
+        self.spill_threshold = spill_threshold
+        self.size = 0
+        self._memory = bytearray()
+        self._file = None
+        self._mmap = None
+
+    @property
+    def spilled(self):
+        return self._file is not None
+
+    def write(self, data):
+        if not self.spilled and self.size + len(data) > self.spill_threshold:
+            self._file = tempfile.TemporaryFile()
+            self._file.write(self._memory)
+            self._memory = None
+
+        if self.spilled:
+            self._close_mmap()
+            self._file.write(data)
+        else:
+            self._memory += data
+        self.size += len(data)
+
+    def read(self, start, end):
+        if not self.spilled:
+            return bytes(self._memory[start:end])
+
+        if self._mmap is None:
+            self._file.flush()
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap[start:end]
+
+    def _close_mmap(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def close(self):
+        self._close_mmap()
+        if self._file is not None:
+            self._file.close()
+        self._memory = bytearray()
+
+
+def spool_records(records):
+    """Read all of the records into a temporary file, then yield them back as
+    lists of strings, as they are serialized for the Bulk API.
+
+    This releases the source of the records, such as a database cursor,
+    before the first record is yielded."""
+    with tempfile.TemporaryFile("w+", encoding="utf-8", newline="") as f:
+        csv.writer(f).writerows(records)
+        f.seek(0)
+        yield from csv.reader(f)
+
+
+class LocalIdStore:
+    """Compact, append-only store of the local primary keys of a step's records,
+    which correlates them with the results of the load by position.
+
+    Integer keys are packed into 8 bytes each. Other keys are stored as UTF-8
+    with an array of end offsets. Above spill_threshold bytes, the data moves
+    to temporary files that are read through mmap, so memory use doesn't grow
+    with the size of the step. Read slices with store[start:stop]."""
+
+    def __init__(self, spill_threshold=64 * 1024 * 1024):
+        self.spill_threshold = spill_threshold
+        self._count = 0
+        self._strings = False
+        # Fixed-width values: the ids themselves, or the end offsets of strings.
+        self._values = _SpillBuffer(spill_threshold)
+        self._data = _SpillBuffer(spill_threshold)
+        self._pending = array("q")
+
+    def __len__(self):
+        return self._count
+
+    def append(self, local_id):
+        if not self._strings and not isinstance(local_id, int):
+            self._convert_to_strings()
+
+        if not self._strings:
+            try:
+                self._pending.append(local_id)
+            except OverflowError:
+                self._convert_to_strings()
+        if self._strings:
+            self._data.write(str(local_id).encode("utf-8"))
+            self._pending.append(self._data.size)
+        self._count += 1
+
+        if len(self._pending) >= 8192:
+            self._flush()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step not in (None, 1):
+            raise TypeError("LocalIdStore supports only contiguous slices")
+
+        start, stop, _ = index.indices(self._count)
+        if start >= stop:
+            return []
+
+        self._flush()
+        values = array("q")
+        if not self._strings:
+            values.frombytes(self._values.read(start * 8, stop * 8))
+            return values.tolist()
+
+        # Each string ends where the next begins.
+        values.frombytes(self._values.read(max(start - 1, 0) * 8, stop * 8))
+        ends = values.tolist()
+        if start == 0:
+            ends.insert(0, 0)
+        data = self._data.read(ends[0], ends[-1])
+        return [
+            data[begin - ends[0] : end - ends[0]].decode("utf-8")
+            for begin, end in zip(ends, ends[1:])
+        ]
+
+    def _flush(self):
+        if self._pending:
+            self._values.write(self._pending.tobytes())
+            self._pending = array("q")
+
+    def _convert_to_strings(self):
+        """Switch to string storage, rewriting any integer ids already stored."""
+        existing = self[: self._count]
+        self._values.close()
+        self._values = _SpillBuffer(self.spill_threshold)
+        self._pending = array("q")
+        self._strings = True
+        self._count = 0
+        for local_id in existing:
+            self.append(local_id)
+
+    def close(self):
+        """Release the store's memory and temporary files."""
+        self._values.close()
+        self._data.close()
+        self._pending = array("q")
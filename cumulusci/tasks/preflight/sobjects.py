@@ -1,5 +1,6 @@
 from cumulusci.tasks.salesforce import BaseSalesforceApiTask
 from cumulusci.core.exceptions import TaskOptionsError
+from cumulusci.salesforce_api.describe_cache import get_describe
 
 from simple_salesforce.exceptions import SalesforceMalformedRequest
 
@@ -8,7 +9,10 @@ class CheckSObjectsAvailable(BaseSalesforceApiTask):
     api_version = "48.0"
 
     def _run_task(self):
-        self.return_values = {entry["name"] for entry in self.sf.describe()["sobjects"]}
+        self.return_values = {
+            entry["name"]
+            for entry in get_describe(self.org_config, self.sf)["sobjects"]
+        }
 
         self.logger.info(
             "Completed sObjects preflight check with result {}".format(
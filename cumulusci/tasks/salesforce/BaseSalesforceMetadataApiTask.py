@@ -14,5 +14,6 @@ class BaseSalesforceMetadataApiTask(BaseSalesforceTask):
         if api:
             result = api()
             self.org_config.reset_installed_packages()
+            self.org_config.reset_describe_cache()
             self.return_values = result
         return result
@@ -1,6 +1,7 @@
 import os
 import re
 from cumulusci.core.exceptions import TaskOptionsError
+from cumulusci.salesforce_api.describe_cache import get_describe
 from cumulusci.tasks.salesforce import BaseSalesforceApiTask, Deploy
 from cumulusci.utils import temporary_dir
 
@@ -85,7 +86,7 @@ class EnsureRecordTypes(BaseSalesforceApiTask):
         # Regardless of sObject, we don't need to do any work if it already
         # has record types in the target org.
         sobject = self.options["sobject"]
-        describe_results = getattr(self.sf, sobject).describe()
+        describe_results = get_describe(self.org_config, self.sf, sobject)
 
         # Check for existing record types. We ignore the record type info with master: True,
         # because it's present even if record types aren't enabled for the object.
@@ -5,6 +5,7 @@ from contextlib import contextmanager
 from cumulusci.tasks.salesforce import BaseSalesforceApiTask
 from cumulusci.core.utils import process_list_arg, process_bool_arg
 from cumulusci.core.exceptions import TaskOptionsError, CumulusCIException
+from cumulusci.salesforce_api.describe_cache import get_describe
 from cumulusci.utils.fileutils import open_fs_resource, FSResource
 
 
@@ -65,7 +66,7 @@ class SetTDTMHandlerStatus(BaseSalesforceApiTask):
             self._do_trigger_handlers(f)
 
     def _do_trigger_handlers(self, restore_file: FSResource):
-        global_describe = self.sf.describe()
+        global_describe = get_describe(self.org_config, self.sf)
         sobject_names = [x["name"] for x in global_describe["sobjects"]]
 
         if self.should_restore:
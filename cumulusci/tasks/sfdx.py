@@ -59,6 +59,11 @@ class SFDXOrgTask(SFDXBaseTask):
             env["SFDX_DEFAULTUSERNAME"] = self.org_config.access_token
         return env
 
+    def _run_task(self):
+        super()._run_task()
+        # The command may have changed the org's schema, e.g. by pushing source.
+        self.org_config.reset_describe_cache()
+
 
 class SFDXJsonTask(SFDXOrgTask):
     command = "force:mdapi:deploy --json"
@@ -51,6 +51,22 @@ class TestSFDXBaseTask(MockLoggerMixin, unittest.TestCase):
         self.assertEqual("force:org", task.options["command"])
         self.assertEqual("sfdx force:org --help", task._get_command())
 
+    @patch(
+        "cumulusci.tasks.sfdx.SFDXOrgTask._update_credentials",
+        MagicMock(return_value=None),
+    )
+    @patch("cumulusci.tasks.command.Command._run_task", MagicMock(return_value=None))
+    def test_resets_describe_cache(self):
+        """ Describes are refetched after the command changes the org """
+
+        self.task_config.config["options"] = {"command": "force:source:push"}
+        org_config = mock.Mock()
+
+        task = SFDXOrgTask(self.project_config, self.task_config, org_config)
+        task()
+
+        org_config.reset_describe_cache.assert_called_once_with()
+
     @patch(
         "cumulusci.tasks.sfdx.SFDXOrgTask._update_credentials",
         MagicMock(return_value=None),
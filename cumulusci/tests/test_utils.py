@@ -501,6 +501,14 @@ Options\n------------------------------------------\n\n
             pass
         assert 4 == logger.info.call_count
 
+    def test_log_progress__total(self):
+        logger = mock.Mock()
+        for x in utils.log_progress(range(3), logger, batch_size=2, total=3):
+            pass
+        logger.info.assert_has_calls(
+            [mock.call("Processing... (2 of ~3)"), mock.call("Done! (Total: 3)")]
+        )
+
     def test_util__sets_homebrew_upgrade_cmd(self):
         utils.CUMULUSCI_PATH = "/usr/local/Cellar/cumulusci/2.1.2"
         upgrade_cmd = utils.get_cci_upgrade_command()
@@ -604,14 +604,16 @@ def log_progress(
     batch_size=10000,
     progress_message="Processing... ({})",
     done_message="Done! (Total: {})",
+    total=None,
 ):
-    """Log progress while iterating."""
+    """Log progress while iterating. If the (approximate) total
+    is known, progress messages include it."""
     i = 0
     for x in iterable:
         yield x
         i += 1
         if not i % batch_size:
-            logger.info(progress_message.format(i))
+            logger.info(progress_message.format(f"{i} of ~{total}" if total else i))
     logger.info(done_message.format(i))
 
 